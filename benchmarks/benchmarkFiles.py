@@ -0,0 +1,19 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Makes the large WOS files used by the benchmarks.
+
+The records of one of the test files are repeated with new WOS numbers, e.g. the typical records of testFile.isi or the very long author lists of ManyAuthors.isi.
+"""
+import re
+
+def makeTestFile(fileName, sourceFile, numRecords):
+    with open(sourceFile, encoding = 'utf-8-sig') as f:
+        text = f.read()
+    body = text[text.index('VR 1.0\n') + 6:text.rindex('\nEF')]
+    records = [r.lstrip('\n') + '\nER\n' for r in body.split('\nER\n') if '\nUT ' in r]
+    utRegex = re.compile(r'\nUT [^\n]*')
+    with open(fileName, 'w', encoding = 'utf-8-sig') as f:
+        f.write("FN Thomson Reuters Web of Science\nVR 1.0\n")
+        for i in range(numRecords):
+            f.write(utRegex.sub('\nUT WOS:{:015d}'.format(i), records[i % len(records)]))
+            f.write('\n')
+        f.write("EF\n")
@@ -0,0 +1,58 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Compares the time taken by networkBibCoupling() with the default networkx engine and the sparse matrix engine.
+
+The file is made by benchmarkFiles.py, but each repeat of the records has the number of the repeat added to its first author so the copies are different Records. Their references are the same, so each reference is cited by every copy, as highly cited references are. Run from the root of the repository with:
+
+    python benchmarks/bibCouplingBenchmark.py [number of records]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metaknowledge
+from benchmarkFiles import makeTestFile
+
+def renameCopies(fileName, recordsPerCopy):
+    with open(fileName, encoding = 'utf-8-sig') as f:
+        text = f.read()
+    records = text.split('\nER\n')
+    for i, rec in enumerate(records):
+        records[i] = re.sub(r'\nAU ([^\n]*)', lambda m: '\nAU {}{}'.format(m.group(1), i // recordsPerCopy), rec, count = 1)
+    with open(fileName, 'w', encoding = 'utf-8-sig') as f:
+        f.write('\nER\n'.join(records))
+
+def timeNetwork(RC, **kwargs):
+    tStart = time.perf_counter()
+    G = RC.networkBibCoupling(**kwargs)
+    return time.perf_counter() - tStart, G
+
+def main(numRecords):
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'benchmark.isi')
+        sourceFile = "metaknowledge/tests/testFile.isi"
+        makeTestFile(fileName, sourceFile, numRecords)
+        renameCopies(fileName, len(metaknowledge.WOS.wosParser(sourceFile)[0]))
+        RC = metaknowledge.RecordCollection(fileName)
+    #The citations are parsed once, so neither engine is timed doing it
+    for R in RC:
+        R.get('citations')
+    print("{} records".format(len(RC)))
+    nxTime, Gnx = timeNetwork(RC)
+    matrixTime, Gmatrix = timeNetwork(RC, engine = "matrix")
+    assert len(Gnx) == len(Gmatrix) and Gnx.size(weight = 'weight') == Gmatrix.size(weight = 'weight')
+    print("{} nodes, {} edges".format(len(Gmatrix), len(Gmatrix.edges())))
+    print("    networkx engine: {:.2f}s".format(nxTime))
+    print("    matrix engine: {:.2f}s".format(matrixTime))
+    print("    speedup: {:.1f}x".format(nxTime / matrixTime))
+    tStart = time.perf_counter()
+    C, nodeIDs = RC.bibCouplingMatrix()
+    print("    bibCouplingMatrix(): {:.2f}s".format(time.perf_counter() - tStart))
+    minTime, Gmin = timeNetwork(RC, engine = "matrix", minShared = 5, normalize = "salton")
+    print("    matrix engine with minShared = 5 and Salton normalization: {:.2f}s, {} edges".format(minTime, len(Gmin.edges())))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,85 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Compares the memory used by Citations against the previous representation, which had a __dict__, did not intern any strings and made a BadCitation for each bad citation, and against the shared Citations given by citationFromString().
+
+The citations of the CR fields of the test files are repeated to make a large list, run from the root of the repository with:
+
+    python benchmarks/citationMemoryBenchmark.py [number of citations]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metaknowledge
+from metaknowledge.mkExceptions import BadCitation
+
+class DictCitation(object):
+    """The WOS parsing of the previous Citation, with the attributes in a __dict__"""
+    def __init__(self, cite):
+        regex = metaknowledge.Citation.wosCiteRegex.match(cite.upper())
+        if regex is None:
+            self.bad = True
+            self.error = BadCitation("Regex parsing failed.")
+        try:
+            self.author = regex.group(1).replace('.', '').title()
+        except AttributeError:
+            self.author = None
+        try:
+            self.year = int(regex.group(3))
+        except TypeError:
+            self.year = None
+        self.journal = regex.group(5)
+        self.V = regex.group(7)
+        self.P = regex.group(9)
+        self.DOI = regex.group(11)
+        atrLst = [str(v) for v in (self.author, self.year, self.journal) if v]
+        if regex.group(12) is not None:
+            self.misc = regex.group(12)
+            self.DOI = regex.group(15)
+            self.bad = True
+            self.error = BadCitation("The citation did not fully match the expected pattern")
+        elif self.author is None or self.year is None or self.journal is None:
+            self.bad = True
+            self.misc = None
+            self.error = BadCitation("Not a complete set of author, year and journal")
+        else:
+            self.bad = False
+            self.error = None
+            self.misc = None
+        self._id = ', '.join(atrLst)
+        self.original = cite
+        #The hash was cached on first use, which every collection does
+        self._hash = hash(self._id)
+
+def citeStrings(numCites):
+    RC = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi") + metaknowledge.RecordCollection("metaknowledge/tests/ManyAuthors.isi")
+    cites = [c for R in RC for c in R.get('CR', default = [], raw = True)]
+    #New copies of the strings, as each record has its own
+    return [(cites[i % len(cites)] + '.')[:-1] for i in range(numCites)]
+
+def measure(citeClass, cites):
+    tracemalloc.start()
+    tStart = time.perf_counter()
+    made = [citeClass(c) for c in cites]
+    buildTime = time.perf_counter() - tStart
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del made
+    return used, buildTime
+
+def main(numCites):
+    cites = citeStrings(numCites)
+    #The raw strings are held by the records, so they are not counted
+    results = {}
+    metaknowledge.clearCitationCache()
+    for name, citeClass in [("previous Citation", DictCitation), ("Citation", metaknowledge.Citation), ("citationFromString", metaknowledge.citationFromString)]:
+        used, buildTime = measure(citeClass, cites)
+        results[name] = used
+        print("{}: {:.1f} MB, {:.0f} bytes per citation, built in {:.2f}s".format(name, used / 2**20, used / numCites, buildTime))
+    print("reduction: {:.1f}x, {:.1f}x with the cache".format(results["previous Citation"] / results["Citation"], results["previous Citation"] / results["citationFromString"]))
+    print("cache: {}".format(metaknowledge.citationCacheStats()))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,43 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Compares the time taken by networkCoAuthor() with the default networkx engine and the sparse matrix engine, with and without citation profiles.
+
+The file is made by benchmarkFiles.py from ManyAuthors.isi, whose longest author lists have over a hundred authors. Run from the root of the repository with:
+
+    python benchmarks/coAuthorBenchmark.py [number of records]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metaknowledge
+from benchmarkFiles import makeTestFile
+
+def timeNetwork(RC, **kwargs):
+    tStart = time.perf_counter()
+    G = RC.networkCoAuthor(**kwargs)
+    return time.perf_counter() - tStart, G
+
+def main(numRecords):
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'benchmark.isi')
+        makeTestFile(fileName, "metaknowledge/tests/ManyAuthors.isi", numRecords)
+        RC = metaknowledge.RecordCollection(fileName)
+    #The tags are parsed once, so neither engine is timed doing it
+    for R in RC:
+        R.get('authorsFull')
+        R.get('citations')
+    print("{} records".format(len(RC)))
+    for kwargs in [{}, {'citeProfile' : True}, {'maxAuthors' : 50, 'maxAuthorsMode' : 'fractional'}]:
+        nxTime, Gnx = timeNetwork(RC, **kwargs)
+        matrixTime, Gmatrix = timeNetwork(RC, engine = "matrix", **kwargs)
+        assert len(Gnx) == len(Gmatrix) and len(Gnx.edges()) == len(Gmatrix.edges())
+        print("{}: {} nodes, {} edges".format(kwargs, len(Gmatrix), len(Gmatrix.edges())))
+        print("    networkx engine: {:.2f}s".format(nxTime))
+        print("    matrix engine: {:.2f}s".format(matrixTime))
+        print("    speedup: {:.1f}x".format(nxTime / matrixTime))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,46 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Compares the time taken by networkCoCitation() with the default networkx engine and the sparse matrix engine, for each nodeType.
+
+The file is made by benchmarkFiles.py, so the records repeat and the networks are small but the number of co-citation pairs grows with the number of records. Run from the root of the repository with:
+
+    python benchmarks/coCitationBenchmark.py [number of records]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metaknowledge
+from benchmarkFiles import makeTestFile
+
+nodeTypes = ["full", "author", "journal", "year"]
+
+def timeNetwork(RC, **kwargs):
+    tStart = time.perf_counter()
+    G = RC.networkCoCitation(**kwargs)
+    return time.perf_counter() - tStart, G
+
+def main(numRecords):
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'benchmark.isi')
+        makeTestFile(fileName, "metaknowledge/tests/testFile.isi", numRecords)
+        RC = metaknowledge.RecordCollection(fileName)
+    numCites = sum((len(R.get('CR', default = [], raw = True)) for R in RC))
+    print("{} records, {} citations".format(len(RC), numCites))
+    #The citations are parsed once, so neither engine is timed doing it
+    for R in RC:
+        R.get('citations')
+    for nodeType in nodeTypes:
+        #Journal info needs the j9 database
+        nxTime, Gnx = timeNetwork(RC, nodeType = nodeType, nodeInfo = nodeType != "journal")
+        matrixTime, Gmatrix = timeNetwork(RC, nodeType = nodeType, nodeInfo = nodeType != "journal", engine = "matrix")
+        assert len(Gnx) == len(Gmatrix) and Gnx.size(weight = 'weight') == Gmatrix.size(weight = 'weight')
+        print("{}: {} nodes, {} edges".format(nodeType, len(Gmatrix), len(Gmatrix.edges())))
+        print("    networkx engine: {:.2f}s".format(nxTime))
+        print("    matrix engine: {:.2f}s".format(matrixTime))
+        print("    speedup: {:.1f}x".format(nxTime / matrixTime))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 110000)
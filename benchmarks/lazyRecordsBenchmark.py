@@ -0,0 +1,46 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Compares the memory used by a RecordCollection of a large WOS file when it is loaded normally and with lazy = True, before and after reading a few tags of every record.
+
+The file is made by benchmarkFiles.py, run from the root of the repository with:
+
+    python benchmarks/lazyRecordsBenchmark.py [number of records]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import metaknowledge
+from benchmarkFiles import makeTestFile
+
+usedTags = ['UT', 'PY', 'CR']
+
+def measureLoad(fileName, lazy):
+    tracemalloc.start()
+    tStart = time.perf_counter()
+    RC = metaknowledge.RecordCollection(fileName, lazy = lazy)
+    loadTime = time.perf_counter() - tStart
+    loadedMem = tracemalloc.get_traced_memory()[0]
+    for R in RC:
+        for tag in usedTags:
+            R.get(tag)
+    usedMem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(RC), loadTime, loadedMem, usedMem
+
+def main(numRecords):
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'benchmark.isi')
+        makeTestFile(fileName, "metaknowledge/tests/testFile.isi", numRecords)
+        print("{:.1f} MB file".format(os.path.getsize(fileName) / 2**20))
+        for lazy in [False, True]:
+            count, loadTime, loadedMem, usedMem = measureLoad(fileName, lazy)
+            print("lazy = {}: {} records loaded in {:.2f}s".format(lazy, count, loadTime))
+            print("    after loading: {:.1f} MB".format(loadedMem / 2**20))
+            print("    after reading {}: {:.1f} MB".format(', '.join(usedTags), usedMem / 2**20))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
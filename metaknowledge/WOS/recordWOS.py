@@ -1,15 +1,21 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
 """This file contains the Record class for metaknowledge and one helper function for parsing WOS records, recordParser. The record class is used to represent a single records meta-data from WOS.
+
+LazyFieldDict is used instead of recordParser's dicts when records are loaded lazily, it reads each field from the file when it is used.
 """
 import itertools
 import io
 import collections
+import collections.abc
+import mmap
+import os
+import re
 
-from ..mkRecord import ExtendedRecord
+from ..mkRecord import ExtendedRecord, _projectFieldDict, _sharedTagSet
 
 from ..WOS.tagProcessing.funcDicts import tagNameConverterDict, tagToFull
 from ..WOS.tagProcessing.tagFunctions import tagToFunc
-from ..mkExceptions import BadWOSFile, BadWOSRecord
+from ..mkExceptions import BadWOSFile, BadWOSRecord, RecordsNotCompatible
 
 class WOSRecord(ExtendedRecord):
     """Class for full WOS records
@@ -44,6 +50,8 @@ class WOSRecord(ExtendedRecord):
 
     > If a dict is passed the dictionary is used as the database of fields and tags, so each key is considered a WOS tag and each value a list of the lines of the original associated with the tag. This is the same form of dict that [recordParser](../modules/WOS.html#metaknowledge.WOS.recordWOS.recordParser) returns.
 
+    > A [LazyFieldDict](../modules/WOS.html#metaknowledge.WOS.recordWOS.LazyFieldDict) can be passed instead of a dict, then the fields are only read from the file when they are used.
+
     > For a string the input must be the raw textual data of a single record in the WOS style, like the file stream it must start at the first tag and end in `'ER'`.
 
     > itertools.chain is treated identically to a file stream and is used by [RecordCollections](./RecordCollection.html#metaknowledge.RecordCollection).
@@ -55,25 +63,34 @@ class WOSRecord(ExtendedRecord):
     _sLine_ : `optional [int]`
 
     > Is the line the record starts on in the raw data file. It is mostly used to make error messages more informative.
+
+    _keptTags_ : `optional [set[str]]`
+
+    > Default `None`, if given only the tags in _keptTags_ are kept, the others are skipped and listed in `droppedTags`. It is not used with a `LazyFieldDict`.
     """
 
-    def __init__(self, inRecord, sFile = "", sLine = 0):
+    def __init__(self, inRecord, sFile = "", sLine = 0, keptTags = None):
         """See help on [Record](./Record.html#metaknowledge.Record) for details"""
         bad = False
         error = None
         fieldDict = None
+        droppedTags = set()
         try:
             if isinstance(inRecord, dict) or isinstance(inRecord, collections.OrderedDict):
                 fieldDict = collections.OrderedDict(inRecord)
+                if keptTags is not None:
+                    _projectFieldDict(fieldDict, keptTags, droppedTags)
+            elif isinstance(inRecord, LazyFieldDict):
+                fieldDict = inRecord.copy()
             elif isinstance(inRecord, itertools.chain):
-                fieldDict = recordParser(inRecord)
+                fieldDict = recordParser(inRecord, keptTags, droppedTags)
             elif isinstance(inRecord, io.IOBase):
-                fieldDict = recordParser(enumerate(inRecord))
+                fieldDict = recordParser(enumerate(inRecord), keptTags, droppedTags)
             elif isinstance(inRecord, str):
                 def addChartoEnd(lst):
                     for s in lst:
                         yield s + '\n'
-                fieldDict = recordParser(enumerate(addChartoEnd(inRecord.split('\n')), start = 1))
+                fieldDict = recordParser(enumerate(addChartoEnd(inRecord.split('\n')), start = 1), keptTags, droppedTags)
                 #string io
             else:
                 raise TypeError("Unsupported input type '{}', WOSRecords cannot be created from '{}'".format(inRecord, type(inRecord)))
@@ -81,14 +98,23 @@ class WOSRecord(ExtendedRecord):
             self.bad = True
             self.error = b
             fieldDict = collections.OrderedDict()
+        if isinstance(fieldDict, LazyFieldDict):
+            #The file is not read to make the Record
+            wosNum = fieldDict.wosNum
+        elif fieldDict is not None and 'UT' in fieldDict:
+            wosNum = fieldDict['UT'][0]
+        else:
+            wosNum = None
         if fieldDict is not None:
-            if 'UT' in fieldDict:
-                self._wosNum = fieldDict['UT'][0]
+            if wosNum is not None:
+                self._wosNum = wosNum
             else:
                 self._wosNum = 'WOS:Missing'
                 bad = True
                 error = BadWOSRecord("Missing WOS number")
         ExtendedRecord.__init__(self, fieldDict, self._wosNum, bad, error, sFile = sFile, sLine = sLine)
+        if droppedTags:
+            self._droppedTags = _sharedTagSet(droppedTags)
 
     def encoding(self):
         return 'utf-8'
@@ -133,6 +159,8 @@ class WOSRecord(ExtendedRecord):
         """
         if self.bad:
             raise BadWOSRecord("This record cannot be converted to a file as the input was malformed.\nThe original line number (if any) is: {} and the original file is: '{}'".format(self._sourceLine, self._sourceFile))
+        elif self._droppedTags:
+            raise RecordsNotCompatible("This record cannot be written to a file as the tags {} were dropped when it was read.".format(', '.join(sorted(self._droppedTags))))
         else:
             for tag in self._fieldDict.keys():
                 for i, value in enumerate(self._fieldDict[tag]):
@@ -143,7 +171,10 @@ class WOSRecord(ExtendedRecord):
                     infile.write(value + '\n')
             infile.write("ER\n")
 
-def recordParser(paper):
+#The lines of skipped fields are appended here and never read
+_skippedLines = collections.deque(maxlen = 0)
+
+def recordParser(paper, keptTags = None, droppedTags = None):
     """This is function that is used to create [Records](../classes/Record.html#metaknowledge.Record) from files.
 
     **recordParser**() reads the file _paper_ until it reaches 'ER'. For each field tag it adds an entry to the returned dict with the tag as the key and a list of the entries as the value, the list has each line separately, so for the following two lines in a record:
@@ -161,6 +192,14 @@ def recordParser(paper):
 
     > An open file, with the current line at the beginning of the WOS record.
 
+    _keptTags_ : `optional [set[str]]`
+
+    > Default `None`, if given only the fields whose tags are in _keptTags_ are stored, the lines of the others are skipped
+
+    _droppedTags_ : `optional [set[str]]`
+
+    > Default `None`, must be given with _keptTags_, the tags that were skipped are added to it
+
     # Returns
 
     `OrderedDict[str : List[str]]`
@@ -184,14 +223,19 @@ def recordParser(paper):
         elif '   ' in l[1][:3]: #the string is three spaces in row
             #No new tag append line to current tag (last tag in tagList)
             tagList[-1][1].append(l[1][3:-1])
-        else:
+        elif keptTags is None or l[1][:2] in keptTags:
             #New tag create new entry at the end of tagList
             tagList.append((l[1][:2], [l[1][3:-1]]))
+        else:
+            #Skipped tags are still listed so duplicates are found
+            tagList.append((l[1][:2], _skippedLines))
     if not doneReading:
         raise BadWOSRecord("End of file reached before ER: {}".format(l[1]))
     else:
         retdict = collections.OrderedDict(tagList)
         if len(retdict) == len(tagList):
+            if keptTags is not None:
+                _projectFieldDict(retdict, keptTags, droppedTags)
             return retdict
         else:
             dupSet = set()
@@ -199,3 +243,119 @@ def recordParser(paper):
                 if tupl[0] in retdict:
                     dupSet.add(tupl[0])
             raise BadWOSRecord("Duplicate tags (" + ', '.join(dupSet) + ") in record")
+
+#A tag line, as found in files the lazy parser of wosParser() accepts
+_tagFinder = re.compile(rb'\n([!-~][!-~]) ')
+
+#The end of a field, a newline that is not followed by a continuation line
+_fieldEnd = re.compile(rb'\n(?! )')
+
+#The most recently used LazySourceFiles mapped to the mappings of their files,
+#the number is kept well below the usual limits on open file descriptors
+_mappedFiles = collections.OrderedDict()
+_maxMappedFiles = 128
+
+class LazySourceFile(object):
+    """The file the fields of [LazyFieldDicts](#metaknowledge.WOS.recordWOS.LazyFieldDict) are read from, one is shared by all the records from a file.
+
+    The size and modification time of the file are saved when it is created and checked each time a field is read. The file is mapped into memory when a field is first read, the most recently used files are kept mapped.
+    """
+    __slots__ = ('fileName', 'fileSize', 'fileMTime')
+
+    def __init__(self, fileName):
+        fileStats = os.stat(fileName)
+        self.fileName = fileName
+        self.fileSize = fileStats.st_size
+        self.fileMTime = fileStats.st_mtime_ns
+
+    def __getstate__(self):
+        return (self.fileName, self.fileSize, self.fileMTime)
+
+    def __setstate__(self, state):
+        self.fileName, self.fileSize, self.fileMTime = state
+
+    def data(self):
+        fileStats = os.stat(self.fileName)
+        if fileStats.st_size != self.fileSize or fileStats.st_mtime_ns != self.fileMTime:
+            raise BadWOSRecord("The file '{}' has been modified since its records were read, their fields can no longer be loaded".format(self.fileName))
+        try:
+            data = _mappedFiles[self]
+        except KeyError:
+            with open(self.fileName, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            _mappedFiles[self] = data
+            while len(_mappedFiles) > _maxMappedFiles:
+                _mappedFiles.popitem(last = False)[1].close()
+        else:
+            _mappedFiles.move_to_end(self)
+        return data
+
+class LazyFieldDict(collections.abc.Mapping):
+    """A read only mapping with the same contents as the dict [recordParser()](#metaknowledge.WOS.recordWOS.recordParser) produces, but only the location of the record in its file is kept in memory.
+
+    Each time a tag is looked up only that field is read from the file and split into lines, so a `WOSRecord` made from one uses very little memory until its fields are used. The processed values of the fields are still saved by the `WOSRecord`.
+
+    They are made by [wosParser()](#metaknowledge.WOS.wosHandlers.wosParser) when _lazy_ is `True`, the file must have passed the checks of its lazy parser, as the fields are found by scanning the bytes of the record. The file should not be modified while the records are in use, if it is a `BadWOSRecord` is raised when a field is read.
+
+    # Parameters
+
+    _source_ : `LazySourceFile`
+
+    > The file the record is in
+
+    _start_ : `int`
+
+    > The offset of the newline before the record's first line
+
+    _end_ : `int`
+
+    > The offset after the newline at the end of the record's last line, the `'ER'` line is not included
+
+    _wosNum_ : `str or None`
+
+    > The first line of the record's `'UT'` field, its WOS number, or `None` if it has none. This is found when the file is read so the `WOSRecord` can be made without reading the file again
+    """
+    __slots__ = ('_source', '_start', '_end', 'wosNum')
+
+    def __init__(self, source, start, end, wosNum):
+        self._source = source
+        self._start = start
+        self._end = end
+        self.wosNum = wosNum
+
+    def __getstate__(self):
+        return (self._source, self._start, self._end, self.wosNum)
+
+    def __setstate__(self, state):
+        self._source, self._start, self._end, self.wosNum = state
+
+    def _findTag(self, data, tag):
+        #The offset of the newline before the tag's line or -1
+        if not isinstance(tag, str) or len(tag) != 2 or not tag.isascii() or not tag.isprintable() or ' ' in tag:
+            return -1
+        return data.find(b'\n' + tag.encode('ascii') + b' ', self._start, self._end)
+
+    def __getitem__(self, tag):
+        data = self._source.data()
+        tagPos = self._findTag(data, tag)
+        if tagPos == -1:
+            raise KeyError(tag)
+        valueStart = tagPos + 4
+        valueEnd = _fieldEnd.search(data, valueStart, self._end).start()
+        try:
+            return data[valueStart:valueEnd].decode('utf-8').split('\n   ')
+        except UnicodeDecodeError:
+            raise BadWOSRecord("The '{}' field in '{}' is not valid utf-8".format(tag, self._source.fileName))
+
+    def __iter__(self):
+        for tag in _tagFinder.findall(self._source.data(), self._start, self._end):
+            yield tag.decode('ascii')
+
+    def __len__(self):
+        return len(_tagFinder.findall(self._source.data(), self._start, self._end))
+
+    def __contains__(self, tag):
+        return self._findTag(self._source.data(), tag) != -1
+
+    def copy(self):
+        return LazyFieldDict(self._source, self._start, self._end, self.wosNum)
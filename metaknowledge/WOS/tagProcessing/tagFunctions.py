@@ -1,6 +1,6 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
 from .helpFuncs import getMonth
-from ...citation import Citation
+from ...citation import citationFromString
 
 import collections
 
@@ -518,12 +518,12 @@ def citations(val):
 
     ` list[metaknowledge.Citation]`
 
-    > A list of Citations
+    > A list of Citations, identical citation strings share the same Citation
 
     """
     retCites = []
     for c in val:
-        retCites.append(Citation(c))
+        retCites.append(citationFromString(c))
     return retCites
 
 def publisherCity(val):
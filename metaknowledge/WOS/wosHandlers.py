@@ -1,6 +1,9 @@
 import itertools
+import mmap
+import re
 
-from .recordWOS import WOSRecord
+from .recordWOS import WOSRecord, LazyFieldDict, LazySourceFile, _tagFinder
+from ..mkRecord import _keptTagSet
 from ..mkExceptions import cacheError, BadWOSFile, BadWOSRecord
 
 def isWOSFile(infile, checkedLines = 3):
@@ -33,7 +36,7 @@ def isWOSFile(infile, checkedLines = 3):
     else:
         return False
 
-def wosParser(isifile):
+def wosParser(isifile, lazy = False, onlyTheseTags = None):
     """This is a function that is used to create [RecordCollections](../classes/RecordCollection.html#metaknowledge.RecordCollection) from files.
 
     **wosParser**() reads the file given by the path isifile, checks that the header is correct then reads until it reaches EF. All WOS records it encounters are parsed with [recordParser()](#metaknowledge.WOS.recordWOS.recordParser) and converted into [Records](../classes/Record.html#metaknowledge.Record). A list of these `Records` is returned.
@@ -46,12 +49,31 @@ def wosParser(isifile):
 
     > The path to the target file
 
+    _lazy_ : `optional [bool]`
+
+    > Default `False`, if `True` the records only keep their WOS number and the location of their fields in _isifile_, each field is read from the file when it is first used, see [LazyFieldDict](#metaknowledge.WOS.recordWOS.LazyFieldDict). This greatly reduces the memory used by records whose fields are mostly never looked at. Only the layout of the lines is checked when the file is read, so a field that is not valid utf-8 raises a `BadWOSRecord` when it is used. Files with formatting problems are read normally.
+
+    _onlyTheseTags_ : `optional [iterable[str]]`
+
+    > Default `None`, if given only the fields with these tags (or long names) are kept, along with the WOS number, the rest are skipped while reading and the records list them in their `droppedTags`. Not used if _lazy_ is `True` as then fields are only read when they are used.
+
     # Returns
 
     `List[Record]`
 
     > All the `Records` found in _isifile_
     """
+    if lazy:
+        lazyResult = _lazyWOSParser(isifile)
+        if lazyResult is not None:
+            return lazyResult
+        keptTags = None
+    else:
+        keptTags = _keptTagSet(onlyTheseTags, WOSRecord, ['UT'])
+    return _lineWOSParser(isifile, keptTags = keptTags)
+
+def _lineWOSParser(isifile, keptTags = None):
+    """The line by line parser used by [wosParser()](#metaknowledge.WOS.wosHandlers.wosParser), it reads the file in text mode and handles all the ways a file can be damaged."""
     plst = set()
     error = None
     try:
@@ -71,7 +93,7 @@ def wosParser(isifile):
                     continue
                 else:
                     try:
-                        plst.add(WOSRecord(itertools.chain([line], f), sFile = isifile, sLine = line[0]))
+                        plst.add(WOSRecord(itertools.chain([line], f), sFile = isifile, sLine = line[0], keptTags = keptTags))
                     except BadWOSFile as e:
                         try:
                             s = f.__next__()[1]
@@ -99,3 +121,112 @@ def wosParser(isifile):
         if isinstance(error, KeyboardInterrupt):
             raise error
         return plst, error
+
+#Tags are limited to printable ASCII so LazyFieldDict can find them in the bytes
+_tagLine = re.compile(r'[!-~][!-~] ')
+#The start of a line that is neither a tag line nor a continuation line
+_oddLine = re.compile(rb'\n(?!   |[!-~][!-~] )')
+
+def _lazyRecordCheck(recordText):
+    """Checks the text of a record, without its ER line, the same way [recordParser()](#metaknowledge.WOS.recordWOS.recordParser) reads its lines, so its [LazyFieldDict](#metaknowledge.WOS.recordWOS.LazyFieldDict) has the same fields as the line parser's record.
+
+    Returns `True` if the record is perfectly formatted and `False` if a tag line is malformed, the line parser skips these records. Returns `None` for anything else so the file can be handled by the line parser.
+    """
+    perfect = True
+    tags = set()
+    #The text ends with a newline so the last piece is empty
+    for line in recordText.split('\n')[:-1]:
+        if len(line) < 2:
+            return None
+        elif len(line) == 2 or line[2] != ' ':
+            return False
+        elif line[:3] != '   ':
+            tag = line[:2]
+            if tag in tags or not _tagLine.match(line):
+                #The line parser's error is only raised after a malformed line would be found
+                perfect = False
+            tags.add(tag)
+    return True if perfect else None
+
+def _lazyWOSParser(isifile):
+    """The parser used by [wosParser()](#metaknowledge.WOS.wosHandlers.wosParser) when _lazy_ is `True`, the file is memory mapped and the records are found by scanning the bytes for the lines starting with `'ER'`. The records are made from [LazyFieldDicts](#metaknowledge.WOS.recordWOS.LazyFieldDict) pointing at their bytes.
+
+    Only the structure of the records' lines is checked, their fields are not decoded until they are used and the file is not kept open. Only files that are perfectly formatted are read, if anything unusual is found `None` is returned and the file should be read with the line by line parser, so the fields and errors are the same as the line parser's.
+    """
+    try:
+        with open(isifile, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        #Empty files cannot be mapped
+        return None
+    with data:
+        if data.find(b'\r') != -1:
+            return None
+        start = 3 if data[:3] == b'\xef\xbb\xbf' else 0
+        versionPos = data.find(b'VR 1.0', start)
+        headerEnd = data.find(b'\n', versionPos)
+        if versionPos == -1 or headerEnd == -1:
+            return None
+        try:
+            data[start:headerEnd].decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        plst = set()
+        source = LazySourceFile(isifile)
+        pos = headerEnd + 1
+        lineNum = data[:pos].count(b'\n')
+        dataLen = len(data)
+        while True:
+            if pos >= dataLen:
+                #The file ended before EF
+                return None
+            lineEnd = data.find(b'\n', pos)
+            if lineEnd == -1:
+                lineEnd = dataLen - 1
+            if data[pos:pos + 2] == b'EF':
+                if lineEnd + 1 < dataLen:
+                    #Something after EF
+                    return None
+                break
+            try:
+                lineStr = data[pos:lineEnd + 1].decode('utf-8')
+            except UnicodeDecodeError:
+                return None
+            if lineStr.isspace():
+                pos = lineEnd + 1
+                lineNum += 1
+                continue
+            if lineStr[:2] == 'ER' or lineStr[0] == ' ':
+                return None
+            recordEnd = data.find(b'\nER', pos)
+            if recordEnd == -1:
+                return None
+            erEnd = data.find(b'\n', recordEnd + 1)
+            if erEnd == -1:
+                return None
+            #The record starts after the newline at pos - 1 and ends with the newline at recordEnd
+            if _oddLine.search(data, pos - 1, recordEnd) is None:
+                #Only tag and continuation lines so just the tags need checking, the fields are not decoded
+                tags = _tagFinder.findall(data, pos - 1, recordEnd + 1)
+                recordCheck = True if len(tags) == len(set(tags)) else None
+            else:
+                try:
+                    recordCheck = _lazyRecordCheck(data[pos:recordEnd + 1].decode('utf-8'))
+                except UnicodeDecodeError:
+                    return None
+            if recordCheck is None:
+                return None
+            elif recordCheck:
+                utPos = data.find(b'\nUT ', pos - 1, recordEnd)
+                if utPos == -1:
+                    wosNum = None
+                else:
+                    try:
+                        wosNum = data[utPos + 4:data.find(b'\n', utPos + 1)].decode('utf-8')
+                    except UnicodeDecodeError:
+                        return None
+                plst.add(WOSRecord(LazyFieldDict(source, pos - 1, recordEnd + 1, wosNum), sFile = isifile, sLine = lineNum))
+            #The record's lines and its ER line
+            lineNum += data[pos:recordEnd + 1].count(b'\n') + 1
+            pos = erEnd + 1
+    return plst, None
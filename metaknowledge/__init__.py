@@ -34,16 +34,17 @@ from .constants import VERBOSE_MODE, __version__, commonRecordFields, FAST_CITES
 from .mkExceptions import BadCitation, BadGrant, BadInputFile, BadProQuestFile, BadProQuestRecord, BadPubmedFile, BadPubmedRecord, BadRecord, BadWOSFile, BadWOSRecord, CollectionTypeError, GrantCollectionException, RCTypeError, RCValueError, RecordsNotCompatible, UnknownFile, cacheError, mkException, TagError, BadScopusRecord
 
 from .graphHelpers import writeEdgeList, writeNodeAttributeFile, writeGraph, readGraph, dropEdges, dropNodesByDegree, dropNodesByCount, mergeGraphs, graphStats, writeTnetFile
-from .diffusion import diffusionGraph, diffusionCount, diffusionAddCountsFromSource
+from .diffusion import diffusionGraph, diffusionCount, diffusionMatrix, diffusionAddCountsFromSource
 
-from .citation import Citation, filterNonJournals
-from .mkCollection import Collection, CollectionWithIDs
+from .citation import Citation, filterNonJournals, classifyJournals, citationFromString, setCitationCacheSize, citationCacheStats, clearCitationCache
+from .mkCollection import Collection, CollectionWithIDs, reduceCounts, reduceGraphs, reduceLists
 from .mkRecord import Record, ExtendedRecord
 
 from .grantCollection import GrantCollection
 from .grants import NSERCGrant, CIHRGrant, MedlineGrant, NSFGrant, Grant, FallbackGrant
 
 from .recordCollection import RecordCollection
+from .recordStreaming import iterRecords, streamRankedSeries, streamLocalCiteStats, streamRPYS
 from .WOS import WOSRecord
 from .medline import MedlineRecord
 from .proquest import ProQuestRecord
@@ -0,0 +1,166 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Helpers for writing `Records` as [Apache Arrow](https://arrow.apache.org/) tables, each tag is a typed column and tags with many values are list columns.
+
+These depend on [pyarrow](https://arrow.apache.org/docs/python/), which is only imported when the helpers are used.
+"""
+import itertools
+
+from .citation import Citation
+
+def _importArrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Arrow export requires pyarrow, it can be installed with 'pip install metaknowledge[arrow]'. The error was: {}".format(e)) from None
+    return pyarrow, pyarrow.parquet
+
+def valueKind(value):
+    """Gives the kind of column a value is stored in, one of `'list'`, `'bool'`, `'int'`, `'float'` or `'string'`
+
+    # Parameters
+
+    _value_ : `object`
+
+    > A value of a tag, not `None`
+
+    # Returns
+
+    `str`
+
+    > The kind of column
+    """
+    if isinstance(value, (list, tuple, set)):
+        return 'list'
+    elif isinstance(value, bool):
+        return 'bool'
+    elif isinstance(value, int):
+        return 'int'
+    elif isinstance(value, float):
+        return 'float'
+    else:
+        return 'string'
+
+def combineKinds(kind1, kind2):
+    """Gives the kind of column that can hold the values of both kinds, numbers are widened and other mixes become strings, or lists if one is a list
+
+    # Parameters
+
+    _kind1_ : `str or None`
+
+    > A kind, `None` if there are no values yet
+
+    _kind2_ : `str`
+
+    > Another kind
+
+    # Returns
+
+    `str`
+
+    > The combined kind
+    """
+    if kind1 is None or kind1 == kind2:
+        return kind2
+    elif 'list' in (kind1, kind2):
+        return 'list'
+    elif {kind1, kind2} <= {'bool', 'int'}:
+        return 'int'
+    elif {kind1, kind2} <= {'bool', 'int', 'float'}:
+        return 'float'
+    else:
+        return 'string'
+
+def arrowType(kind):
+    """Gives the pyarrow type of a kind of column from [valueKind()](#metaknowledge.arrowExport.valueKind), lists are lists of strings
+
+    # Parameters
+
+    _kind_ : `str`
+
+    > The kind of column
+
+    # Returns
+
+    `pyarrow.DataType`
+
+    > The type of the column
+    """
+    pyarrow, parquet = _importArrow()
+    return {
+        'list' : pyarrow.list_(pyarrow.string()),
+        'bool' : pyarrow.bool_(),
+        'int' : pyarrow.int64(),
+        'float' : pyarrow.float64(),
+        'string' : pyarrow.string(),
+    }[kind]
+
+def _entryString(entry):
+    if isinstance(entry, str):
+        return entry
+    elif isinstance(entry, Citation):
+        #Citations made when FAST_CITES is set do not keep their strings
+        return getattr(entry, 'original', None) or entry.ID()
+    else:
+        return str(entry)
+
+def arrowValue(value, kind):
+    """Converts _value_ to be put in a column of _kind_, from [combineKinds()](#metaknowledge.arrowExport.combineKinds). Entries of lists are made into strings, Citations are given as their original strings and scalars in list columns become one entry lists.
+
+    # Parameters
+
+    _value_ : `object`
+
+    > A value of a tag, or `None` if it is missing
+
+    _kind_ : `str`
+
+    > The kind of the column
+
+    # Returns
+
+    `object`
+
+    > The converted value
+    """
+    if value is None:
+        return None
+    elif kind == 'list':
+        if isinstance(value, (list, tuple, set)):
+            return [_entryString(e) for e in value]
+        else:
+            return [_entryString(value)]
+    elif kind == 'string':
+        return _entryString(value)
+    elif kind == 'int':
+        return int(value)
+    elif kind == 'float':
+        return float(value)
+    else:
+        return value
+
+def batched(items, batchSize):
+    """Yields lists of _batchSize_ of _items_, the last one can be shorter
+
+    # Parameters
+
+    _items_ : `iterable`
+
+    > The items to be batched
+
+    _batchSize_ : `int`
+
+    > The number of items in each batch
+
+    # Returns
+
+    `generator[list]`
+
+    > The batches
+    """
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batchSize))
+        if not batch:
+            return
+        yield batch
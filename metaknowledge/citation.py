@@ -5,16 +5,42 @@ try:
 except ImportError:
     import collections
     collections.abc = collections
+import collections
 import re
+import sys
 
 from .mkExceptions import BadCitation
-from .journalAbbreviations import getj9dict, abrevDBname, manualDBname, addToDB
+from .journalAbbreviations import getj9Lookup, abrevDBname, manualDBname, addToDB
 
 import metaknowledge
 
-#For journalAbbreviations, to reduce the number of times we read the dict
+#For journalAbbreviations, the lookup is opened on first use and shared by all Citations
 abbrevDict = None
 
+#The errors of bad Citations are shared as they are never raised
+_wosRegexError = BadCitation("Regex parsing failed.")
+_scopusRegexError = BadCitation("Regex parsing failed on a Scopus Citation this means the Citation is likely for a non-journal.")
+_partialMatchError = BadCitation("The citation did not fully match the expected pattern")
+_incompleteError = BadCitation("Not a complete set of author, year and journal")
+
+#Only the small ints are cached by python
+_years = {}
+
+def _sharedYear(year):
+    return _years.setdefault(year, year)
+
+#The Citations made by citationFromString(), in least recently used order
+_citationCache = collections.OrderedDict()
+_citationCacheMaxSize = 100000
+_citationCacheHits = 0
+_citationCacheMisses = 0
+
+def _internOrNone(s):
+    #Authors, journals, volumes and pages are repeated across many Citations
+    if s is None:
+        return None
+    return sys.intern(s)
+
 class Citation(collections.abc.Hashable):
     """A class to hold citation strings and allow for comparison between them.
 
@@ -38,6 +64,8 @@ class Citation(collections.abc.Hashable):
 
     Citation's hashing and equality checking are based on [ID()](#metaknowledge.citation.Citation.ID) and use the values of `author`, `year` and `journal`.
 
+    To keep large numbers of them small, Citations use `__slots__` so other attributes cannot be added to them, the `author`, `journal`, `V` and `P` strings and the id are interned and the hash is computed when they are created.
+
     When converted to a string a Citation will return the original string.
 
     # Attributes
@@ -65,26 +93,30 @@ class Citation(collections.abc.Hashable):
 
     #(.*?, )?[^,(]*\((\d{2,5}\))[^,]*(, [^,(]*( \(\d+\))?)?(, (p?p\. .*))?")
 
+    #Citations are very numerous so they do not have a __dict__, the fields
+    #that a citation is missing are left unset so hasattr() works as before
+    __slots__ = ('author', 'extraAuthors', 'name', 'year', 'journal', 'V', 'issue', 'P', 'DOI', 'misc', 'bad', 'error', '_id', '_hash', 'original')
+
     def __init__(self, cite, scopusMode = False):
         #save original
         #setup attributes
         #Nunez R., 1998, MATH COGNITION, V4, P85, DOI 10.1080/135467998387343
         #Author, Year, Journal, Volume, Page, DOI
         if scopusMode:
-            regex = re.match(self.scopusCiteRegex, cite.upper())
+            regex = self.scopusCiteRegex.match(cite.upper())
             if regex is None:
                 self.bad = True
-                self.error = BadCitation("Regex parsing failed on a Scopus Citation this means the Citation is likely for a non-journal.")
+                self.error = _scopusRegexError
                 self._id = cite
             else:
-                self.author = regex.group(1)
+                self.author = _internOrNone(regex.group(1))
                 self.extraAuthors = regex.group(2)
                 self.name = regex.group(4)
-                self.year = int(regex.group(5))
-                self.journal = regex.group(6)
-                self.V = regex.group(8)
+                self.year = _sharedYear(int(regex.group(5)))
+                self.journal = _internOrNone(regex.group(6))
+                self.V = _internOrNone(regex.group(8))
                 self.issue = regex.group(10)
-                self.P = regex.group(12)
+                self.P = _internOrNone(regex.group(12))
                 self.misc = regex.group(13)
                 if self.author and self.journal and self.year:
                     self.bad = False
@@ -92,7 +124,7 @@ class Citation(collections.abc.Hashable):
                     self._id =  "{0}, {1}, {2}".format(self.author, self.year, self.journal)
                 else:
                     self.bad = True
-                    self.error = BadCitation("Not a complete set of author, year and journal")
+                    self.error = _incompleteError
                     atrLst = []
                     if self.author:
                         atrLst.append(self.author)
@@ -102,27 +134,27 @@ class Citation(collections.abc.Hashable):
                         atrLst.append(self.journal)
                     self._id =  ', '.join(atrLst)
         else:
-            regex = re.match(self.wosCiteRegex, cite.upper())
+            regex = self.wosCiteRegex.match(cite.upper())
             if regex is None:
                 self.bad = True
-                self.error = BadCitation("Regex parsing failed.")
+                self.error = _wosRegexError
             try:
-                self.author = regex.group(1).replace('.', '').title()
+                self.author = sys.intern(regex.group(1).replace('.', '').title())
             except AttributeError:
                 self.author = None
             try:
-                self.year = int(regex.group(3))
+                self.year = _sharedYear(int(regex.group(3)))
             except TypeError:
                 self.year = None
-            self.journal = regex.group(5)
-            self.V = regex.group(7)
-            self.P = regex.group(9)
+            self.journal = _internOrNone(regex.group(5))
+            self.V = _internOrNone(regex.group(7))
+            self.P = _internOrNone(regex.group(9))
             self.DOI = regex.group(11)
             if regex.group(12) is not None:
                 self.misc = regex.group(12)
                 self.DOI = regex.group(15)
                 self.bad = True
-                self.error = BadCitation("The citation did not fully match the expected pattern")
+                self.error = _partialMatchError
                 atrLst = []
                 if self.author:
                     atrLst.append(self.author)
@@ -134,7 +166,7 @@ class Citation(collections.abc.Hashable):
             elif self.author is None or self.year is None or self.journal is None:
                 self.bad = True
                 self.misc = None
-                self.error = BadCitation("Not a complete set of author, year and journal")
+                self.error = _incompleteError
                 atrLst = []
                 if self.author:
                     atrLst.append(self.author)
@@ -148,10 +180,23 @@ class Citation(collections.abc.Hashable):
                 self.error = None
                 self.misc = None
                 self._id =  "{0}, {1}, {2}".format(self.author, self.year, self.journal)
+        #Equal citations share their id
+        self._id = sys.intern(self._id)
+        self._hash = hash(self._id)
         if not metaknowledge.FAST_CITES:
             self.original = cite
-        else:
-            self = self._id
+
+    def __getstate__(self):
+        return {attr : getattr(self, attr) for attr in self.__slots__ if hasattr(self, attr)}
+
+    def __setstate__(self, state):
+        #Also reads the pickles of Citations from before they had __slots__
+        if isinstance(state, tuple):
+            state = state[1]
+        for attr, value in state.items():
+            setattr(self, attr, value)
+        if not hasattr(self, '_hash'):
+            self._hash = hash(self._id)
 
     def __str__(self):
         """
@@ -170,24 +215,20 @@ class Citation(collections.abc.Hashable):
             return "<metaknowledge.{} object {}>".format(type(self).__name__, self.ID())
         else:
             return "<metaknowledge.{} object {}>".format(type(self).__name__, self.original)
-    #@profile
+
     def __hash__(self):
         """
-        A hash for Citation that should be equal to the hash of other citations that are equal to it. Based on the values returned by [ID()](#metaknowledge.citation.Citation.ID).
+        A hash for Citation that should be equal to the hash of other citations that are equal to it. Based on the values returned by [ID()](#metaknowledge.citation.Citation.ID), it is computed when the Citation is created.
         """
-        try:
-            return self._hash
-        except AttributeError:
-            self._hash = hash(self.ID())
-            return self._hash
-    #@profile
+        return self._hash
+
     def __eq__(self, other):
         """
         First checks DOI for equality then checks each attribute if any are not equal False is returned
         """
         if not isinstance(other, Citation):
             return NotImplemented
-        return hash(self) == hash(other)
+        return self._hash == other._hash
 
 
     def isAnonymous(self):
@@ -265,7 +306,7 @@ class Citation(collections.abc.Hashable):
 
         **Note**: Requires the [j9Abbreviations](../modules/journalAbbreviations.html#metaknowledge.journalAbbreviations.backend.getj9dict) database file and will raise an error if it cannot be found.
 
-        **Note**: All parameters are used for getting the data base with [getj9dict](../modules/journalAbbreviations.html#metaknowledge.journalAbbreviations.backend.getj9dict).
+        **Note**: All parameters are used for getting the data base with [getj9Lookup](../modules/journalAbbreviations.html#metaknowledge.journalAbbreviations.backend.getj9Lookup).
 
         # Parameters
 
@@ -289,7 +330,7 @@ class Citation(collections.abc.Hashable):
         """
         global abbrevDict
         if abbrevDict is None:
-            abbrevDict = getj9dict(dbname = dbname, manualDB = manualDB, returnDict = returnDict)
+            abbrevDict = getj9Lookup(dbname = dbname, manualDB = manualDB, returnDict = returnDict)
         if not hasattr(self, 'journal'):
             return False
         elif checkIfExcluded and self.journal:
@@ -323,7 +364,7 @@ class Citation(collections.abc.Hashable):
         """
         global abbrevDict
         if abbrevDict is None:
-            abbrevDict = getj9dict()
+            abbrevDict = getj9Lookup()
         if self.isJournal():
             return abbrevDict[self.journal][0]
         else:
@@ -359,7 +400,9 @@ class Citation(collections.abc.Hashable):
         except KeyError:
             raise KeyError("This citation does not have a journal field.")
         else:
-            abbrevDict.update(d)
+            #If the lookup has not been opened it will read the manual database when it is
+            if abbrevDict is not None:
+                abbrevDict.update(d)
 
 def filterNonJournals(citesLst, invert = False):
     """Removes the `Citations` from _citesLst_ that are not journals
@@ -381,11 +424,131 @@ def filterNonJournals(citesLst, invert = False):
     > A filtered list of Citations from _citesLst_
     """
 
-    retCites = []
-    for c in citesLst:
-        if c.isJournal():
-            if not invert:
-                retCites.append(c)
-        elif invert:
-            retCites.append(c)
-    return retCites
+    return [c for c, isJourn in zip(citesLst, classifyJournals(citesLst)) if isJourn != invert]
+
+def classifyJournals(citations, known = None, dbname = abrevDBname, manualDB = manualDBname, returnDict ='both'):
+    """Checks which of _citations_ are for journals, like [Citation.isJournal()](#metaknowledge.citation.Citation.isJournal) does for one. Each distinct journal is only looked up once, so this is much faster than calling `isJournal()` on each of a long list of citations.
+
+    **Note**: Requires the [j9Abbreviations](../modules/journalAbbreviations.html#metaknowledge.journalAbbreviations.backend.getj9dict) database file and will raise an error if it cannot be found.
+
+    # Parameters
+
+    _citations_ : `iterable [Citation or str]`
+
+    > The citations to be checked, journal abbreviations can be given instead of Citations, `None` or the empty string are not journals
+
+    _known_ : `optional [dict[str : bool]]`
+
+    > Default `None`, journals that have already been checked mapped to if they are journals, the new ones are added to it. Giving the same `dict` to multiple calls means journals are only looked up by the first
+
+    _dbname_ : `optional [str]`
+
+    > The name of the downloaded database file, the default is determined at run time. It is recommended that this remain untouched.
+
+    _manualDB_ : `optional [str]`
+
+    > The name of the manually created database file, the default is determined at run time. It is recommended that this remain untouched.
+
+    _returnDict_ : `optional [str]`
+
+    > default `'both'`, can be used to get both databases or only one  with `'WOS'` or `'manual'`.
+
+    # Returns
+
+    `list [bool]`
+
+    > `True` for each of the _citations_ that is for a journal
+    """
+    global abbrevDict
+    if abbrevDict is None:
+        abbrevDict = getj9Lookup(dbname = dbname, manualDB = manualDB, returnDict = returnDict)
+    if known is None:
+        known = {}
+    journals = [c if c is None or isinstance(c, str) else getattr(c, 'journal', None) for c in citations]
+    for journal in set(journals).difference(known):
+        known[journal] = bool(journal) and bool(abbrevDict.get(journal, [''])[0])
+    return [known[journal] for journal in journals]
+
+def citationFromString(cite):
+    """Returns the [Citation](#metaknowledge.citation.Citation) of the WOS citation string _cite_, taking it from a shared cache if the same string has been parsed before.
+
+    The same references appear in the CR fields of many records, so this is what the WOS Records use to make their citations. Repeated strings skip the parsing and all give the same Citation object, so the Citations should not be modified. The cache keeps the most recently used strings, its size can be changed with [setCitationCacheSize()](#metaknowledge.citation.setCitationCacheSize).
+
+    # Parameters
+
+    _cite_ : `str`
+
+    > A str containing a WOS style citation
+
+    # Returns
+
+    `Citation`
+
+    > The Citation of _cite_
+    """
+    global _citationCacheHits, _citationCacheMisses
+    try:
+        C = _citationCache[cite]
+    except KeyError:
+        _citationCacheMisses += 1
+        C = Citation(cite)
+        if _citationCacheMaxSize != 0:
+            _citationCache[cite] = C
+            if _citationCacheMaxSize is not None and len(_citationCache) > _citationCacheMaxSize:
+                _citationCache.popitem(last = False)
+    else:
+        _citationCacheHits += 1
+        _citationCache.move_to_end(cite)
+    return C
+
+def _shareCitation(C, cite):
+    """Returns the cached Citation of the WOS citation string _cite_, adding _C_, its Citation, to the cache if there is none. This is for Citations made in other processes, so repeated ones are still one object."""
+    try:
+        return _citationCache[cite]
+    except KeyError:
+        if _citationCacheMaxSize != 0:
+            _citationCache[cite] = C
+            if _citationCacheMaxSize is not None and len(_citationCache) > _citationCacheMaxSize:
+                _citationCache.popitem(last = False)
+        return C
+
+def setCitationCacheSize(maxSize):
+    """Sets the maximum number of Citations kept by [citationFromString()](#metaknowledge.citation.citationFromString), if there are more than _maxSize_ cached the least recently used ones are dropped.
+
+    # Parameters
+
+    _maxSize_ : `int or None`
+
+    > The number of Citations to keep, `None` keeps all of them and `0` turns the cache off. The default is `100000`
+    """
+    global _citationCacheMaxSize
+    if maxSize is not None:
+        if not isinstance(maxSize, int) or maxSize < 0:
+            raise ValueError("maxSize must be a non-negative int or None, not {!r}".format(maxSize))
+        while len(_citationCache) > maxSize:
+            _citationCache.popitem(last = False)
+    _citationCacheMaxSize = maxSize
+
+def citationCacheStats():
+    """Gives the state of the cache used by [citationFromString()](#metaknowledge.citation.citationFromString)
+
+    # Returns
+
+    `dict[str : int]`
+
+    > A dict with the number of cache `'hits'` and `'misses'` since it was last cleared, the current `'size'` and the `'maxSize'`
+    """
+    return {
+        'hits' : _citationCacheHits,
+        'misses' : _citationCacheMisses,
+        'size' : len(_citationCache),
+        'maxSize' : _citationCacheMaxSize,
+    }
+
+def clearCitationCache():
+    """Empties the cache used by [citationFromString()](#metaknowledge.citation.citationFromString) and resets its hit and miss counts
+    """
+    global _citationCacheHits, _citationCacheMisses
+    _citationCache.clear()
+    _citationCacheHits = 0
+    _citationCacheMisses = 0
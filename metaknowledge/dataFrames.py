@@ -0,0 +1,156 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Helpers for making [pandas](https://pandas.pydata.org/) `DataFrames` from `Records` a value at a time, without making a list of each column first.
+
+These depend on pandas, which is only imported when the helpers are used.
+"""
+
+def _importPandas():
+    try:
+        import numpy
+        import pandas
+    except ImportError as e:
+        raise ImportError("DataFrames require pandas, it can be installed with 'pip install metaknowledge[pandas]'. The error was: {}".format(e)) from None
+    return numpy, pandas
+
+class ColumnBuilder(object):
+    """A column of a `DataFrame` filled one value at a time, the array for the column is made with the first value and is typed by it.
+
+    Integers, floats and booleans are stored in numpy arrays with a mask of the missing values, integers become floats if a float is added. Strings are stored as codes into a list of the distinct strings, so a repeated string is only stored once, and can be given as a `Categorical`. Anything else, like lists, or a mix of types is stored in an object array as is.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _length_ : `int`
+
+    > The number of rows
+    """
+    def __init__(self, length):
+        self.length = length
+        #One of None (no values yet), 'int', 'float', 'bool', 'string' or 'object'
+        self.kind = None
+        self.values = None
+        #True for the rows with no values, only used by the numeric kinds
+        self.missing = None
+        #The distinct strings in order and their codes
+        self.categories = None
+        self.categoryCodes = None
+
+    @staticmethod
+    def valueKind(value):
+        if isinstance(value, str):
+            return 'string'
+        elif isinstance(value, bool):
+            return 'bool'
+        elif isinstance(value, int):
+            return 'int'
+        elif isinstance(value, float):
+            return 'float'
+        else:
+            return 'object'
+
+    def _allocate(self, kind):
+        numpy, pandas = _importPandas()
+        self.kind = kind
+        if kind == 'string':
+            self.values = numpy.full(self.length, -1, dtype = numpy.int32)
+            self.categories = []
+            self.categoryCodes = {}
+        elif kind == 'object':
+            self.values = numpy.empty(self.length, dtype = object)
+        else:
+            self.values = numpy.zeros(self.length, dtype = {'int' : numpy.int64, 'float' : numpy.float64, 'bool' : numpy.bool_}[kind])
+            self.missing = numpy.ones(self.length, dtype = numpy.bool_)
+
+    def _toObject(self):
+        numpy, pandas = _importPandas()
+        objValues = numpy.empty(self.length, dtype = object)
+        if self.kind == 'string':
+            present = self.values >= 0
+            objValues[present] = numpy.array(self.categories, dtype = object)[self.values[present]]
+        else:
+            present = ~self.missing
+            #tolist() gives Python numbers, as the other values are
+            for i, val in zip(numpy.flatnonzero(present).tolist(), self.values[present].tolist()):
+                objValues[i] = val
+        self.kind = 'object'
+        self.values = objValues
+        self.missing = None
+        self.categories = None
+        self.categoryCodes = None
+
+    def set(self, index, value):
+        """Puts _value_ in row _index_
+
+        # Parameters
+
+        _index_ : `int`
+
+        > The row
+
+        _value_ : `object`
+
+        > The value, not `None`
+        """
+        kind = self.valueKind(value)
+        if self.kind is None:
+            self._allocate(kind)
+        elif kind != self.kind and self.kind != 'object':
+            if {kind, self.kind} == {'int', 'float'}:
+                self.values = self.values.astype('float64')
+                self.kind = 'float'
+            else:
+                self._toObject()
+        if self.kind == 'string':
+            try:
+                self.values[index] = self.categoryCodes[value]
+            except KeyError:
+                self.values[index] = self.categoryCodes[value] = len(self.categories)
+                self.categories.append(value)
+        elif self.kind == 'object':
+            self.values[index] = value
+        else:
+            try:
+                self.values[index] = value
+            except OverflowError:
+                #Too large for int64
+                self._toObject()
+                self.values[index] = value
+                return
+            self.missing[index] = False
+
+    def finish(self, categorical = None):
+        """Gives the array of the column
+
+        # Parameters
+
+        _categorical_ : `optional [bool]`
+
+        > Default `None`, only used by columns of strings, if `True` the column is given as a `Categorical`, if `False` it is not and if `None` it is when there are at most half as many distinct strings as values
+
+        # Returns
+
+        `numpy.ndarray or pandas.api.extensions.ExtensionArray`
+
+        > The column, integer and boolean columns with missing values use the pandas nullable types and the missing values of float columns are `NaN`
+        """
+        numpy, pandas = _importPandas()
+        if self.kind is None:
+            arr = numpy.empty(self.length, dtype = object)
+        elif self.kind == 'string':
+            if categorical or (categorical is None and 2 * len(self.categories) <= numpy.count_nonzero(self.values >= 0)):
+                return pandas.Categorical.from_codes(self.values, categories = self.categories)
+            #The last entry is for the code -1, the missing values
+            arr = numpy.array(self.categories + [None], dtype = object)[self.values]
+        elif self.kind == 'object':
+            arr = self.values
+        elif self.kind == 'float':
+            arr = self.values
+            arr[self.missing] = numpy.nan
+        elif not self.missing.any():
+            arr = self.values
+        elif self.kind == 'int':
+            arr = pandas.arrays.IntegerArray(self.values, self.missing)
+        else:
+            arr = pandas.arrays.BooleanArray(self.values, self.missing)
+        return arr
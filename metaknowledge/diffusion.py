@@ -5,10 +5,11 @@ import networkx as nx
 from .WOS.tagProcessing.funcDicts import tagsAndNameSet, normalizeToTag
 from .progressBar import _ProgressBar
 from .recordCollection import RecordCollection
+from .sparseNetworks import _importSparse, incidenceMatrix
 
 import metaknowledge
 
-def diffusionGraph(source, target, weighted = True, sourceType = "raw", targetType = "raw", labelEdgesBy = None):
+def diffusionGraph(source, target, weighted = True, sourceType = "raw", targetType = "raw", labelEdgesBy = None, engine = "networkx"):
     """Takes in two [RecordCollections](../classes/RecordCollection.html#metaknowledge.RecordCollection) and produces a graph of the citations of _source_ by the [Records](../classes/Record.html#metaknowledge.Record) in _target_. By default the nodes in the are `Record` objects but this can be changed with the _sourceType_ and _targetType_ keywords. The edges of the graph go from the target to the source.
 
     Each node on the output graph has two boolean attributes, `"source"` and `"target"` indicating if they are targets or sources. Note, if the types of the sources and targets are different the attributes will not be checked for overlap of the other type. e.g. if the source type is `'TI'` (title) and the target type is `'UT'` (WOS number), and there is some overlap of the targets and sources. Then the Record corresponding to a source node will not be checked for being one of the titles of the targets, only its WOS number will be considered.
@@ -45,6 +46,10 @@ def diffusionGraph(source, target, weighted = True, sourceType = "raw", targetTy
 
     > This option will cause the output graph to be an `MultiDiGraph` and is likely to result in parallel edges. If a `Record` has multiple values for at tag (e.g. `'AF'`) the each tag will create its own edge.
 
+    _engine_ : `optional [str]`
+
+    > Default `"networkx"`, if `"matrix"` the citation counts are computed all at once by [diffusionMatrix()](#metaknowledge.diffusion.diffusionMatrix) and the graph is made from them, this is much faster for large collections but requires [scipy](https://www.scipy.org/). Each Record, or each value of the tag for list tags, is one node
+
     # Returns
 
     `networkx Directed Graph or networkx multi Directed Graph`
@@ -62,6 +67,10 @@ def diffusionGraph(source, target, weighted = True, sourceType = "raw", targetTy
             raise RuntimeError ("{} is not a known tag, only tags in tagsAndNameSet are allowed.".format(labelEdgesBy))
         else:
             labelEdgesBy = normVal
+    if engine not in ["networkx", "matrix"]:
+        raise RuntimeError("{} is not an allowed engine, it must be 'networkx' or 'matrix'.".format(engine))
+    if engine == "matrix":
+        return _diffusionGraphMatrix(source, target, weighted, sourceType, targetType, labelEdgesBy)
     count = 0
     maxCount = len(source)
     progArgs = (0, "Starting to make a diffusion network")
@@ -136,7 +145,7 @@ def diffusionGraph(source, target, weighted = True, sourceType = "raw", targetTy
             PBar.finish("Done making a diffusion network of {} sources and {} targets".format(len(source), len(target)))
     return workingGraph
 
-def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandasFriendly = False,  compareCounts = False, numAuthors = True, useAllAuthors = True, _ProgBar = None, extraMapping = None):
+def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandasFriendly = False,  compareCounts = False, numAuthors = True, useAllAuthors = True, _ProgBar = None, extraMapping = None, engine = "networkx"):
     """Takes in two [RecordCollections](../classes/RecordCollection.html#metaknowledge.RecordCollection) and produces a `dict` counting the citations of _source_ by the [Records](../classes/Record.html#metaknowledge.Record) of _target_. By default the `dict` uses `Record` objects as keys but this can be changed with the _sourceType_ keyword to any of the WOS tags.
 
     # Parameters
@@ -171,6 +180,10 @@ def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandas
 
     > default `True`, if `False` only the first author will be used to generate the `Citations` for the _source_ `Records`
 
+    _engine_ : `optional [str]`
+
+    > Default `"networkx"`, if `"matrix"` the counts are computed all at once by [diffusionMatrix()](#metaknowledge.diffusion.diffusionMatrix), which is much faster for large collections but requires [scipy](https://www.scipy.org/)
+
     # Returns
 
     `dict[:int]`
@@ -189,6 +202,8 @@ def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandas
         raise RuntimeError("Source and target must be RecordCollections.")
     if extraValue is not None and not isinstance(extraValue, str):
         raise RuntimeError("{} is not a valid extraValue, only tags are allowed".format(extraValue))
+    if engine not in ["networkx", "matrix"]:
+        raise RuntimeError("{} is not an allowed engine, it must be 'networkx' or 'matrix'.".format(engine))
     if extraMapping is None:
         extraMapping = lambda x : x
     if metaknowledge.VERBOSE_MODE or _ProgBar:
@@ -201,76 +216,13 @@ def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandas
         maxCount = len(source)
     else:
         PBar = _ProgressBar("Starting to analyse a diffusion network", dummy = True)
-    count = 0
-    maxCount = len(source)
-    sourceDict = {}
-    #Tells the function if the IDs are made of lists or of str
-    listIds = None
-
-    for Rs in source:
-        if listIds is None and Rs.get(sourceType) is not None:
-            listIds = isinstance(Rs.get(sourceType), list)
-        count += 1
-        PBar.updateVal(count / maxCount * .10, "Analyzing source: " + str(Rs))
-        RsVal, RsExtras = makeNodeID(Rs, sourceType)
-        if RsVal:
-            if useAllAuthors:
-                for c in Rs.createCitation(multiCite = True):
-                    sourceDict[c] = RsVal
-            else:
-                sourceDict[Rs.createCitation()] = RsVal
-    if extraValue is not None:
-        if listIds:
-            sourceCounts = {s : {targetCountString : 0} for s in itertools.chain.from_iterable(sourceDict.values())}
-        else:
-            sourceCounts = {s : {targetCountString : 0} for s in sourceDict.values()}
+    if engine == "matrix":
+        PBar.updateVal(.10, "Counting the citations of the sources")
+        sourceCounts = _diffusionCountMatrix(source, target, sourceType, extraValue, useAllAuthors, extraMapping, targetCountString)
     else:
-        if listIds:
-            sourceCounts = {s : 0 for s in itertools.chain.from_iterable(sourceDict.values())}
-        else:
-            sourceCounts = {s : 0 for s in sourceDict.values()}
-    count = 0
-    maxCount = len(target)
-    PBar.updateVal(.10, "Done analyzing sources, starting on targets")
-    for Rt in target:
-        count += 1
-        PBar.updateVal(count / maxCount * .90 + .10, "Analyzing target: {}".format(Rt))
-        targetCites = Rt.get('citations', [])
-        if extraValue is not None:
-            values = Rt.get(extraValue, [])
-            if values is None:
-                values = []
-            elif not isinstance(values, list):
-                values = [values]
-            values = [extraMapping(val) for val in values]
-        for c in  targetCites:
-            try:
-                RsourceVals = sourceDict[c]
-            except KeyError:
-                continue
-            if listIds:
-                for sVal in RsourceVals:
-                    if extraValue:
-                        sourceCounts[sVal][targetCountString] += 1
-                        for val in values:
-                            try:
-                                sourceCounts[sVal][val] += 1
-                            except KeyError:
-                                sourceCounts[sVal][val] = 1
-                    else:
-                        sourceCounts[sVal] += 1
-            else:
-                if extraValue:
-                    sourceCounts[RsourceVals][targetCountString] += 1
-                    for val in values:
-                        try:
-                            sourceCounts[RsourceVals][val] += 1
-                        except KeyError:
-                            sourceCounts[RsourceVals][val] = 1
-                else:
-                    sourceCounts[RsourceVals] += 1
+        sourceCounts = _diffusionCountLoop(source, target, sourceType, extraValue, useAllAuthors, extraMapping, targetCountString, PBar)
     if compareCounts:
-        localCounts = diffusionCount(source, source, sourceType = sourceType, pandasFriendly = False,  compareCounts = False, extraValue = extraValue, _ProgBar = PBar)
+        localCounts = diffusionCount(source, source, sourceType = sourceType, pandasFriendly = False,  compareCounts = False, extraValue = extraValue, _ProgBar = PBar, engine = engine)
     if PBar and not _ProgBar:
         PBar.finish("Done counting the diffusion of {} sources into {} targets".format(len(source), len(target)))
     if pandasFriendly:
@@ -348,6 +300,224 @@ def diffusionCount(source, target, sourceType = "raw", extraValue = None, pandas
                 sourceCounts[R] = (sourceCounts[R], occ)
         return sourceCounts
 
+def _diffusionCountLoop(source, target, sourceType, extraValue, useAllAuthors, extraMapping, targetCountString, PBar):
+    """The default engine of diffusionCount(), counts the citations one at a time"""
+    count = 0
+    maxCount = len(source)
+    sourceDict = {}
+    #Tells the function if the IDs are made of lists or of str
+    listIds = None
+
+    for Rs in source:
+        if listIds is None and Rs.get(sourceType) is not None:
+            listIds = isinstance(Rs.get(sourceType), list)
+        count += 1
+        PBar.updateVal(count / maxCount * .10, "Analyzing source: " + str(Rs))
+        RsVal, RsExtras = makeNodeID(Rs, sourceType)
+        if RsVal:
+            if useAllAuthors:
+                for c in Rs.createCitation(multiCite = True):
+                    sourceDict[c] = RsVal
+            else:
+                sourceDict[Rs.createCitation()] = RsVal
+    if extraValue is not None:
+        if listIds:
+            sourceCounts = {s : {targetCountString : 0} for s in itertools.chain.from_iterable(sourceDict.values())}
+        else:
+            sourceCounts = {s : {targetCountString : 0} for s in sourceDict.values()}
+    else:
+        if listIds:
+            sourceCounts = {s : 0 for s in itertools.chain.from_iterable(sourceDict.values())}
+        else:
+            sourceCounts = {s : 0 for s in sourceDict.values()}
+    count = 0
+    maxCount = len(target)
+    PBar.updateVal(.10, "Done analyzing sources, starting on targets")
+    for Rt in target:
+        count += 1
+        PBar.updateVal(count / maxCount * .90 + .10, "Analyzing target: {}".format(Rt))
+        targetCites = Rt.get('citations', [])
+        if extraValue is not None:
+            values = Rt.get(extraValue, [])
+            if values is None:
+                values = []
+            elif not isinstance(values, list):
+                values = [values]
+            values = [extraMapping(val) for val in values]
+        for c in  targetCites:
+            try:
+                RsourceVals = sourceDict[c]
+            except KeyError:
+                continue
+            if listIds:
+                for sVal in RsourceVals:
+                    if extraValue:
+                        sourceCounts[sVal][targetCountString] += 1
+                        for val in values:
+                            try:
+                                sourceCounts[sVal][val] += 1
+                            except KeyError:
+                                sourceCounts[sVal][val] = 1
+                    else:
+                        sourceCounts[sVal] += 1
+            else:
+                if extraValue:
+                    sourceCounts[RsourceVals][targetCountString] += 1
+                    for val in values:
+                        try:
+                            sourceCounts[RsourceVals][val] += 1
+                        except KeyError:
+                            sourceCounts[RsourceVals][val] = 1
+                else:
+                    sourceCounts[RsourceVals] += 1
+    return sourceCounts
+
+def diffusionMatrix(source, target, sourceType = "raw", targetType = "raw", useAllAuthors = True):
+    """Counts the citations of the [Records](../classes/Record.html#metaknowledge.Record) of _source_ by those of _target_ as a sparse matrix, this is what the `"matrix"` engine of [diffusionGraph()](#metaknowledge.diffusion.diffusionGraph) and [diffusionCount()](#metaknowledge.diffusion.diffusionCount) uses.
+
+    The Records are each given an index and three sparse matrices are made: the source nodes of each source citation, the citations of each target Record and the target nodes of each target Record. The counts are their product, so the citations are only looked up once and the aggregation by node is done by scipy. The nodes can be the Records or the values of any tag, e.g. `'WC'`, `'SO'` or `'year'`, each value of a list tag is its own node.
+
+    This requires [scipy](https://www.scipy.org/).
+
+    # Parameters
+
+    _source_ : `RecordCollection`
+
+    > A metaknowledge `RecordCollection` containing the `Records` being cited
+
+    _target_ : `RecordCollection`
+
+    > A metaknowledge `RecordCollection` containing the `Records` citing those in _source_
+
+    _sourceType_ : `optional [str]`
+
+    > Default `'raw'`, if `'raw'` the columns are the `Records` of _source_, otherwise a tag whose values are the columns
+
+    _targetType_ : `optional [str]`
+
+    > Default `'raw'`, if `'raw'` the rows are the `Records` of _target_, otherwise a tag whose values are the rows
+
+    _useAllAuthors_ : `optional [bool]`
+
+    > Default `True`, as in [diffusionCount()](#metaknowledge.diffusion.diffusionCount), the `Citations` of the _source_ `Records` with each of their authors are matched, if `False` only those with the first author are, as [diffusionGraph()](#metaknowledge.diffusion.diffusionGraph) does
+
+    # Returns
+
+    `(scipy.sparse.csr_matrix, list, list)`
+
+    > The matrix of counts, entry `(i, j)` is the number of times the target node _i_ cites the source node _j_, followed by the target nodes, in row order, and the source nodes, in column order
+    """
+    for ndType in (sourceType, targetType):
+        if ndType != "raw" and ndType not in tagsAndNameSet:
+            raise RuntimeError("{} is not a valid node type, only 'raw' or those strings in tagsAndNameSet are allowed".format(ndType))
+    targets = list(target)
+    citeCounts, sourceNodes = _targetCiteCounts(source, targets, sourceType, useAllAuthors)
+    counts, targetNodes = _groupTargets(citeCounts, [_nodeValues(Rt, targetType) for Rt in targets])
+    return counts, targetNodes, sourceNodes
+
+def _nodeValues(Rec, ndType):
+    """The nodes of _Rec_ for the matrix engine, each value of a list tag is its own node"""
+    recID, extras = makeNodeID(Rec, ndType)
+    if not recID:
+        return []
+    elif isinstance(recID, tuple):
+        return list(recID)
+    else:
+        return [recID]
+
+def _targetCiteCounts(source, targets, sourceType, useAllAuthors):
+    """Gives the matrix of the number of times each of _targets_ cites each source node and the list of source nodes. As in the default engine a Citation given by more than one source only counts for the last"""
+    citeSources = {}
+    for Rs in source:
+        vals = _nodeValues(Rs, sourceType)
+        if vals:
+            if useAllAuthors:
+                for c in Rs.createCitation(multiCite = True):
+                    citeSources[c] = vals
+            else:
+                citeSources[Rs.createCitation()] = vals
+    #Citations by source nodes
+    S, sourceIndices = incidenceMatrix(citeSources.values())
+    #Targets by citations
+    C, citeIndices = incidenceMatrix((Rt.get('citations') or [] for Rt in targets), columns = {c : i for i, c in enumerate(citeSources)})
+    return (C @ S).tocsr(), list(sourceIndices)
+
+def _groupTargets(citeCounts, targetRows):
+    """Adds the rows of _citeCounts_ together by the nodes of each target in _targetRows_, a target is added to each of its nodes as many times as it has it"""
+    T, targetIndices = incidenceMatrix(targetRows)
+    return (T.T @ citeCounts).tocsr(), list(targetIndices)
+
+def _diffusionCountMatrix(source, target, sourceType, extraValue, useAllAuthors, extraMapping, targetCountString):
+    """The matrix engine of diffusionCount(), gives the same dict as the default one"""
+    numpy, sparse = _importSparse()
+    targets = list(target)
+    citeCounts, sourceNodes = _targetCiteCounts(source, targets, sourceType, useAllAuthors)
+    totals = numpy.asarray(citeCounts.sum(axis = 0)).ravel().tolist()
+    if extraValue is None:
+        return dict(zip(sourceNodes, totals))
+    extraRows = []
+    for Rt in targets:
+        values = Rt.get(extraValue, [])
+        if values is None:
+            values = []
+        elif not isinstance(values, list):
+            values = [values]
+        extraRows.append([extraMapping(val) for val in values])
+    counts, extraNodes = _groupTargets(citeCounts, extraRows)
+    sourceCounts = {s : {targetCountString : t} for s, t in zip(sourceNodes, totals)}
+    counts = counts.tocoo()
+    for i, j, occ in zip(counts.row.tolist(), counts.col.tolist(), counts.data.tolist()):
+        if occ:
+            sourceCounts[sourceNodes[j]][extraNodes[i]] = occ
+    return sourceCounts
+
+def _diffusionGraphMatrix(source, target, weighted, sourceType, targetType, labelEdgesBy):
+    """The matrix engine of diffusionGraph()"""
+    targets = list(target)
+    citeCounts, sourceNodes = _targetCiteCounts(source, targets, sourceType, False)
+    targetNodeLists = []
+    targetRows = []
+    for Rt in targets:
+        vals = _nodeValues(Rt, targetType)
+        if labelEdgesBy is None:
+            targetRows.append(vals)
+        else:
+            edgeVals = Rt.get(labelEdgesBy)
+            if edgeVals is None:
+                vals = []
+            elif not isinstance(edgeVals, list):
+                edgeVals = [edgeVals]
+            targetRows.append([(val, str(ev)) for val in vals for ev in edgeVals])
+        targetNodeLists.append(vals)
+    counts, targetNodes = _groupTargets(citeCounts, targetRows)
+    if labelEdgesBy is None:
+        workingGraph = nx.DiGraph()
+    else:
+        workingGraph = nx.MultiDiGraph()
+    for Rs in source:
+        for val in _nodeValues(Rs, sourceType):
+            if val not in workingGraph:
+                workingGraph.add_node(val, source = True, target = False)
+    for vals in targetNodeLists:
+        for val in vals:
+            if val not in workingGraph:
+                workingGraph.add_node(val, source = False, target = True)
+            else:
+                workingGraph.nodes[val]['target'] = True
+    counts = counts.tocoo()
+    edges = zip(counts.row.tolist(), counts.col.tolist(), counts.data.tolist())
+    if labelEdgesBy is None:
+        if weighted:
+            workingGraph.add_weighted_edges_from(((sourceNodes[j], targetNodes[i], occ) for i, j, occ in edges))
+        else:
+            workingGraph.add_edges_from(((sourceNodes[j], targetNodes[i]) for i, j, occ in edges))
+    else:
+        if weighted:
+            workingGraph.add_edges_from(((sourceNodes[j], targetNodes[i][0], targetNodes[i][1], {'key' : targetNodes[i][1], 'weight' : occ}) for i, j, occ in edges))
+        else:
+            workingGraph.add_edges_from(((sourceNodes[j], targetNodes[i][0], targetNodes[i][1]) for i, j, occ in edges))
+    return workingGraph
+
 def makeNodeID(Rec, ndType, extras = None):
     """Helper to make a node ID, extras is currently not used"""
     if ndType == 'raw':
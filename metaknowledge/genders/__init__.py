@@ -1,2 +1,2 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2016
-from .nameGender import nameStringGender, recordGenders, downloadData, getMapping
+from .nameGender import nameStringGender, namesGenders, recordGenders, downloadData, getMapping, compileMapping
@@ -2,7 +2,11 @@
 import zipfile
 import io
 import csv
+import json
+import os
 import os.path
+import struct
+import tempfile
 import urllib
 
 from ..mkExceptions import GenderException
@@ -13,6 +17,14 @@ ukNamesPath = 'globalnamedata-0.3/assets/ukprocessed.csv'
 
 targetFilePath = os.path.join(os.path.normpath(os.path.dirname(__file__)), 'namesData.csv')
 
+#The compiled table made from targetFilePath, see compileMapping()
+compiledExtension = '.mkNames'
+
+_compiledMagic = b'mkNames\0'
+_compiledVersion = 1
+#magic, version, header length
+_compiledHeader = struct.Struct('<8sIQ')
+
 csvFields = [
     'Name',
     'years.appearing',
@@ -40,9 +52,7 @@ def downloadData(useUK = False):
     except PermissionError:
         raise PermissionError("Can not write to {}, you try rerunning with higher privileges".format(targetFilePath))
 
-def getMapping(useUK = False):
-    if not os.path.isfile(targetFilePath):
-        downloadData(useUK)
+def _readCSVMapping():
     retDict = {}
     with open(targetFilePath) as f:
         reader = csv.DictReader(f, fieldnames = csvFields)
@@ -51,11 +61,88 @@ def getMapping(useUK = False):
             retDict[line['Name'].title()] = line['prob.gender']
     return retDict
 
+def compileMapping():
+    """Writes the names data to a compiled table next to it, which is what [getMapping()](#metaknowledge.genders.nameGender.getMapping) reads. This is done by `getMapping()` when the names data is newer than its table, so it should not need to be run directly.
+
+    The names are grouped by their gender, each group is stored as one newline separated string so loading the table only needs a decode and split per gender instead of parsing every line of the csv.
+
+    # Returns
+
+    `str`
+
+    > The path of the compiled table
+    """
+    byGender = {}
+    for name, gender in _readCSVMapping().items():
+        byGender.setdefault(gender, []).append(name)
+    genders = sorted(byGender)
+    blobs = ['\n'.join(byGender[g]).encode('utf-8') for g in genders]
+    header = json.dumps({'genders' : genders, 'lengths' : [len(b) for b in blobs]}).encode('utf-8')
+    compiledName = targetFilePath + compiledExtension
+    #Written to a temporary file first so processes reading the old table are not affected
+    fd, tmpName = tempfile.mkstemp(dir = os.path.dirname(compiledName), suffix = '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_compiledHeader.pack(_compiledMagic, _compiledVersion, len(header)))
+            f.write(header)
+            for b in blobs:
+                f.write(b)
+        os.replace(tmpName, compiledName)
+    except:
+        if os.path.isfile(tmpName):
+            os.remove(tmpName)
+        raise
+    return compiledName
+
+def _readCompiledMapping(compiledName):
+    retDict = {}
+    with open(compiledName, 'rb') as f:
+        data = f.read()
+    magic, version, headerLength = _compiledHeader.unpack_from(data, 0)
+    if magic != _compiledMagic or version != _compiledVersion:
+        raise GenderException("'{}' is not a compiled names table of version {}.".format(compiledName, _compiledVersion))
+    pos = _compiledHeader.size + headerLength
+    header = json.loads(data[_compiledHeader.size:pos].decode('utf-8'))
+    for gender, length in zip(header['genders'], header['lengths']):
+        if length > 0:
+            retDict.update(dict.fromkeys(data[pos:pos + length].decode('utf-8').split('\n'), gender))
+        pos += length
+    return retDict
+
+def getMapping(useUK = False):
+    """Gives the `dict` of first names to genders, the names data is downloaded if it is missing. The names are read from the compiled table made by [compileMapping()](#metaknowledge.genders.nameGender.compileMapping), which is remade if it is missing or older than the names data.
+
+    # Parameters
+
+    _useUK_ : `optional [bool]`
+
+    > Default `False`, if `True` and the names data is missing the UK names are downloaded instead of the American ones
+
+    # Returns
+
+    `dict[str : str]`
+
+    > The title cased first names mapped to `'Male'`, `'Female'` or `'Unknown'`
+    """
+    if not os.path.isfile(targetFilePath):
+        downloadData(useUK)
+    compiledName = targetFilePath + compiledExtension
+    if not os.path.isfile(compiledName) or os.path.getmtime(targetFilePath) > os.path.getmtime(compiledName):
+        compileMapping()
+    try:
+        return _readCompiledMapping(compiledName)
+    except (GenderException, ValueError, KeyError, struct.error):
+        compileMapping()
+        return _readCompiledMapping(compiledName)
+
+def _firstName(s):
+    return s.split(', ')[1].split(' ')[0].title()
+
 def nameStringGender(s, noExcept = False):
     """Expects `first, last`"""
     global mappingDict
     try:
-        first = s.split(', ')[1].split(' ')[0].title()
+        first = _firstName(s)
     except IndexError:
         if noExcept:
             return 'Unknown'
@@ -65,5 +152,31 @@ def nameStringGender(s, noExcept = False):
         mappingDict = getMapping()
     return mappingDict.get(first, 'Unknown')
 
+def namesGenders(names):
+    """Gives the genders of many name strings at once, like [nameStringGender()](#metaknowledge.genders.nameGender.nameStringGender) with _noExcept_ `True`. Each distinct name string is only split and looked up once, so this is much faster than calling `nameStringGender()` on each name when the same authors appear many times.
+
+    # Parameters
+
+    _names_ : `iterable[str]`
+
+    > The names, as `last, first`
+
+    # Returns
+
+    `dict[str : str]`
+
+    > The distinct names mapped to `'Male'`, `'Female'` or `'Unknown'`
+    """
+    global mappingDict
+    if mappingDict is None:
+        mappingDict = getMapping()
+    retDict = {}
+    for s in set(names):
+        try:
+            retDict[s] = mappingDict.get(_firstName(s), 'Unknown')
+        except IndexError:
+            retDict[s] = 'Unknown'
+    return retDict
+
 def recordGenders(R):
     return {auth : nameStringGender(auth, noExcept = True) for auth in R.get('authorsFull', [])}
@@ -4,6 +4,10 @@ import string
 import os
 import datetime
 import dbm.dumb
+import collections.abc
+import mmap
+import struct
+import tempfile
 
 from ..mkExceptions import JournalDataBaseError
 
@@ -11,6 +15,15 @@ abrevDBname = "j9Abbreviations"
 
 manualDBname = "manualj9Abbreviations"
 
+#The compiled lookup file, see compilej9DB()
+compiledExtension = ".mkj9"
+
+_compiledMagic = b'mkJ9Look'
+_compiledVersion = 1
+#magic, version, number of entries
+_compiledHeader = struct.Struct('<8sIQ')
+_compiledOffset = struct.Struct('<Q')
+
 def j9urlGenerator(nameDict = False):
     """How to get all the urls for the WOS Journal Title Abbreviations. Each is varies by only a few characters. These are the currently in use urls they may change.
 
@@ -126,6 +139,7 @@ def updatej9DB(dbname = abrevDBname, saveRawHTML = False):
                     db[k] = '|'.join(v)
     except dbm.dumb.error as e:
         raise JournalDataBaseError("Something happened with the database of WOS journal names. To fix this you should delete the 1 to 3 files whose names start with {}. If this doesn't work (sorry), deleteing everything in '{}' and reinstalling metaknowledge should.\nThe error was '{}'".format(dbLoc, os.path.dirname(__file__), e))
+    compilej9DB(dbname = dbname)
 
 def getj9dict(dbname = abrevDBname, manualDB = manualDBname, returnDict ='both'):
     """Returns the dictionary of journal abbreviations mapping to a list of the associated journal names. By default the local database is used. The database is in the file _dbname_ in the same directory as this source file
@@ -224,3 +238,202 @@ def excludeFromDB(abbr = None, dbname = manualDBname):
             pass
         else:
             raise TypeError("abbr must be a str, list or tuple.")
+
+def _dbLocation(dbname):
+    return os.path.join(os.path.normpath(os.path.dirname(__file__)), dbname)
+
+def compilej9DB(dbname = abrevDBname):
+    """Writes the database _dbname_ to a compiled lookup file, which is what [getj9Lookup()](#metaknowledge.journalAbbreviations.backend.getj9Lookup) reads. This is done by [updatej9DB()](#metaknowledge.journalAbbreviations.backend.updatej9DB) and by `getj9Lookup()` when the database is newer than its compiled file, so it should not need to be run directly.
+
+    The file has a header, then the offsets of the keys and values, then the utf-8 keys and values, with the keys sorted by their bytes so they can be binary searched in place.
+
+    # Parameters
+
+    _dbname_ : `optional [str]`
+
+    > The name of the database file, default is "j9Abbreviations"
+
+    # Returns
+
+    `str`
+
+    > The path of the compiled file
+    """
+    j9Dict = getj9dict(dbname = dbname, returnDict = 'WOS')
+    entries = sorted(((k.encode('utf-8'), '|'.join(v).encode('utf-8')) for k, v in j9Dict.items()))
+    offsets = []
+    pos = 0
+    for k, v in entries:
+        offsets.append(pos)
+        pos += len(k)
+        offsets.append(pos)
+        pos += len(v)
+    offsets.append(pos)
+    compiledName = _dbLocation(dbname) + compiledExtension
+    #Written to a temporary file first so processes reading the old file are not affected
+    fd, tmpName = tempfile.mkstemp(dir = os.path.dirname(compiledName), prefix = dbname, suffix = '.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_compiledHeader.pack(_compiledMagic, _compiledVersion, len(entries)))
+            f.write(struct.pack('<{}Q'.format(len(offsets)), *offsets))
+            for k, v in entries:
+                f.write(k)
+                f.write(v)
+        os.replace(tmpName, compiledName)
+    except:
+        if os.path.isfile(tmpName):
+            os.remove(tmpName)
+        raise
+    return compiledName
+
+class J9Lookup(collections.abc.Mapping):
+    """A read only mapping of journal abbreviations to lists of their full names, like the `dict` given by [getj9dict()](#metaknowledge.journalAbbreviations.backend.getj9dict), that reads a file made by [compilej9DB()](#metaknowledge.journalAbbreviations.backend.compilej9DB) with `mmap`. Lookups binary search the file so the table is never loaded, and processes using the same file share its pages.
+
+    Entries in the _overlay_ supersede those of the file, this is how the manual database is merged in. [update()](#metaknowledge.journalAbbreviations.backend.J9Lookup.update) only changes the overlay.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _compiledName_ : `optional [str]`
+
+    > Default `None`, the path of the compiled file, if `None` only the overlay is used
+
+    _overlay_ : `optional [dict[str : list[str]]]`
+
+    > Default `None`, abbreviations mapped to lists of names that supersede those in the file
+    """
+    #Results of searching the file, cleared when it grows past this
+    _foundMaxSize = 100000
+
+    def __init__(self, compiledName = None, overlay = None):
+        self.compiledName = compiledName
+        self._overlay = {} if overlay is None else dict(overlay)
+        self._found = {}
+        self._mmap = None
+        self._count = 0
+        if compiledName is not None:
+            with open(compiledName, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+            try:
+                magic, version, self._count = _compiledHeader.unpack_from(self._mmap, 0)
+            except struct.error:
+                magic = version = None
+            if magic != _compiledMagic or version != _compiledVersion:
+                self.close()
+                raise JournalDataBaseError("'{}' is not a compiled J9 database of version {}, it can be remade with metaknowledge.journalAbbreviations.backend.compilej9DB().".format(compiledName, _compiledVersion))
+            self._blobStart = _compiledHeader.size + _compiledOffset.size * (2 * self._count + 1)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _offset(self, i):
+        return self._blobStart + _compiledOffset.unpack_from(self._mmap, _compiledHeader.size + _compiledOffset.size * i)[0]
+
+    def _key(self, i):
+        return self._mmap[self._offset(2 * i):self._offset(2 * i + 1)]
+
+    def _search(self, key):
+        """Gives the names of _key_ from the file or `None`"""
+        if self._mmap is None:
+            return None
+        target = key.encode('utf-8')
+        low = 0
+        high = self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._count and self._key(low) == target:
+            return self._mmap[self._offset(2 * low + 1):self._offset(2 * low + 2)].decode('utf-8').split('|')
+        return None
+
+    def __getitem__(self, key):
+        try:
+            return self._overlay[key]
+        except KeyError:
+            pass
+        try:
+            names = self._found[key]
+        except KeyError:
+            if len(self._found) >= self._foundMaxSize:
+                self._found.clear()
+            names = self._found[key] = self._search(key)
+        if names is None:
+            raise KeyError(key)
+        return names
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def _fileKeys(self):
+        for i in range(self._count):
+            yield self._key(i).decode('utf-8')
+
+    def __iter__(self):
+        for key in self._fileKeys():
+            if key not in self._overlay:
+                yield key
+        for key in self._overlay:
+            yield key
+
+    def __len__(self):
+        return self._count + sum((1 for key in self._overlay if self._search(key) is None))
+
+    def update(self, abbrs):
+        """Adds _abbrs_ to the overlay, the file is not changed
+
+        # Parameters
+
+        _abbrs_ : `dict[str : str or list[str]]`
+
+        > The abbreviations mapped to their names, strings are split on pipes (`'|'`) like in the databases
+        """
+        for k, v in abbrs.items():
+            self._overlay[k] = v.split('|') if isinstance(v, str) else list(v)
+
+def getj9Lookup(dbname = abrevDBname, manualDB = manualDBname, returnDict = 'both'):
+    """Gives the same mapping as [getj9dict()](#metaknowledge.journalAbbreviations.backend.getj9dict), but as a [J9Lookup](#metaknowledge.journalAbbreviations.backend.J9Lookup) that reads the compiled file of _dbname_ instead of loading the whole database. The compiled file is made, with [compilej9DB()](#metaknowledge.journalAbbreviations.backend.compilej9DB), if it is missing or older than the database. The manual database is small so it is read into the lookup's overlay.
+
+    # Parameters
+
+    _dbname_ : `optional [str]`
+
+    > The name of the downloaded database file, the default is determined at run time. It is recommended that this remain untouched.
+
+    _manualDB_ : `optional [str]`
+
+    > The name of the manually created database file, the default is determined at run time. It is recommended that this remain untouched.
+
+    _returnDict_ : `optional [str]`
+
+    > default `'both'`, can be used to get both databases or only one  with `'WOS'` or `'manual'`.
+
+    # Returns
+
+    `J9Lookup`
+
+    > The lookup
+    """
+    compiledName = None
+    if returnDict == 'both' or returnDict == 'WOS':
+        compiledName = _dbLocation(dbname) + compiledExtension
+        dbFile = _dbLocation(dbname) + '.dat'
+        if not os.path.isfile(compiledName) or (os.path.isfile(dbFile) and os.path.getmtime(dbFile) > os.path.getmtime(compiledName)):
+            compilej9DB(dbname = dbname)
+    overlay = None
+    if returnDict == 'manual' or (returnDict == 'both' and os.path.isfile(_dbLocation(manualDB) + '.dat')):
+        overlay = getj9dict(dbname = dbname, manualDB = manualDB, returnDict = 'manual')
+    try:
+        return J9Lookup(compiledName, overlay = overlay)
+    except JournalDataBaseError:
+        compilej9DB(dbname = dbname)
+        return J9Lookup(compiledName, overlay = overlay)
@@ -1,6 +1,7 @@
 import itertools
 
 from ..mkExceptions import BadPubmedFile
+from ..mkRecord import _keptTagSet
 
 from .recordMedline import MedlineRecord
 
@@ -35,7 +36,7 @@ def isMedlineFile(infile, checkedLines = 2):
     else:
         return False
 
-def medlineParser(pubFile):
+def medlineParser(pubFile, onlyTheseTags = None):
     """Parses a medline file, _pubFile_, to extract the individual entries as [MedlineRecords](#metaknowledge.medline.recordMedline.MedlineRecord).
 
     A medline file is a series of entries, each entry is a series of tags. A tag is a 2 to 4 character string each tag is padded with spaces on the left to make it 4 characters which is followed by a dash and a space (`'- '`). Everything after the tag and on all lines after it not starting with a tag is considered associated with the tag. Each entry's first tag is `PMID`, so a first line looks something like `PMID- 26524502`. Entries end with a single blank line.
@@ -46,6 +47,10 @@ def medlineParser(pubFile):
 
     > A path to a valid medline file, use [isMedlineFile](#metaknowledge.medline.medlineHandlers.isMedlineFile) to verify
 
+    _onlyTheseTags_ : `optional [iterable[str]]`
+
+    > Default `None`, if given only the fields with these tags (or long names) are kept, along with the PMID, the rest are skipped while reading and the records list them in their `droppedTags`.
+
     # Returns
 
     `set[MedlineRecord]`
@@ -53,6 +58,7 @@ def medlineParser(pubFile):
     > Records for each of the entries
     """
     #assumes the file is MEDLINE
+    keptTags = _keptTagSet(onlyTheseTags, MedlineRecord, ['PMID'])
     recSet = set()
     error = None
     lineNum = 0
@@ -64,7 +70,7 @@ def medlineParser(pubFile):
                 while True:
                     if line.startswith("PMID- "):
                         try:
-                            r = MedlineRecord(itertools.chain([(lineNum, line)], f), sFile = pubFile, sLine = lineNum)
+                            r = MedlineRecord(itertools.chain([(lineNum, line)], f), sFile = pubFile, sLine = lineNum, keptTags = keptTags)
                             recSet.add(r)
                         except BadPubmedFile as e:
                             badLine = lineNum
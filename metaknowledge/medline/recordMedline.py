@@ -4,8 +4,8 @@ import collections
 import itertools
 import io
 
-from ..mkExceptions import BadPubmedRecord, RCTypeError
-from ..mkRecord import ExtendedRecord
+from ..mkExceptions import BadPubmedRecord, RCTypeError, RecordsNotCompatible
+from ..mkRecord import ExtendedRecord, _projectFieldDict, _sharedTagSet
 from .tagProcessing.tagNames import tagNameConverterDict, authorBasedTags
 from .tagProcessing.tagFunctions import medlineTagToFunc
 from .tagProcessing.specialFunctions import medlineSpecialTagToFunc
@@ -14,23 +14,28 @@ class MedlineRecord(ExtendedRecord):
     """Class for full Medline(Pubmed) entries.
 
     This class is an [ExtendedRecord](./ExtendedRecord.html#metaknowledge.ExtendedRecord) capable of generating its own id number. You should not create them directly, but instead use [medlineParser()](../modules/medline.html#metaknowledge.medline.medlineHandlers.medlineParser) on a medline file.
+
+    If _keptTags_ is given only those tags are kept, the others are listed in `droppedTags`.
     """
-    def __init__(self, inRecord, sFile = "", sLine = 0):
+    def __init__(self, inRecord, sFile = "", sLine = 0, keptTags = None):
         bad = False
         error = None
         fieldDict = None
+        droppedTags = set()
         try:
             if isinstance(inRecord, dict) or isinstance(inRecord, collections.OrderedDict):
                 fieldDict = collections.OrderedDict(inRecord)
+                if keptTags is not None:
+                    _projectFieldDict(fieldDict, keptTags, droppedTags)
             elif isinstance(inRecord, itertools.chain):
-                fieldDict = medlineRecordParser(inRecord)
+                fieldDict = medlineRecordParser(inRecord, keptTags, droppedTags)
             elif isinstance(inRecord, io.IOBase):
-                fieldDict = medlineRecordParser(enumerate(inRecord))
+                fieldDict = medlineRecordParser(enumerate(inRecord), keptTags, droppedTags)
             elif isinstance(inRecord, str):
                 def addCharToEnd(lst):
                     for s in lst:
                         yield s + '\n'
-                fieldDict = medlineRecordParser(enumerate(addCharToEnd(inRecord.split('\n')), start = 1))
+                fieldDict = medlineRecordParser(enumerate(addCharToEnd(inRecord.split('\n')), start = 1), keptTags, droppedTags)
                 #string io
             else:
                 raise RCTypeError("Unsupported input type '{}', PubmedRecords cannot be created from '{}'".format(inRecord, type(inRecord)))
@@ -46,6 +51,8 @@ class MedlineRecord(ExtendedRecord):
                 bad = True
                 error = BadPubmedRecord("Missing PMID")
         ExtendedRecord.__init__(self, fieldDict, self._pubNum, bad, error, sFile = sFile, sLine = sLine)
+        if droppedTags:
+            self._droppedTags = _sharedTagSet(droppedTags)
 
     def encoding(self):
         return 'latin-1'
@@ -68,6 +75,8 @@ class MedlineRecord(ExtendedRecord):
         """
         if self.bad:
             raise BadPubmedRecord("This record cannot be converted to a file as the input was malformed.\nThe original line number (if any) is: {} and the original file is: '{}'".format(self._sourceLine, self._sourceFile))
+        elif self._droppedTags:
+            raise RecordsNotCompatible("This record cannot be written to a file as the tags {} were dropped when it was read.".format(', '.join(sorted(self._droppedTags))))
         else:
             authTags = {}
             for tag in authorBasedTags:
@@ -87,7 +96,7 @@ class MedlineRecord(ExtendedRecord):
                             for authVal in authTags.get(v,[]):
                                 f.write(authVal)
 
-def medlineRecordParser(record):
+def medlineRecordParser(record, keptTags = None, droppedTags = None):
     """The parser [`MedlineRecord`](../classes/MedlineRecord.html#metaknowledge.medline.MedlineRecord) use. This takes an entry from [medlineParser()](#metaknowledge.medline.medlineHandlers.medlineParser) and parses it a part of the creation of a `MedlineRecord`.
 
     # Parameters
@@ -96,6 +105,14 @@ def medlineRecordParser(record):
 
     > a file wrapped by `enumerate()`
 
+    _keptTags_ : `optional [set[str]]`
+
+    > Default `None`, if given only the tags in _keptTags_ are stored, the lines of the others are skipped
+
+    _droppedTags_ : `optional [set[str]]`
+
+    > Default `None`, must be given with _keptTags_, the tags that were skipped are added to it
+
     # Returns
 
     `collections.OrderedDict`
@@ -112,6 +129,10 @@ def medlineRecordParser(record):
             tag = tmptag
             if tag == 'AU':
                 mostRecentAuthor = contents
+            if keptTags is not None and tag not in keptTags:
+                #The authors are still tracked for the author based tags
+                droppedTags.add(tag)
+                continue
             if tag in authorBasedTags:
                 contents = "{} : {}".format(mostRecentAuthor, contents)
             try:
@@ -119,6 +140,8 @@ def medlineRecordParser(record):
             except KeyError:
                 tagDict[tag] = [contents]
         elif line[:6] == '      ':
+            if keptTags is not None and tag not in keptTags:
+                continue
             tagDict[tag][-1] += '\n' + line[6:-1]
         elif line == '\n':
             break
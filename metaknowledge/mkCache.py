@@ -0,0 +1,399 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""The on disk cache used by [RecordCollection](../classes/RecordCollection.html#metaknowledge.RecordCollection) when reading a directory with `cached = True`.
+
+The cache is a single binary file with one segment per source file and a manifest at the end. Each segment stores the raw `_fieldDict` and `droppedTags` of its file's `Records` in a columnar layout, offset arrays that index into a deduplicated string table, so loading a cache only decodes strings and never executes code. The manifest records the modification time, size and content hash of each source file so each one is checked, and if needed reparsed, on its own. The segments of reparsed files are appended to the end of the cache, so adding files to a large directory does not require rewriting the cache.
+
+The layout of the file is:
+
+    header : magic bytes, format version
+    segments : one per source file
+    manifest : utf-8 JSON
+    footer : manifest offset, manifest length, magic bytes
+"""
+import array
+import builtins
+import collections
+import hashlib
+import json
+import mmap
+import os
+import os.path
+import struct
+import sys
+
+from .constants import __version__
+from . import mkExceptions
+from .mkExceptions import cacheError
+from .mkRecord import _sharedTagSet
+
+cacheFormatVersion = 2
+
+_magic = b'mkRCache'
+_header = struct.Struct('<8sI')
+_footer = struct.Struct('<QQ8s')
+#nRecords, nFields, nValues, nDropped, nStrings
+_segmentHeader = struct.Struct('<5Q')
+
+#Typecodes used for the columns, the manifest records the byte order they were written with
+_lineType = 'q'
+_indexType = 'I'
+_errorType = 'i'
+_flagType = 'b'
+_stringStartType = 'Q'
+
+def _recordClasses():
+    #Imported here to avoid a circular import with the record modules
+    from .WOS import WOSRecord
+    from .medline import MedlineRecord
+    from .proquest import ProQuestRecord
+    from .scopus import ScopusRecord
+    return {c.__name__ : c for c in (WOSRecord, MedlineRecord, ProQuestRecord, ScopusRecord)}
+
+def _fileDigest(fileName):
+    h = hashlib.sha256()
+    with open(fileName, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _errorToStrings(error):
+    if error is None:
+        return None
+    return [type(error).__name__, str(error)]
+
+def _stringsToError(errorStrings):
+    """Recreates a stored exception, only exceptions defined in `mkExceptions` or builtins are used so nothing from the cache is ever executed."""
+    if errorStrings is None:
+        return None
+    errorName, message = errorStrings
+    errorClass = getattr(mkExceptions, errorName, None)
+    if errorClass is None:
+        errorClass = getattr(builtins, errorName, None)
+    if not (isinstance(errorClass, type) and issubclass(errorClass, BaseException)):
+        errorClass = mkExceptions.mkException
+    return errorClass(message)
+
+class _StringTable(object):
+    def __init__(self):
+        self.indices = {}
+        self.strings = []
+
+    def __getitem__(self, s):
+        try:
+            return self.indices[s]
+        except KeyError:
+            i = len(self.strings)
+            self.indices[s] = i
+            self.strings.append(s)
+            return i
+
+def _encodeSegment(records, byteOffsets = False):
+    """Encodes the raw fields of _records_ into the columnar segment layout, returns the segment as `bytes`.
+
+    The string starts are offsets into the decoded blob, unless _byteOffsets_ is `True` then they are offsets into the encoded blob so each string can be decoded on its own, as [mkFrozen](#module-metaknowledge.mkFrozen) does."""
+    strings = _StringTable()
+    lines = array.array(_lineType)
+    errorNames = array.array(_errorType)
+    errorMessages = array.array(_errorType)
+    badFlags = array.array(_flagType)
+    fieldStarts = array.array(_indexType, [0])
+    fieldTags = array.array(_indexType)
+    fieldIsList = array.array(_flagType)
+    valueStarts = array.array(_indexType, [0])
+    values = array.array(_indexType)
+    droppedStarts = array.array(_indexType, [0])
+    dropped = array.array(_indexType)
+    for R in records:
+        lines.append(R._sourceLine)
+        badFlags.append(1 if R.bad else 0)
+        errorStrings = _errorToStrings(R.error)
+        if errorStrings is None:
+            errorNames.append(-1)
+            errorMessages.append(-1)
+        else:
+            errorNames.append(strings[errorStrings[0]])
+            errorMessages.append(strings[errorStrings[1]])
+        for tag, val in R._fieldDict.items():
+            fieldTags.append(strings[tag])
+            if isinstance(val, list):
+                fieldIsList.append(1)
+                values.extend([strings[v] for v in val])
+            else:
+                fieldIsList.append(0)
+                values.append(strings[val])
+            valueStarts.append(len(values))
+        fieldStarts.append(len(fieldTags))
+        dropped.extend([strings[tag] for tag in sorted(R.droppedTags)])
+        droppedStarts.append(len(dropped))
+    stringStarts = array.array(_stringStartType, [0])
+    total = 0
+    if byteOffsets:
+        encoded = [s.encode('utf-8', 'surrogatepass') for s in strings.strings]
+        for s in encoded:
+            total += len(s)
+            stringStarts.append(total)
+        blob = b''.join(encoded)
+    else:
+        for s in strings.strings:
+            total += len(s)
+            stringStarts.append(total)
+        blob = ''.join(strings.strings).encode('utf-8', 'surrogatepass')
+    columns = [lines, errorNames, errorMessages, badFlags, fieldStarts, fieldTags, fieldIsList, valueStarts, values, droppedStarts, dropped, stringStarts]
+    return b''.join([_segmentHeader.pack(len(lines), len(fieldTags), len(values), len(dropped), len(strings.strings))] + [c.tobytes() for c in columns] + [blob])
+
+class _SegmentReader(object):
+    """Reads the records of one segment from a buffer, the strings are only decoded when a record is first requested."""
+    def __init__(self, buf):
+        nRecords, nFields, nValues, nDropped, nStrings = _segmentHeader.unpack_from(buf, 0)
+        self._pos = _segmentHeader.size
+        self._buf = buf
+        self.lines = self._column(_lineType, nRecords)
+        self.errorNames = self._column(_errorType, nRecords)
+        self.errorMessages = self._column(_errorType, nRecords)
+        self.badFlags = self._column(_flagType, nRecords)
+        self.fieldStarts = self._column(_indexType, nRecords + 1)
+        self.fieldTags = self._column(_indexType, nFields)
+        self.fieldIsList = self._column(_flagType, nFields)
+        self.valueStarts = self._column(_indexType, nFields + 1)
+        self.values = self._column(_indexType, nValues)
+        self.droppedStarts = self._column(_indexType, nRecords + 1)
+        self.dropped = self._column(_indexType, nDropped)
+        self.stringStarts = self._column(_stringStartType, nStrings + 1)
+        self._blobStart = self._pos
+        self._strings = None
+
+    def _column(self, typecode, length):
+        col = array.array(typecode)
+        end = self._pos + col.itemsize * length
+        col.frombytes(self._buf[self._pos:end])
+        self._pos = end
+        return col
+
+    def __len__(self):
+        return len(self.lines)
+
+    def strings(self):
+        if self._strings is None:
+            text = bytes(self._buf[self._blobStart:]).decode('utf-8', 'surrogatepass')
+            starts = self.stringStarts
+            self._strings = [text[starts[i]:starts[i + 1]] for i in range(len(starts) - 1)]
+            #The buffer is not needed once the strings are decoded
+            self._buf = None
+        return self._strings
+
+    def fieldDict(self, i):
+        strings = self.strings()
+        fieldDict = collections.OrderedDict()
+        values = self.values
+        valueStarts = self.valueStarts
+        for f in range(self.fieldStarts[i], self.fieldStarts[i + 1]):
+            if self.fieldIsList[f]:
+                fieldDict[strings[self.fieldTags[f]]] = [strings[v] for v in values[valueStarts[f]:valueStarts[f + 1]]]
+            else:
+                fieldDict[strings[self.fieldTags[f]]] = strings[values[valueStarts[f]]]
+        return fieldDict
+
+    def error(self, i):
+        if self.errorNames[i] < 0:
+            return None
+        strings = self.strings()
+        return _stringsToError((strings[self.errorNames[i]], strings[self.errorMessages[i]]))
+
+    def makeRecord(self, i, recordClass, sourceFile):
+        R = recordClass(self.fieldDict(i), sFile = sourceFile, sLine = self.lines[i])
+        #The parsers can mark records as bad in ways that cannot be seen from the fields alone
+        R.bad = bool(self.badFlags[i])
+        R.error = self.error(i)
+        if self.droppedStarts[i] != self.droppedStarts[i + 1]:
+            strings = self.strings()
+            R._droppedTags = _sharedTagSet(strings[t] for t in self.dropped[self.droppedStarts[i]:self.droppedStarts[i + 1]])
+        return R
+
+class RecordDirCache(object):
+    """The cache of the records read from a directory.
+
+    On creation the manifest of _cacheName_ is read, if the file is missing, was written by a different version or is damaged the cache starts empty and everything will be reparsed.
+
+    # Parameters
+
+    _cacheName_ : `str`
+
+    > The path to the cache file
+
+    _extension_ : `str`
+
+    > The extension used to select the files of the directory
+
+    _onlyTheseTags_ : `optional [iterable[str]]`
+
+    > Default `None`, the tags the records were read with, a cache is only used with the same tags
+    """
+    def __init__(self, cacheName, extension, onlyTheseTags = None):
+        self.cacheName = cacheName
+        self.extension = extension
+        self.onlyTheseTags = None if onlyTheseTags is None else sorted(set(onlyTheseTags))
+        self.files = {}
+        self._fileStats = {}
+        self._changed = False
+        self._mmap = None
+        self._manifestStart = None
+        if os.path.isfile(cacheName):
+            try:
+                self._openCache()
+            except (cacheError, ValueError, KeyError, TypeError, OSError, struct.error):
+                self.close()
+                self.files = {}
+                self._changed = True
+
+    def _openCache(self):
+        with open(self.cacheName, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        if len(self._mmap) < _header.size + _footer.size:
+            raise cacheError("Cache file too short")
+        magic, version = _header.unpack_from(self._mmap, 0)
+        if magic != _magic or version != cacheFormatVersion:
+            raise cacheError("Not a metaknowledge cache of version {}".format(cacheFormatVersion))
+        manifestStart, manifestLength, magic = _footer.unpack_from(self._mmap, len(self._mmap) - _footer.size)
+        if magic != _magic or manifestStart + manifestLength > len(self._mmap) - _footer.size:
+            raise cacheError("Damaged cache footer")
+        manifest = json.loads(self._mmap[manifestStart:manifestStart + manifestLength].decode('utf-8'))
+        if manifest["metaknowledge Version"] != __version__:
+            raise cacheError("mk version mismatch")
+        if manifest["File Extension"] != self.extension:
+            raise cacheError("Extension mismatch")
+        if manifest["Byte Order"] != sys.byteorder:
+            raise cacheError("Byte order mismatch")
+        if manifest["Only These Tags"] != self.onlyTheseTags:
+            raise cacheError("The records were read with different tags")
+        self.files = manifest["Files"]
+        self._manifestStart = manifestStart
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def staleFiles(self, flist):
+        """Returns the files in _flist_ that are not in the cache or whose contents have changed since they were cached.
+
+        A file is considered unchanged if its size and modification time match the manifest, if only the time differs its contents are hashed and compared.
+        """
+        stale = []
+        for fileName in flist:
+            stats = os.stat(fileName)
+            self._fileStats[fileName] = stats
+            entry = self.files.get(fileName)
+            if entry is None or entry['size'] != stats.st_size:
+                stale.append(fileName)
+            elif entry['mtime'] != stats.st_mtime_ns:
+                if entry['sha256'] == _fileDigest(fileName):
+                    entry['mtime'] = stats.st_mtime_ns
+                    self._changed = True
+                else:
+                    stale.append(fileName)
+        return stale
+
+    def readFile(self, fileName):
+        """Reads the records of _fileName_ from the cache, returns the same tuple as parsing the file, or `None` if the file is not a known type."""
+        entry = self.files[fileName]
+        if entry['recordType'] is None:
+            return None
+        recordClass = _recordClasses()[entry['recordType']]
+        #The segment is read in place, the views are released so the mapping can be closed
+        with memoryview(self._mmap) as cacheView, cacheView[entry['offset']:entry['offset'] + entry['length']] as segmentView:
+            reader = _SegmentReader(segmentView)
+            recs = {reader.makeRecord(i, recordClass, fileName) for i in range(len(reader))}
+        return entry['recordType'], recs, _stringsToError(entry['error'])
+
+    def write(self, flist, parsedResults):
+        """Writes the cache for the files in _flist_, _parsedResults_ maps the files that were reparsed to their results, all others are kept from the old cache.
+
+        If the old cache is intact only the segments of the reparsed files are written, they are appended to the cache followed by a new manifest and the segments they replace are left unused. Once the unused space is larger than the used space the cache is rewritten from scratch to reclaim it. If nothing has changed the cache file is left untouched.
+        """
+        deleted = set(self.files) - set(flist)
+        if not (parsedResults or deleted or self._changed) and os.path.isfile(self.cacheName):
+            self.close()
+            return
+        newSegments = {fileName : self._makeEntry(fileName, result) for fileName, result in parsedResults.items()}
+        if self._mmap is None:
+            self._rewrite(flist, newSegments)
+        else:
+            keptBytes = sum(self.files[f]['length'] for f in flist if f not in newSegments)
+            newBytes = sum(len(segment) for entry, segment in newSegments.values())
+            deadBytes = self._manifestStart - _header.size - keptBytes
+            if deadBytes > keptBytes + newBytes:
+                self._rewrite(flist, newSegments)
+            else:
+                self._append(flist, newSegments)
+        self._changed = False
+
+    def _append(self, flist, newSegments):
+        newFiles = {f : self.files[f] for f in flist if f not in newSegments}
+        self.close()
+        with open(self.cacheName, 'r+b') as f:
+            #The new segments overwrite the old manifest
+            f.seek(self._manifestStart)
+            for fileName, (entry, segment) in newSegments.items():
+                entry['offset'] = f.tell()
+                entry['length'] = len(segment)
+                f.write(segment)
+                newFiles[fileName] = entry
+            self._manifestStart = self._writeManifest(f, newFiles)
+            f.truncate()
+        self.files = newFiles
+
+    def _rewrite(self, flist, newSegments):
+        tmpName = self.cacheName + '.tmp'
+        newFiles = {}
+        with open(tmpName, 'wb') as f:
+            f.write(_header.pack(_magic, cacheFormatVersion))
+            for fileName in flist:
+                if fileName in newSegments:
+                    entry, segment = newSegments[fileName]
+                else:
+                    entry = dict(self.files[fileName])
+                    segment = self._mmap[entry['offset']:entry['offset'] + entry['length']]
+                entry['offset'] = f.tell()
+                entry['length'] = len(segment)
+                f.write(segment)
+                newFiles[fileName] = entry
+            manifestStart = self._writeManifest(f, newFiles)
+        self.close()
+        os.replace(tmpName, self.cacheName)
+        self.files = newFiles
+        self._manifestStart = manifestStart
+
+    def _makeEntry(self, fileName, result):
+        stats = self._fileStats.get(fileName) or os.stat(fileName)
+        entry = {
+            'mtime' : stats.st_mtime_ns,
+            'size' : stats.st_size,
+            'sha256' : _fileDigest(fileName),
+            'recordType' : None,
+            'error' : None,
+            'records' : 0,
+        }
+        if result is None:
+            segment = _encodeSegment([])
+        else:
+            recordType, recs, pError = result
+            entry['recordType'] = recordType
+            entry['error'] = _errorToStrings(pError)
+            entry['records'] = len(recs)
+            segment = _encodeSegment(sorted(recs, key = lambda x: x._sourceLine))
+        return entry, segment
+
+    def _writeManifest(self, f, files):
+        manifest = {
+            "metaknowledge Version" : __version__,
+            "Format Version" : cacheFormatVersion,
+            "File Extension" : self.extension,
+            "Byte Order" : sys.byteorder,
+            "Only These Tags" : self.onlyTheseTags,
+            "Files" : files,
+        }
+        manifestBytes = json.dumps(manifest).encode('utf-8')
+        manifestStart = f.tell()
+        f.write(manifestBytes)
+        f.write(_footer.pack(manifestStart, len(manifestBytes), _magic))
+        return manifestStart
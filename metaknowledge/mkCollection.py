@@ -3,6 +3,9 @@ import pickle
 import os
 import os.path
 import csv
+import itertools
+import functools
+import concurrent.futures
 try:
     import collections.abc
 except ImportError:
@@ -12,12 +15,14 @@ except ImportError:
 import networkx as nx
 
 from .progressBar import _ProgressBar
+from .graphHelpers import mergeGraphs
 
 from .RCglimpse import _glimpse
 
 from .constants import __version__
 
 from .mkExceptions import CollectionTypeError, cacheError, TagError, mkException
+from .mkIndex import TagIndex, IDIndex
 
 import metaknowledge
 
@@ -80,6 +85,63 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         self.bad = bad
         self.errors = errors
 
+    #The indexes of the items, see mkIndex. Most Collections have none so they are only made when needed
+    _indexes = None
+
+    def _addIndex(self, name, index):
+        """Adds _index_ under _name_, replacing any index with the same name, it is then kept current as items are added and removed"""
+        if self._indexes is None:
+            self._indexes = {}
+        index.rebuild(self._collection)
+        self._indexes[name] = index
+
+    def _dropIndex(self, name):
+        """Removes the index called _name_ if there is one"""
+        if self._indexes:
+            self._indexes.pop(name, None)
+
+    def _getIndex(self, name):
+        """Returns the index called _name_ or `None`"""
+        if self._indexes:
+            return self._indexes.get(name)
+        return None
+
+    def _indexAdd(self, elem):
+        """Adds _elem_ to the indexes, if one of them cannot index it the others have it removed again and the error is raised, so the indexes still match the collection"""
+        if self._indexes:
+            added = []
+            try:
+                for index in self._indexes.values():
+                    index.add(elem)
+                    added.append(index)
+            except Exception:
+                for index in added:
+                    index.discard(elem)
+                raise
+
+    def _indexAddAll(self, elems):
+        """Adds all of _elems_ to the indexes, if one cannot be added the ones before it are removed again and the error is raised"""
+        added = []
+        try:
+            for elem in elems:
+                self._indexAdd(elem)
+                added.append(elem)
+        except Exception:
+            for elem in added:
+                self._indexDiscard(elem)
+            raise
+
+    def _indexDiscard(self, elem):
+        if self._indexes:
+            for index in self._indexes.values():
+                index.discard(elem)
+
+    def _rebuildIndexes(self):
+        """Rebuilds all the indexes, for after the whole contents have been changed"""
+        if self._indexes:
+            for index in self._indexes.values():
+                index.rebuild(self._collection)
+
     #Hashable method
 
     def __hash__(self):
@@ -127,7 +189,12 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         > The object to be added
         """
         if isinstance(elem, self._allowedTypes):
-            self._collection.add(elem)
+            if self._indexes and elem not in self._collection:
+                #The indexes are updated first so nothing is added if they cannot take elem
+                self._indexAdd(elem)
+                self._collection.add(elem)
+            else:
+                self._collection.add(elem)
             self._collectedTypes.add(type(elem).__name__)
         else:
             raise CollectionTypeError("{} can only contain '{}', '{}' is not allowed.".format(type(self).__name__, self._allowedTypes, elem))
@@ -142,6 +209,7 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         > The object to be removed
 
         """
+        self._indexDiscard(elem)
         return self._collection.discard(elem)
 
     def remove(self, elem):
@@ -154,9 +222,10 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         > The object to be removed
         """
         try:
-            return self._collection.remove(elem)
+            self._collection.remove(elem)
         except KeyError:
             raise KeyError("'{}' was not found in the {}: '{}'.".format(elem, type(self).__name__, self)) from None
+        self._indexDiscard(elem)
 
     def clear(self):
         """"Removes all elements from the collection and resets the error handling
@@ -164,6 +233,7 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         self.bad = False
         self.errors = {}
         self._collection.clear()
+        self._rebuildIndexes()
 
     def pop(self):
         """Removes a random element from the collection and returns it
@@ -175,100 +245,116 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         > A random object from the collection
         """
         try:
-            return self._collection.pop()
+            elem = self._collection.pop()
         except KeyError:
             raise KeyError("Nothing left in the {}: '{}'.".format(type(self).__name__, self)) from None
+        self._indexDiscard(elem)
+        return elem
+
+    def _fromSet(self, inSet, name, collectedTypes, bad, errors):
+        """Makes a new `Collection` of the same type containing _inSet_, the items are not checked as they come from `Collections` of this type"""
+        newCollection = type(self).__new__(type(self))
+        Collection.__init__(newCollection, inSet, self._allowedTypes, collectedTypes, name, bad, errors)
+        return newCollection
+
+    def _combinedErrors(self, other):
+        """Gives the _bad_ and _errors_ of the combination of this `Collection` and _other_"""
+        errors = dict(self.errors)
+        errors.update(other.errors)
+        return self.bad or other.bad, errors
+
+    def _combinedTypes(self, other, items):
+        """Gives the _collectedTypes_ of _items_, a subset of the items of this `Collection` and _other_, they are only checked if there is more than one type"""
+        types = self._collectedTypes | other._collectedTypes
+        if not items:
+            return set()
+        elif len(types) == 1:
+            return types
+        else:
+            return {type(i).__name__ for i in items}
 
     def __ior__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
+            if self._indexes:
+                self._indexAddAll(other._collection - self._collection)
             self._collection |= other._collection
             self._collectedTypes |= other._collectedTypes
             self.name = '{} |= {}'.format(self.name, other.name)
-            if other.bad or self.bad:
-                self.bad = True
-                self.errors.update(other.errors)
+            self.bad, self.errors = self._combinedErrors(other)
             return self
 
     def __iand__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
+            if self._indexes:
+                for elem in self._collection - other._collection:
+                    self._indexDiscard(elem)
             self._collection &= other._collection
-            self._collectedTypes |= other._collectedTypes
+            self._collectedTypes = self._combinedTypes(other, self._collection)
             self.name = '{} &= {}'.format(self.name, other.name)
-            if other.bad or self.bad:
-                self.bad = True
-                self.errors.update(other.errors)
+            self.bad, self.errors = self._combinedErrors(other)
             return self
 
     def __ixor__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
+            if self._indexes:
+                self._indexAddAll(other._collection - self._collection)
+                for elem in self._collection & other._collection:
+                    self._indexDiscard(elem)
             self._collection ^= other._collection
-            self._collectedTypes |= other._collectedTypes
+            self._collectedTypes = self._combinedTypes(other, self._collection)
             self.name = '{} ^= {}'.format(self.name, other.name)
-            if other.bad or self.bad:
-                self.bad = True
-                self.errors.update(other.errors)
+            self.bad, self.errors = self._combinedErrors(other)
             return self
 
     def __isub__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
+            if self._indexes:
+                for elem in other._collection & self._collection:
+                    self._indexDiscard(elem)
             self._collection -= other._collection
-            self._collectedTypes |= other._collectedTypes
+            self._collectedTypes = self._combinedTypes(other, self._collection)
             self.name = '{} -= {}'.format(self.name, other.name)
-            if other.bad or self.bad:
-                self.bad = True
-                self.errors.update(other.errors)
+            self.bad, self.errors = self._combinedErrors(other)
             return self
 
     #These are provided by the above
     #but don't work right unless they are custom written
+    #The results are made with _fromSet() as the items have already been checked
 
     def __or__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
-            retCollection = type(self)(self._collection | other._collection, name = '{} | {}'.format(self.name, other.name), quietStart = True)
-            if other.bad or self.bad:
-                retCollection.bad = True
-                retCollection.errors.update(other.errors)
-            return retCollection
+            return self._fromSet(self._collection | other._collection, '{} | {}'.format(self.name, other.name), self._collectedTypes | other._collectedTypes, *self._combinedErrors(other))
 
     def __and__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
-            retCollection = type(self)(self._collection & other._collection, name = '{} & {}'.format(self.name, other.name), quietStart = True)
-            if other.bad or self.bad:
-                retCollection.bad = True
-                retCollection.errors.update(other.errors)
-            return retCollection
+            retSet = self._collection & other._collection
+            return self._fromSet(retSet, '{} & {}'.format(self.name, other.name), self._combinedTypes(other, retSet), *self._combinedErrors(other))
 
     def __sub__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
-            retCollection = type(self)(self._collection - other._collection, name = '{} - {}'.format(self.name, other.name), quietStart = True)
-            if other.bad or self.bad:
-                retCollection.bad = True
-                retCollection.errors.update(other.errors)
-            return retCollection
+            retSet = self._collection - other._collection
+            return self._fromSet(retSet, '{} - {}'.format(self.name, other.name), self._combinedTypes(other, retSet), *self._combinedErrors(other))
 
     def __xor__(self, other):
         if type(self) != type(other):
             return NotImplemented
         else:
-            retCollection = type(self)(self._collection ^ other._collection, name = '{} ^ {}'.format(self.name, other.name), quietStart = True)
-            if other.bad or self.bad:
-                retCollection.bad = True
-                retCollection.errors.update(other.errors)
-            return retCollection
+            retSet = self._collection ^ other._collection
+            return self._fromSet(retSet, '{} ^ {}'.format(self.name, other.name), self._combinedTypes(other, retSet), *self._combinedErrors(other))
 
     def __repr__(self):
         return "<metaknowledge.{} object {}>".format(type(self).__name__, self.name)
@@ -290,6 +376,8 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
         self._collectedTypes = copy.copy(self._collectedTypes)
         self._allowedTypes = copy.copy(self._allowedTypes)
         collectedCopy.errors = copy.copy(collectedCopy.errors)
+        if self._indexes:
+            collectedCopy._indexes = {name : index.copy() for name, index in self._indexes.items()}
         return collectedCopy
 
     def peek(self):
@@ -333,6 +421,73 @@ class Collection(collections.abc.MutableSet, collections.abc.Hashable):
             currentSize += 1
         return chunks
 
+    def mapReduce(self, mapper, reducer, workers = None, chunkSize = 10000, initial = None):
+        """Splits the `Collection` into chunks of at most _chunkSize_, like [chunk()](#metaknowledge.Collection.chunk), calls _mapper_ on each and combines the results with _reducer_. The chunks can be run in parallel by a pool of _workers_ processes.
+
+        _reducer_ is called with the result so far and the result of the next chunk, and returns the new result, the chunks' results are combined in the same order whether or not _workers_ is used. There are reducers for the common kinds of results: [reduceCounts()](../functions_methods/index.html#metaknowledge.mkCollection.reduceCounts) for dicts of counts, [reduceGraphs()](../functions_methods/index.html#metaknowledge.mkCollection.reduceGraphs) for networks and [reduceLists()](../functions_methods/index.html#metaknowledge.mkCollection.reduceLists) for dicts of lists. For example the citation network of a large `RecordCollection` `RC` can be made with:
+
+            RC.mapReduce(getCitationNetwork, metaknowledge.reduceGraphs, workers = 4)
+
+        where `getCitationNetwork` is a function defined in a module that calls `networkCitation()` on its argument. Only networks whose node `'count'` and edge `'weight'` attributes are sums over the items can be made this way.
+
+        With _workers_ each chunk is pickled and sent to a worker, to share the items between processes without copying them see [RecordCollection.freeze()](./RecordCollection.html#metaknowledge.RecordCollection.freeze).
+
+        # Parameters
+
+        _mapper_ : `function`
+
+        > A function taking a `Collection` of the same type as this one, if _workers_ is used it must be picklable (defined at the top level of a module or a `functools.partial` of one)
+
+        _reducer_ : `function`
+
+        > A function taking the result so far and the result of a chunk and returning their combination, it can modify its first argument
+
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the chunks are mapped by a pool of _workers_ processes, otherwise they are mapped in this process
+
+        _chunkSize_ : `optional [int]`
+
+        > Default `10000`, the maximum number of items in a chunk
+
+        _initial_ : `optional [object]`
+
+        > Default `None`, if given the first chunk's result is reduced with _initial_, otherwise the first chunk's result is the starting result
+
+        # Returns
+
+        `object`
+
+        > The combined result, or _initial_ if the `Collection` is empty
+        """
+        if not isinstance(chunkSize, int) or chunkSize < 1:
+            raise mkException("chunkSize must be a positive integer, not {}.".format(chunkSize))
+        items = iter(self._collection)
+        chunks = []
+        while True:
+            chunkItems = set(itertools.islice(items, chunkSize))
+            if not chunkItems:
+                break
+            if len(self._collectedTypes) == 1:
+                chunkTypes = set(self._collectedTypes)
+            else:
+                chunkTypes = {type(i).__name__ for i in chunkItems}
+            #The items have already been checked
+            chunks.append(self._fromSet(chunkItems, 'Chunk-{}-of-{}'.format(len(chunks), self.name), chunkTypes, self.bad, dict(self.errors)))
+        result = initial
+        first = initial is None
+        if workers is not None and workers > 1 and len(chunks) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+                for partResult in executor.map(mapper, chunks):
+                    result = partResult if first else reducer(result, partResult)
+                    first = False
+        else:
+            for chunk in chunks:
+                partResult = mapper(chunk)
+                result = partResult if first else reducer(result, partResult)
+                first = False
+        return result
+
     def split(self, maxSize):
         """Destructively, splits the `Collection` into _maxSize_ size or smaller `Collections`. The source `Collection` will be empty after this operation
 
@@ -432,10 +587,7 @@ class CollectionWithIDs(Collection):
 
         > `True` if the item is in the collection
         """
-        for i in self:
-            if i.id == idVal:
-                return True
-        return False
+        return self._findID(idVal) is not None
 
     def discardID(self, idVal):
         """Checks if the collected items contains the give _idVal_ and discards it if it is found, will not raise an exception if item is not found
@@ -446,10 +598,10 @@ class CollectionWithIDs(Collection):
 
         > The discarded id string
         """
-        for i in self:
-            if i.id == idVal:
-                self._collection.discard(i)
-                return
+        i = self._findID(idVal)
+        if i is not None:
+            self._collection.discard(i)
+            self._indexDiscard(i)
 
     def removeID(self, idVal):
         """Checks if the collected items contains the give _idVal_ and removes it if it is found, will raise a `KeyError` if item is not found
@@ -460,10 +612,11 @@ class CollectionWithIDs(Collection):
 
         > The removed id string
         """
-        for i in self:
-            if i.id == idVal:
-                self._collection.remove(i)
-                return
+        i = self._findID(idVal)
+        if i is not None:
+            self._collection.remove(i)
+            self._indexDiscard(i)
+            return
         raise KeyError("A Record with the ID '{}' was not found in the RecordCollection: '{}'.".format(idVal, self))
 
     def getID(self, idVal):
@@ -481,11 +634,204 @@ class CollectionWithIDs(Collection):
 
         > The requested object or `None`
         """
-        for i in self:
+        return self._findID(idVal)
+
+    def _findID(self, idVal):
+        """Returns an item with the id _idVal_ or `None`, the id index is used if there is one"""
+        index = self._getIndex('ids')
+        if index is None:
+            items = self._collection
+        else:
+            i = index.get(idVal)
+            if i is not None:
+                return i
+            #Bad items are not indexed by id
+            items = index.badItems()
+        for i in items:
             if i.id == idVal:
                 return i
         return None
 
+    def _idIndex(self):
+        """Returns the index made by createIDIndex() or a new one that is not kept"""
+        index = self._getIndex('ids')
+        if index is None:
+            index = IDIndex(self._collection)
+        return index
+
+    def _checkCombinable(self, other):
+        if type(self) != type(other):
+            raise CollectionTypeError("A {} can only be combined with another {}, not '{}'.".format(type(self).__name__, type(self).__name__, other))
+
+    def _resultByID(self, other, opString, keptIDs, keptBad, addedIDs, addedBad, inPlace):
+        """Makes the result of one of the id keyed operations: the items of this collection with the ids in _keptIDs_ and the bad items in _keptBad_, with the items of _other_ with the ids in _addedIDs_ and the bad items in _addedBad_.
+
+        Only the ids are compared, the items are hashed when they are put in the result, which is made from whichever of the kept and removed items are fewer.
+        """
+        selfIndex = self._idIndex()
+        otherIndex = other._idIndex()
+        selfByID = selfIndex.byID()
+        otherByID = otherIndex.byID()
+        removed = [selfByID[k] for k in selfByID.keys() - keptIDs]
+        removed += selfIndex.badItems() - keptBad
+        added = [otherByID[k] for k in addedIDs]
+        added += addedBad
+        if len(removed) > len(self._collection) // 2:
+            resultSet = set((selfByID[k] for k in keptIDs))
+            resultSet |= keptBad
+        else:
+            resultSet = self._collection if inPlace else self._collection.copy()
+            resultSet.difference_update(removed)
+        resultSet.update(added)
+        if opString == '|':
+            collectedTypes = self._collectedTypes | other._collectedTypes
+        else:
+            collectedTypes = self._combinedTypes(other, resultSet)
+        bad, errors = self._combinedErrors(other)
+        if self._getIndex('ids') is not None:
+            if len(keptIDs) == len(selfByID):
+                resultByID = selfByID if inPlace else selfByID.copy()
+            else:
+                resultByID = {k : selfByID[k] for k in keptIDs}
+            resultByID.update(((k, otherByID[k]) for k in addedIDs))
+            resultIndex = IDIndex._fromParts(resultByID, keptBad | addedBad)
+        else:
+            resultIndex = None
+        if inPlace:
+            if self._indexes:
+                #The id index is replaced, the others are updated
+                self._dropIndex('ids')
+                self._indexAddAll(added)
+                for i in removed:
+                    self._indexDiscard(i)
+            self._collection = resultSet
+            target = self
+            target.name = '{} {}= {}'.format(self.name, opString, other.name)
+            target._collectedTypes = collectedTypes
+            target.bad = bad
+            target.errors = errors
+        else:
+            target = self._fromSet(resultSet, '{} {} {}'.format(self.name, opString, other.name), collectedTypes, bad, errors)
+        if resultIndex is not None:
+            if target._indexes is None:
+                target._indexes = {}
+            target._indexes['ids'] = resultIndex
+        return target
+
+    def unionByID(self, other, inPlace = False):
+        """Gives the union of this collection and _other_ like `|`, but the items are matched by their ids instead of their hashes. The ids are compared as strings and only the items put in the result are hashed, so this is much faster than `|` for large collections that were loaded separately, where matching items are different objects. The result is not checked again, its `_collectedTypes`, `bad` and `errors` are those of both collections.
+
+        The ids are read from the indexes made by [createIDIndex()](#metaknowledge.CollectionWithIDs.createIDIndex), or from all the items of a collection without one. If this collection has an id index the result has one too, made from the indexes of both collections, so chains of operations on indexed collections never read the ids of the items again.
+
+        When an item is in both collections the one in this collection is kept. Bad items do not have unique ids so they are matched by their hashes.
+
+        # Parameters
+
+        _other_ : `CollectionWithIDs`
+
+        > A collection of the same type
+
+        _inPlace_ : `optional [bool]`
+
+        > Default `False`, if `True` this collection is modified, like `|=`, instead of a new one being made
+
+        # Returns
+
+        `CollectionWithIDs`
+
+        > The union, this collection if _inPlace_ is `True`
+        """
+        self._checkCombinable(other)
+        selfIndex = self._idIndex()
+        otherIndex = other._idIndex()
+        return self._resultByID(other, '|', selfIndex.byID().keys(), selfIndex.badItems(), otherIndex.byID().keys() - selfIndex.byID().keys(), otherIndex.badItems() - selfIndex.badItems(), inPlace)
+
+    def intersectionByID(self, other, inPlace = False):
+        """Gives the intersection of this collection and _other_ like `&`, but items are matched by their ids, see [unionByID()](#metaknowledge.CollectionWithIDs.unionByID). The items kept are those of this collection.
+
+        # Parameters
+
+        _other_ : `CollectionWithIDs`
+
+        > A collection of the same type
+
+        _inPlace_ : `optional [bool]`
+
+        > Default `False`, if `True` this collection is modified, like `&=`, instead of a new one being made
+
+        # Returns
+
+        `CollectionWithIDs`
+
+        > The intersection, this collection if _inPlace_ is `True`
+        """
+        self._checkCombinable(other)
+        selfIndex = self._idIndex()
+        otherIndex = other._idIndex()
+        return self._resultByID(other, '&', selfIndex.byID().keys() & otherIndex.byID().keys(), selfIndex.badItems() & otherIndex.badItems(), (), set(), inPlace)
+
+    def differenceByID(self, other, inPlace = False):
+        """Gives the items of this collection that are not in _other_ like `-`, but items are matched by their ids, see [unionByID()](#metaknowledge.CollectionWithIDs.unionByID).
+
+        # Parameters
+
+        _other_ : `CollectionWithIDs`
+
+        > A collection of the same type
+
+        _inPlace_ : `optional [bool]`
+
+        > Default `False`, if `True` this collection is modified, like `-=`, instead of a new one being made
+
+        # Returns
+
+        `CollectionWithIDs`
+
+        > The difference, this collection if _inPlace_ is `True`
+        """
+        self._checkCombinable(other)
+        selfIndex = self._idIndex()
+        otherIndex = other._idIndex()
+        return self._resultByID(other, '-', selfIndex.byID().keys() - otherIndex.byID().keys(), selfIndex.badItems() - otherIndex.badItems(), (), set(), inPlace)
+
+    def symmetricDifferenceByID(self, other, inPlace = False):
+        """Gives the items in only one of this collection and _other_ like `^`, but items are matched by their ids, see [unionByID()](#metaknowledge.CollectionWithIDs.unionByID).
+
+        # Parameters
+
+        _other_ : `CollectionWithIDs`
+
+        > A collection of the same type
+
+        _inPlace_ : `optional [bool]`
+
+        > Default `False`, if `True` this collection is modified, like `^=`, instead of a new one being made
+
+        # Returns
+
+        `CollectionWithIDs`
+
+        > The symmetric difference, this collection if _inPlace_ is `True`
+        """
+        self._checkCombinable(other)
+        selfIndex = self._idIndex()
+        otherIndex = other._idIndex()
+        selfIDs = selfIndex.byID().keys()
+        otherIDs = otherIndex.byID().keys()
+        return self._resultByID(other, '^', selfIDs - otherIDs, selfIndex.badItems() - otherIndex.badItems(), otherIDs - selfIDs, otherIndex.badItems() - selfIndex.badItems(), inPlace)
+
+    def createIDIndex(self):
+        """Creates an index of the items by their ids. The index is kept current as items are added to or removed from the collection, and while it exists [containsID()](#metaknowledge.CollectionWithIDs.containsID), [getID()](#metaknowledge.CollectionWithIDs.getID), [discardID()](#metaknowledge.CollectionWithIDs.discardID) and [removeID()](#metaknowledge.CollectionWithIDs.removeID) look up the id instead of checking every item, and the id keyed set operations, e.g. [unionByID()](#metaknowledge.CollectionWithIDs.unionByID), do not need to read the ids of the items.
+
+        The index is copied by [copy()](./Collection.html#metaknowledge.Collection.copy) and given to the results of the id keyed set operations, but not to other new collections made from this one.
+        """
+        self._addIndex('ids', IDIndex())
+
+    def dropIDIndex(self):
+        """Removes the index made by [createIDIndex()](#metaknowledge.CollectionWithIDs.createIDIndex), if there is one
+        """
+        self._dropIndex('ids')
+
     def badEntries(self):
         """Creates a new collection of the same type with only the bad entries
 
@@ -504,6 +850,10 @@ class CollectionWithIDs(Collection):
     def dropBadEntries(self):
         """Removes all the bad entries from the collection
         """
+        if self._indexes:
+            for i in self:
+                if i.bad:
+                    self._indexDiscard(i)
         self._collection = set((i for i in self if not i.bad))
         self.bad = False
         self.errors = {}
@@ -522,6 +872,46 @@ class CollectionWithIDs(Collection):
             tags |= set(i.keys())
         return tags
 
+    def createIndex(self, tag):
+        """Creates an index of the values of _tag_, mapping each value to the items with it. The index is kept current as items are added to or removed from the collection, and while it exists methods that filter or count by _tag_, e.g. [rankedSeries()](#metaknowledge.CollectionWithIDs.rankedSeries) or [RecordCollection.yearSplit()](./RecordCollection.html#metaknowledge.RecordCollection.yearSplit) with the tag `'year'`, use it instead of reading every item.
+
+        The index can be found by _tag_ or by its other name if all the items give it the same one, so an index of `'year'` of WOS `Records` is also used for `'PY'`. Values that are lists have each of their entries indexed, all the values must be hashable. The index is not copied to new collections made from this one, except by [copy()](./Collection.html#metaknowledge.Collection.copy).
+
+        # Parameters
+
+        _tag_ : `str`
+
+        > The tag to be indexed
+        """
+        if not isinstance(tag, str):
+            raise TagError("'{}' is not a string it cannot be used as a tag.".format(tag))
+        self._addIndex(('tag', tag), TagIndex(tag))
+
+    def dropIndex(self, tag):
+        """Removes the index made by [createIndex()](#metaknowledge.CollectionWithIDs.createIndex) for _tag_, if there is one
+
+        # Parameters
+
+        _tag_ : `str`
+
+        > The indexed tag
+        """
+        index = self._tagIndex(tag)
+        if index is not None:
+            self._dropIndex(('tag', index.tag))
+
+    def _tagIndex(self, tag):
+        """Returns the index of _tag_ made by createIndex() or `None`"""
+        if self._indexes:
+            try:
+                return self._indexes[('tag', tag)]
+            except KeyError:
+                pass
+            for index in self._indexes.values():
+                if isinstance(index, TagIndex) and tag in index.names:
+                    return index
+        return None
+
     def glimpse(self, *tags, compact = False):
         """Creates a printable table with the most frequently occurring values of each of the requested _tags_, or if none are provided the top authors, journals and citations. The table will be as wide and as tall as the terminal (or 80x24 if there is no terminal) so `print(RC.glimpse())`should always create a nice looking table. Below is a table created from some of the testing files:
 
@@ -566,7 +956,7 @@ class CollectionWithIDs(Collection):
         """
         return _glimpse(self, *tags, compact = compact)
 
-    def rankedSeries(self, tag, outputFile = None, giveCounts = True, giveRanks = False, greatestFirst = True, pandasMode = True, limitTo = None):
+    def rankedSeries(self, tag, outputFile = None, giveCounts = True, giveRanks = False, greatestFirst = True, pandasMode = True, limitTo = None, workers = None):
         """Creates an pandas dict of the ordered list of all the values of _tag_, with and ranked by their number of occurrences. A list can also be returned with the the counts or ranks added or it can be written to a file.
 
         # Parameters
@@ -599,68 +989,28 @@ class CollectionWithIDs(Collection):
 
         > Default `None`, if a list is provided only those values in the list will be counted or returned
 
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the values are counted by a pool of _workers_ processes, with [mapReduce()](./Collection.html#metaknowledge.Collection.mapReduce)
+
         # Returns
 
         `dict[str:list[value]] or list[str]`
 
         > A `dict` or `list` will be returned depending on if _pandasMode_ is `True`
+
+        If there is an index of _tag_, from [createIndex()](#metaknowledge.CollectionWithIDs.createIndex), the counts are taken from it.
         """
         if giveRanks and giveCounts:
             raise mkException("rankedSeries cannot return counts and ranks only one of giveRanks or giveCounts can be True.")
-        seriesDict = {}
-        for R in self:
-            #This should be faster than using get, since get is a wrapper for __getitem__
-            try:
-                val = R[tag]
-            except KeyError:
-                continue
-            if not isinstance(val, list):
-                val = [val]
-            for entry in val:
-                if limitTo and entry not in limitTo:
-                    continue
-                if entry in seriesDict:
-                    seriesDict[entry] += 1
-                else:
-                    seriesDict[entry] = 1
-        seriesList = sorted(seriesDict.items(), key = lambda x: x[1], reverse = greatestFirst)
-        if outputFile is not None:
-            with open(outputFile, 'w') as f:
-                writer = csv.writer(f, dialect = 'excel')
-                writer.writerow((str(tag), 'count'))
-                writer.writerows(seriesList)
-        if giveCounts and not pandasMode:
-            return seriesList
-        elif giveRanks or pandasMode:
-            if not greatestFirst:
-                seriesList.reverse()
-            currentRank = 1
-            retList = []
-            panDict = {'entry' : [], 'count' : [], 'rank' : []}
-            try:
-                currentCount = seriesList[0][1]
-            except IndexError:
-                #Empty series so no need to loop
-                pass
-            else:
-                for valString, count in seriesList:
-                    if currentCount > count:
-                        currentRank += 1
-                        currentCount = count
-                    if pandasMode:
-                        panDict['entry'].append(valString)
-                        panDict['count'].append(count)
-                        panDict['rank'].append(currentRank)
-                    else:
-                        retList.append((valString, currentRank))
-            if not greatestFirst:
-                retList.reverse()
-            if pandasMode:
-                return panDict
-            else:
-                return retList
+        tagIndex = self._tagIndex(tag)
+        if tagIndex is not None:
+            seriesDict = tagIndex.counts(limitTo if limitTo else None)
+        elif workers is not None and workers > 1:
+            seriesDict = self.mapReduce(functools.partial(_countTagValues, tag = tag, limitTo = limitTo), reduceCounts, workers = workers, initial = {})
         else:
-            return [e for e,c in seriesList]
+            seriesDict = _countTagValues(self, tag, limitTo)
+        return _rankedSeriesOutput(seriesDict, tag, outputFile, giveCounts, giveRanks, greatestFirst, pandasMode)
 
     def timeSeries(self, tag = None, outputFile = None, giveYears = True, greatestFirst = True, limitTo = False, pandasMode = True):
         """Creates an pandas dict of the ordered list of all the values of _tag_, with and ranked by the year the occurred in, multiple year occurrences will create multiple entries. A list can also be returned with the the counts or years added or it can be written to a file.
@@ -700,31 +1050,54 @@ class CollectionWithIDs(Collection):
         > A `dict` or `list` will be returned depending on if _pandasMode_ is `True`
         """
         seriesDict = {}
-        for R in self:
-            #This should be faster than using get, since get is a wrapper for __getitem__
-            try:
-                year = R['year']
-            except KeyError:
-                continue
-            if tag is None:
-                seriesDict[R] = {year : 1}
-            else:
+        tagIndex = self._tagIndex(tag) if tag is not None else None
+        if tagIndex is not None:
+            #Only the Records with the wanted values are looked at
+            yearIndex = self._tagIndex('year')
+            for entry in (limitTo if limitTo else tagIndex.values()):
+                if entry in seriesDict:
+                    continue
+                yearCounts = {}
+                for R, count in tagIndex.withValue(entry).items():
+                    if yearIndex is not None:
+                        years = yearIndex.valueCounts(R)
+                        if years is None:
+                            continue
+                        year = next(iter(years))
+                    else:
+                        try:
+                            year = R['year']
+                        except KeyError:
+                            continue
+                    yearCounts[year] = yearCounts.get(year, 0) + count
+                if yearCounts:
+                    seriesDict[entry] = yearCounts
+        else:
+            for R in self:
+                #This should be faster than using get, since get is a wrapper for __getitem__
                 try:
-                    val = R[tag]
+                    year = R['year']
                 except KeyError:
                     continue
-                if not isinstance(val, list):
-                    val = [val]
-                for entry in val:
-                    if limitTo and entry not in limitTo:
+                if tag is None:
+                    seriesDict[R] = {year : 1}
+                else:
+                    try:
+                        val = R[tag]
+                    except KeyError:
                         continue
-                    if entry in seriesDict:
-                        try:
-                            seriesDict[entry][year] += 1
-                        except KeyError:
-                            seriesDict[entry][year] = 1
-                    else:
-                        seriesDict[entry] = {year : 1}
+                    if not isinstance(val, list):
+                        val = [val]
+                    for entry in val:
+                        if limitTo and entry not in limitTo:
+                            continue
+                        if entry in seriesDict:
+                            try:
+                                seriesDict[entry][year] += 1
+                            except KeyError:
+                                seriesDict[entry][year] = 1
+                        else:
+                            seriesDict[entry] = {year : 1}
         seriesList = []
         for e, yd in seriesDict.items():
             seriesList += [(e, y) for y in yd.keys()]
@@ -746,7 +1119,7 @@ class CollectionWithIDs(Collection):
         else:
             return [e for e,c in seriesList]
 
-    def cooccurrenceCounts(self, keyTag, *countedTags):
+    def cooccurrenceCounts(self, keyTag, *countedTags, workers = None):
         """Counts the number of times values from any of the _countedTags_ occurs with _keyTag_. The counts are retuned as a dictionary with the values of _keyTag_ mapping to dictionaries with each of the _countedTags_ values mapping to thier counts.
 
         # Parameters
@@ -759,6 +1132,10 @@ class CollectionWithIDs(Collection):
 
         > The tags used as the key for the returned dictionary's values
 
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the co-occurrences are counted by a pool of _workers_ processes, with [mapReduce()](./Collection.html#metaknowledge.Collection.mapReduce)
+
         # Returns
 
         `dict[str:dict[str:int]]`
@@ -772,36 +1149,15 @@ class CollectionWithIDs(Collection):
         for tag in countedTags:
             if not isinstance(tag, str):
                 raise TagError("'{}' is not a string it cannot be used as a tag.".format(tag))
-        occurenceDict = {}
+        if workers is not None and workers > 1:
+            return self.mapReduce(functools.partial(_countCooccurrences, keyTag = keyTag, countedTags = countedTags), reduceCounts, workers = workers, initial = {})
         progArgs = (0, "Starting to count the co-occurrences of '{}' and' {}'".format(keyTag, "','".join(countedTags)))
         if metaknowledge.VERBOSE_MODE:
             progKwargs = {'dummy' : False}
         else:
             progKwargs = {'dummy' : True}
         with _ProgressBar(*progArgs, **progKwargs) as PBar:
-
-            for i, R in enumerate(self):
-                PBar.updateVal(i / len(self), "Analyzing {}".format(R))
-                keyVal = R.get(keyTag)
-                if keyVal is None:
-                    continue
-                if not isinstance(keyVal, list):
-                    keyVal = [keyVal]
-                for key in keyVal:
-                    if key not in occurenceDict:
-                        occurenceDict[key] = {}
-                for tag in countedTags:
-                    tagval = R.get(tag)
-                    if tagval is None:
-                        continue
-                    if not isinstance(tagval, list):
-                        tagval = [tagval]
-                    for val in tagval:
-                        for key in keyVal:
-                            try:
-                                occurenceDict[key][val] += 1
-                            except KeyError:
-                                occurenceDict[key][val] = 1
+            occurenceDict = _countCooccurrences(self, keyTag, countedTags, PBar = PBar)
             PBar.finish("Done extracting the co-occurrences of '{}' and '{}'".format(keyTag, "','".join(countedTags)))
         return occurenceDict
 
@@ -1306,3 +1662,175 @@ class CollectionWithIDs(Collection):
             if PBar:
                 PBar.finish("Done making a {}-mode network of: {}".format(len(tags), ', '.join(tags)))
         return grph
+
+def _countTagValues(records, tag, limitTo = None, seriesDict = None):
+    """Counts the occurrences of the values of _tag_ in _records_, adding them to _seriesDict_ if it is given.
+
+    This is the counting step of [rankedSeries()](#metaknowledge.CollectionWithIDs.rankedSeries), it only needs to iterate over _records_ so it can be used on any stream of `Records`.
+    """
+    if seriesDict is None:
+        seriesDict = {}
+    for R in records:
+        #This should be faster than using get, since get is a wrapper for __getitem__
+        try:
+            val = R[tag]
+        except KeyError:
+            continue
+        if not isinstance(val, list):
+            val = [val]
+        for entry in val:
+            if limitTo and entry not in limitTo:
+                continue
+            if entry in seriesDict:
+                seriesDict[entry] += 1
+            else:
+                seriesDict[entry] = 1
+    return seriesDict
+
+def _countCooccurrences(records, keyTag, countedTags, PBar = None):
+    """Counts the co-occurrences of the values of _keyTag_ and _countedTags_ in _records_, this is the counting step of [cooccurrenceCounts()](#metaknowledge.CollectionWithIDs.cooccurrenceCounts)."""
+    occurenceDict = {}
+    for i, R in enumerate(records):
+        if PBar:
+            PBar.updateVal(i / len(records), "Analyzing {}".format(R))
+        keyVal = R.get(keyTag)
+        if keyVal is None:
+            continue
+        if not isinstance(keyVal, list):
+            keyVal = [keyVal]
+        for key in keyVal:
+            if key not in occurenceDict:
+                occurenceDict[key] = {}
+        for tag in countedTags:
+            tagval = R.get(tag)
+            if tagval is None:
+                continue
+            if not isinstance(tagval, list):
+                tagval = [tagval]
+            for val in tagval:
+                for key in keyVal:
+                    try:
+                        occurenceDict[key][val] += 1
+                    except KeyError:
+                        occurenceDict[key][val] = 1
+    return occurenceDict
+
+def reduceCounts(target, added):
+    """A reducer for [mapReduce()](../classes/Collection.html#metaknowledge.Collection.mapReduce), adds the counts in _added_ to those in _target_. Dicts of counts can be nested, like those from [cooccurrenceCounts()](../classes/CollectionWithIDs.html#metaknowledge.CollectionWithIDs.cooccurrenceCounts).
+
+    # Parameters
+
+    _target_ : `dict`
+
+    > The counts so far, it is modified
+
+    _added_ : `dict`
+
+    > The counts to be added
+
+    # Returns
+
+    `dict`
+
+    > _target_
+    """
+    for key, val in added.items():
+        if isinstance(val, dict):
+            reduceCounts(target.setdefault(key, {}), val)
+        else:
+            target[key] = target.get(key, 0) + val
+    return target
+
+def reduceGraphs(target, added):
+    """A reducer for [mapReduce()](../classes/Collection.html#metaknowledge.Collection.mapReduce), merges the network _added_ into _target_ with [mergeGraphs()](#metaknowledge.graphHelpers.mergeGraphs), so the `'count'` of the nodes and `'weight'` of the edges are added together.
+
+    # Parameters
+
+    _target_ : `networkx Graph`
+
+    > The network so far, it is modified
+
+    _added_ : `networkx Graph`
+
+    > The network to be added
+
+    # Returns
+
+    `networkx Graph`
+
+    > _target_
+    """
+    mergeGraphs(target, added)
+    return target
+
+def reduceLists(target, added):
+    """A reducer for [mapReduce()](../classes/Collection.html#metaknowledge.Collection.mapReduce), extends each list in _target_ by the list with the same key in _added_, like the pandas ready dicts from [makeDict()](../classes/RecordCollection.html#metaknowledge.RecordCollection.makeDict). The lists are treated as columns of the same length, so a key missing from one of them gets `None` for each of its rows.
+
+    # Parameters
+
+    _target_ : `dict[object : list]`
+
+    > The lists so far, they are modified
+
+    _added_ : `dict[object : list]`
+
+    > The lists to be added
+
+    # Returns
+
+    `dict[object : list]`
+
+    > _target_
+    """
+    targetLength = len(next(iter(target.values()), []))
+    addedLength = len(next(iter(added.values()), []))
+    for key, val in target.items():
+        if key not in added:
+            val.extend([None] * addedLength)
+    for key, val in added.items():
+        if key in target:
+            target[key].extend(val)
+        else:
+            target[key] = [None] * targetLength + list(val)
+    return target
+
+def _rankedSeriesOutput(seriesDict, tag, outputFile, giveCounts, giveRanks, greatestFirst, pandasMode):
+    """Sorts the counts made by `_countTagValues()` and formats them as requested by [rankedSeries()](#metaknowledge.CollectionWithIDs.rankedSeries)."""
+    seriesList = sorted(seriesDict.items(), key = lambda x: x[1], reverse = greatestFirst)
+    if outputFile is not None:
+        with open(outputFile, 'w') as f:
+            writer = csv.writer(f, dialect = 'excel')
+            writer.writerow((str(tag), 'count'))
+            writer.writerows(seriesList)
+    if giveCounts and not pandasMode:
+        return seriesList
+    elif giveRanks or pandasMode:
+        if not greatestFirst:
+            seriesList.reverse()
+        currentRank = 1
+        retList = []
+        panDict = {'entry' : [], 'count' : [], 'rank' : []}
+        try:
+            currentCount = seriesList[0][1]
+        except IndexError:
+            #Empty series so no need to loop
+            pass
+        else:
+            for valString, count in seriesList:
+                if currentCount > count:
+                    currentRank += 1
+                    currentCount = count
+                if pandasMode:
+                    panDict['entry'].append(valString)
+                    panDict['count'].append(count)
+                    panDict['rank'].append(currentRank)
+                else:
+                    retList.append((valString, currentRank))
+        if not greatestFirst:
+            retList.reverse()
+        if pandasMode:
+            return panDict
+        else:
+            return retList
+    else:
+        return [e for e,c in seriesList]
@@ -0,0 +1,300 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""A read only store of `Records` in a memory mapped file, made by [RecordCollection.freeze()](../classes/RecordCollection.html#metaknowledge.RecordCollection.freeze), for sharing a collection between processes.
+
+Pickling a `RecordCollection` to send it to worker processes copies every `Record`, with all their processed values, into each of them. A [FrozenRecordCollection](#metaknowledge.mkFrozen.FrozenRecordCollection) instead pickles as the name of its file, each process maps the same file and the operating system shares its pages between them. By default the file is put in `/dev/shm`, if it exists, so it is never written to disk.
+
+The raw fields are stored in the same columnar segments as the [mkCache](#module-metaknowledge.mkCache), one per record type and source file, with each segment's strings stored once, so a reference cited by many `Records` in a file is one entry in its string table. The string offsets are in bytes so a `Record` can be made without decoding the rest of the segment. `Records` are made when they are accessed and are not kept, their processed values are computed by the process using them, WOS citations go through the process's citation cache so each distinct reference is only parsed once per process.
+
+The layout of the file is:
+
+    header : magic bytes, format version
+    segments : one per record type and source file
+    manifest : utf-8 JSON
+    footer : manifest offset, manifest length, magic bytes
+"""
+import bisect
+import concurrent.futures
+import json
+import mmap
+import os
+import os.path
+import struct
+import sys
+import tempfile
+
+from .constants import __version__
+from .mkExceptions import cacheError, RCTypeError
+from .mkCache import _encodeSegment, _SegmentReader, _recordClasses
+
+frozenFormatVersion = 1
+
+_magic = b'mkFrozen'
+_header = struct.Struct('<8sI')
+_footer = struct.Struct('<QQ8s')
+
+def _defaultDir():
+    #Files in /dev/shm are kept in memory
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+def freezeRecords(records, fileName = None, name = ''):
+    """Writes the raw fields of _records_ to a file that can be read by [FrozenRecordCollection](#metaknowledge.mkFrozen.FrozenRecordCollection)
+
+    # Parameters
+
+    _records_ : `iterable[Record]`
+
+    > The `Records` to be stored
+
+    _fileName_ : `optional [str]`
+
+    > Default `None`, the path of the file, if `None` a new file is made in `/dev/shm` or if that is not available the temporary directory
+
+    _name_ : `optional [str]`
+
+    > Default `''`, the name stored with the `Records`
+
+    # Returns
+
+    `str`
+
+    > The path of the file
+    """
+    recordClasses = _recordClasses()
+    groups = {}
+    for R in records:
+        if type(R).__name__ not in recordClasses:
+            raise RCTypeError("{} cannot be frozen, only Records of the types {} can be.".format(R, ', '.join(sorted(recordClasses))))
+        groups.setdefault((type(R).__name__, R._sourceFile), []).append(R)
+    if fileName is None:
+        fd, fileName = tempfile.mkstemp(suffix = '.mkFrozen', prefix = 'metaknowledge-', dir = _defaultDir())
+        f = os.fdopen(fd, 'wb')
+    else:
+        f = open(fileName, 'wb')
+    with f:
+        f.write(_header.pack(_magic, frozenFormatVersion))
+        segments = []
+        for (recordType, sourceFile), recs in groups.items():
+            segment = _encodeSegment(recs, byteOffsets = True)
+            segments.append({
+                'recordType' : recordType,
+                'sourceFile' : sourceFile,
+                'records' : len(recs),
+                'offset' : f.tell(),
+                'length' : len(segment),
+            })
+            f.write(segment)
+        manifest = {
+            "metaknowledge Version" : __version__,
+            "Format Version" : frozenFormatVersion,
+            "Byte Order" : sys.byteorder,
+            "Name" : name,
+            "Segments" : segments,
+        }
+        manifestBytes = json.dumps(manifest).encode('utf-8')
+        manifestStart = f.tell()
+        f.write(manifestBytes)
+        f.write(_footer.pack(manifestStart, len(manifestBytes), _magic))
+    return fileName
+
+class _FrozenStrings(object):
+    #The strings of a segment, each is decoded from the mapped file when it is requested
+    def __init__(self, blob, starts):
+        self._blob = blob
+        self._starts = starts
+
+    def __getitem__(self, i):
+        return str(self._blob[self._starts[i]:self._starts[i + 1]], 'utf-8', 'surrogatepass')
+
+class _FrozenSegmentReader(_SegmentReader):
+    """A [_SegmentReader](#metaknowledge.mkCache._SegmentReader) whose columns are views of the mapped file instead of copies."""
+    def __init__(self, buf):
+        _SegmentReader.__init__(self, buf)
+        self._strings = _FrozenStrings(buf[self._blobStart:], self.stringStarts)
+
+    def _column(self, typecode, length):
+        end = self._pos + struct.calcsize(typecode) * length
+        col = self._buf[self._pos:end].cast(typecode)
+        self._pos = end
+        return col
+
+class FrozenRecordCollection(object):
+    """A read only sequence of the `Records` stored in a file by [freezeRecords()](#metaknowledge.mkFrozen.freezeRecords), usually made with [RecordCollection.freeze()](../classes/RecordCollection.html#metaknowledge.RecordCollection.freeze).
+
+    The file is memory mapped, so any number of `FrozenRecordCollections` in any number of processes can use the same file without copying it. Pickling one only pickles the name of its file and the range of `Records` it covers, so they can be sent to worker processes cheaply, the file must not be changed or removed while they are in use.
+
+    Indexing with an integer makes that `Record`, while slicing (without a step) gives a `FrozenRecordCollection` of the range sharing the same map. [mapChunks()](#metaknowledge.mkFrozen.FrozenRecordCollection.mapChunks) runs a function over chunks of the `Records` in a pool of processes.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _fileName_ : `str`
+
+    > The path of the file
+
+    _start_ : `optional [int]`
+
+    > Default `0`, the index of the first `Record` covered
+
+    _stop_ : `optional [int]`
+
+    > Default `None`, the index after the last `Record` covered, `None` for the end of the file
+    """
+    def __init__(self, fileName, start = 0, stop = None):
+        self.fileName = fileName
+        self._open()
+        total = self._segmentStarts[-1]
+        if stop is None or stop > total:
+            stop = total
+        self._start = min(max(start, 0), stop)
+        self._stop = stop
+
+    def _open(self):
+        with open(self.fileName, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        if len(self._mmap) < _header.size + _footer.size:
+            raise cacheError("'{}' is too short to be a frozen RecordCollection.".format(self.fileName))
+        magic, version = _header.unpack_from(self._mmap, 0)
+        if magic != _magic or version != frozenFormatVersion:
+            raise cacheError("'{}' is not a frozen RecordCollection of version {}.".format(self.fileName, frozenFormatVersion))
+        manifestStart, manifestLength, magic = _footer.unpack_from(self._mmap, len(self._mmap) - _footer.size)
+        if magic != _magic:
+            raise cacheError("'{}' has a damaged footer.".format(self.fileName))
+        manifest = json.loads(self._mmap[manifestStart:manifestStart + manifestLength].decode('utf-8'))
+        if manifest["Byte Order"] != sys.byteorder:
+            raise cacheError("'{}' was written on a machine with a different byte order.".format(self.fileName))
+        self.name = manifest["Name"]
+        self._segmentInfo = manifest["Segments"]
+        self._segmentStarts = [0]
+        for info in self._segmentInfo:
+            self._segmentStarts.append(self._segmentStarts[-1] + info['records'])
+        self._recordClasses = _recordClasses()
+        #Readers are made when their segments are first used
+        self._readers = [None] * len(self._segmentInfo)
+
+    def _reader(self, s):
+        reader = self._readers[s]
+        if reader is None:
+            info = self._segmentInfo[s]
+            reader = self._readers[s] = _FrozenSegmentReader(memoryview(self._mmap)[info['offset']:info['offset'] + info['length']])
+        return reader
+
+    def _makeRecord(self, i):
+        s = bisect.bisect_right(self._segmentStarts, i) - 1
+        info = self._segmentInfo[s]
+        return self._reader(s).makeRecord(i - self._segmentStarts[s], self._recordClasses[info['recordType']], info['sourceFile'])
+
+    def __getstate__(self):
+        return (self.fileName, self._start, self._stop)
+
+    def __setstate__(self, state):
+        self.fileName, self._start, self._stop = state
+        self._open()
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __iter__(self):
+        for i in range(self._start, self._stop):
+            yield self._makeRecord(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("FrozenRecordCollections can only be sliced with a step of 1.")
+            view = object.__new__(type(self))
+            view.__dict__.update(self.__dict__)
+            view._start = self._start + start
+            view._stop = self._start + max(start, stop)
+            return view
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("FrozenRecordCollection index out of range")
+        return self._makeRecord(self._start + key)
+
+    def __repr__(self):
+        return "<{} '{}' of {} Records from '{}'>".format(type(self).__name__, self.name, len(self), self.fileName)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def chunks(self, maxSize):
+        """Splits the `Records` into consecutive ranges of at most _maxSize_, like [Collection.chunk()](../classes/Collection.html#metaknowledge.Collection.chunk) but without copying anything
+
+        # Parameters
+
+        _maxSize_ : `int`
+
+        > The maximum number of `Records` in a chunk
+
+        # Returns
+
+        `list [FrozenRecordCollection]`
+
+        > The chunks, in order
+        """
+        if not isinstance(maxSize, int) or maxSize < 1:
+            raise ValueError("maxSize must be a positive integer, not {}.".format(maxSize))
+        return [self[start:start + maxSize] for start in range(0, len(self), maxSize)]
+
+    def mapChunks(self, func, maxSize = 10000, workers = None):
+        """Calls _func_ on each chunk from [chunks()](#metaknowledge.mkFrozen.FrozenRecordCollection.chunks), in a pool of _workers_ processes if given. Each worker maps the file itself, so only the range of each chunk is sent to it and only the results of _func_ are sent back.
+
+        # Parameters
+
+        _func_ : `function`
+
+        > A function taking a `FrozenRecordCollection`, it must be picklable (defined at the top level of a module) if _workers_ is used
+
+        _maxSize_ : `optional [int]`
+
+        > Default `10000`, the maximum number of `Records` in a chunk
+
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the chunks are run by a pool of _workers_ processes, otherwise they are run in this process
+
+        # Returns
+
+        `list`
+
+        > The results of _func_ for each chunk, in order
+        """
+        chunks = self.chunks(maxSize)
+        if workers is None or workers < 2 or len(chunks) < 2:
+            return [func(chunk) for chunk in chunks]
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            return list(executor.map(func, chunks))
+
+    def toRecordCollection(self):
+        """Makes a `RecordCollection` of copies of the `Records`, it does not depend on the file
+
+        # Returns
+
+        `RecordCollection`
+
+        > The new `RecordCollection`
+        """
+        from .recordCollection import RecordCollection
+        return RecordCollection(list(self), name = self.name, quietStart = True)
+
+    def close(self):
+        """Unmaps the file, `Records` already made can still be used. Any other `FrozenRecordCollections` made by slicing this one are also closed."""
+        self._readers = [None] * len(self._segmentInfo)
+        try:
+            self._mmap.close()
+        except BufferError:
+            #Slices of this one still have views into the map, it is freed with them
+            pass
+
+    def remove(self):
+        """Closes this `FrozenRecordCollection` and deletes its file, processes that have the file mapped can keep using it until they close it"""
+        self.close()
+        os.remove(self.fileName)
@@ -0,0 +1,508 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""The indexes a [Collection](./classes/Collection.html#metaknowledge.Collection) can keep of its items, these are kept current as items are added to or removed from the Collection so lookups do not need to scan all the items.
+"""
+import abc
+import bisect
+
+from .mkExceptions import TagError
+
+class CollectionIndex(object, metaclass = abc.ABCMeta):
+    """The base of the indexes, an index is told about each item added to or removed from its Collection with [add()](#metaknowledge.mkIndex.CollectionIndex.add) and [discard()](#metaknowledge.mkIndex.CollectionIndex.discard), these must do nothing if the item was already added or removed.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _items_ : `optional [iterable]`
+
+    > Default `()`, the items to start with
+    """
+    def __init__(self, items = ()):
+        self.rebuild(items)
+
+    @abc.abstractmethod
+    def add(self, item):
+        """An `abstractmethod`, adds _item_ to the index
+
+        # Parameters
+
+        _item_ : `object`
+
+        > The item to be indexed
+        """
+        pass
+
+    @abc.abstractmethod
+    def discard(self, item):
+        """An `abstractmethod`, removes _item_ from the index
+
+        # Parameters
+
+        _item_ : `object`
+
+        > The item to be removed
+        """
+        pass
+
+    @abc.abstractmethod
+    def clear(self):
+        """An `abstractmethod`, empties the index"""
+        pass
+
+    @abc.abstractmethod
+    def copy(self):
+        """An `abstractmethod`, creates a copy of the index that can be changed without affecting this one
+
+        # Returns
+
+        `CollectionIndex`
+
+        > The copy
+        """
+        pass
+
+    def rebuild(self, items):
+        """Empties the index and adds all of _items_
+
+        # Parameters
+
+        _items_ : `iterable`
+
+        > The items to be indexed
+        """
+        self.clear()
+        for item in items:
+            self.add(item)
+
+class CitationIndex(CollectionIndex):
+    """An inverted index of the citations of Records, used by [RecordCollection.createCitationIndex()](./classes/RecordCollection.html#metaknowledge.RecordCollection.createCitationIndex).
+
+    Each distinct citation string is mapped to its [Citation](./classes/Citation.html#metaknowledge.citation.Citation) and the Records citing it, with the number of times they do. As Citations that compare equal can come from different strings, each Citation is also mapped to the strings giving it. If `FAST_CITES` is set the strings are not kept, so equal Citations are indexed together.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _items_ : `optional [iterable[Record]]`
+
+    > Default `()`, the Records to start with
+    """
+    def add(self, R):
+        if R in self._indexed:
+            return
+        rCites = R.get('citations')
+        self._indexed[R] = rCites
+        if rCites:
+            for c in rCites:
+                original = _citeOriginal(c)
+                try:
+                    self._byOriginal[original][1][R] = self._byOriginal[original][1].get(R, 0) + 1
+                except KeyError:
+                    self._byOriginal[original] = (c, {R : 1})
+                    self._byCitation.setdefault(c, set()).add(original)
+
+    def discard(self, R):
+        try:
+            rCites = self._indexed.pop(R)
+        except KeyError:
+            return
+        if rCites:
+            for c in rCites:
+                original = _citeOriginal(c)
+                try:
+                    cite, citing = self._byOriginal[original]
+                except KeyError:
+                    #Already removed, the Record cites it more than once
+                    continue
+                citing.pop(R, None)
+                if not citing:
+                    del self._byOriginal[original]
+                    originals = self._byCitation[cite]
+                    originals.discard(original)
+                    if not originals:
+                        del self._byCitation[cite]
+
+    def clear(self):
+        #Records to their citations, so they can be removed even if their citations cannot be recomputed
+        self._indexed = {}
+        #Citation strings, or the Citations when FAST_CITES is set, to tuples of their Citation and a dict of the Records citing them to the number of times they do
+        self._byOriginal = {}
+        #Citations to the set of strings giving them
+        self._byCitation = {}
+
+    def copy(self):
+        """Creates a copy of the index that can be changed without affecting this one
+
+        # Returns
+
+        `CitationIndex`
+
+        > The copy
+        """
+        indexCopy = type(self)()
+        indexCopy._indexed = self._indexed.copy()
+        indexCopy._byOriginal = {original : (c, citing.copy()) for original, (c, citing) in self._byOriginal.items()}
+        indexCopy._byCitation = {c : originals.copy() for c, originals in self._byCitation.items()}
+        return indexCopy
+
+    def citing(self, cite):
+        """Gives the Records that cite _cite_
+
+        # Parameters
+
+        _cite_ : `Citation`
+
+        > The cited Citation, Citations equal to it are also matched
+
+        # Returns
+
+        `set[Record]`
+
+        > The Records citing _cite_
+        """
+        recs = set()
+        for original in self._byCitation.get(cite, ()):
+            recs.update(self._byOriginal[original][1])
+        return recs
+
+    def citations(self):
+        """Gives each of the distinct citation strings as its Citation, with the Records citing it and the number of times they do
+
+        # Returns
+
+        `iterator[(Citation, dict[Record : int])]`
+
+        > The Citations and the Records citing them
+        """
+        return iter(self._byOriginal.values())
+
+def _citeOriginal(c):
+    """The string _c_ was made from, or _c_ itself if it was made with FAST_CITES set and the string was not kept"""
+    return getattr(c, 'original', c)
+
+class TagIndex(CollectionIndex):
+    """An index of the processed values of a tag, used by [CollectionWithIDs.createIndex()](./classes/CollectionWithIDs.html#metaknowledge.CollectionWithIDs.createIndex).
+
+    Each value is mapped to the items with it and the number of times they have it, the values of tags that give lists are indexed separately. The values are also kept sorted, when they can be, for range lookups, the sorting is only redone after a value is added or removed.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _tag_ : `str`
+
+    > The tag to index, its values must be hashable
+
+    _items_ : `optional [iterable]`
+
+    > Default `()`, the items to start with
+    """
+    def __init__(self, tag, items = ()):
+        self.tag = tag
+        CollectionIndex.__init__(self, items = items)
+
+    def add(self, item):
+        if item in self._indexed:
+            return
+        itemType = type(item)
+        if itemType not in self._types:
+            self._types.add(itemType)
+            try:
+                typeNames = {self.tag, itemType.getAltName(self.tag)}
+            except AttributeError:
+                typeNames = {self.tag}
+            #Only names that mean the same tag for every type are kept
+            if self._types == {itemType}:
+                self.names = typeNames - {None}
+            else:
+                self.names &= typeNames
+        try:
+            val = item[self.tag]
+        except KeyError:
+            self._indexed[item] = None
+            self._missing.add(item)
+            return
+        if not isinstance(val, list):
+            val = [val]
+        counts = {}
+        for entry in val:
+            try:
+                counts[entry] = counts.get(entry, 0) + 1
+            except TypeError:
+                raise TagError("The values of '{}' cannot be indexed, {} is not hashable.".format(self.tag, entry)) from None
+        self._indexed[item] = counts
+        for entry, count in counts.items():
+            try:
+                self._values[entry][item] = count
+            except KeyError:
+                self._values[entry] = {item : count}
+                self._sortedValues = None
+
+    def discard(self, item):
+        try:
+            counts = self._indexed.pop(item)
+        except KeyError:
+            return
+        if counts is None:
+            self._missing.discard(item)
+            return
+        for entry in counts:
+            withEntry = self._values[entry]
+            del withEntry[item]
+            if not withEntry:
+                del self._values[entry]
+                self._sortedValues = None
+
+    def clear(self):
+        #The names the tag can be reached by, the alternative names are found as new types of items are added
+        self.names = {self.tag}
+        self._types = set()
+        #Items to the counts of their values, or None if they are missing the tag
+        self._indexed = {}
+        #Values to dicts of the items with them to the number of times they do
+        self._values = {}
+        self._missing = set()
+        #Made when needed by between()
+        self._sortedValues = None
+
+    def copy(self):
+        """Creates a copy of the index that can be changed without affecting this one
+
+        # Returns
+
+        `TagIndex`
+
+        > The copy
+        """
+        indexCopy = type(self)(self.tag)
+        indexCopy.names = self.names.copy()
+        indexCopy._types = self._types.copy()
+        indexCopy._indexed = self._indexed.copy()
+        indexCopy._values = {entry : withEntry.copy() for entry, withEntry in self._values.items()}
+        indexCopy._missing = self._missing.copy()
+        indexCopy._sortedValues = self._sortedValues
+        return indexCopy
+
+    def lookup(self, value):
+        """Gives the items with _value_
+
+        # Parameters
+
+        _value_ : `object`
+
+        > The value of the tag
+
+        # Returns
+
+        `set`
+
+        > The items with _value_, or one of their values is _value_ if the tag gives lists
+        """
+        return set(self._values.get(value, ()))
+
+    def between(self, low, high):
+        """Gives the items with values from _low_ to _high_ inclusive, values that cannot be compared with them are skipped
+
+        # Parameters
+
+        _low_ : `object`
+
+        > The smallest value
+
+        _high_ : `object`
+
+        > The largest value
+
+        # Returns
+
+        `set`
+
+        > The items with values from _low_ to _high_
+        """
+        if self._sortedValues is None:
+            try:
+                self._sortedValues = sorted(self._values)
+            except TypeError:
+                #Mixed types cannot be sorted, so they are all checked
+                self._sortedValues = False
+        if self._sortedValues is False:
+            inRange = []
+            for entry in self._values:
+                try:
+                    if low <= entry <= high:
+                        inRange.append(entry)
+                except TypeError:
+                    pass
+        else:
+            inRange = self._sortedValues[bisect.bisect_left(self._sortedValues, low):bisect.bisect_right(self._sortedValues, high)]
+        items = set()
+        for entry in inRange:
+            items.update(self._values[entry])
+        return items
+
+    def withValue(self, value):
+        """Gives the items with _value_ and the number of times they have it
+
+        # Parameters
+
+        _value_ : `object`
+
+        > The value of the tag
+
+        # Returns
+
+        `dict[object : int]`
+
+        > The items with _value_ mapped to their counts of it, this must not be modified
+        """
+        return self._values.get(value, {})
+
+    def values(self):
+        """Gives all the distinct values of the tag
+
+        # Returns
+
+        `list`
+
+        > The values
+        """
+        return list(self._values)
+
+    def missing(self):
+        """Gives the items without the tag
+
+        # Returns
+
+        `set`
+
+        > The items that raise a `KeyError` for the tag
+        """
+        return set(self._missing)
+
+    def valueCounts(self, item):
+        """Gives the values of _item_ with the number of times it has each
+
+        # Parameters
+
+        _item_ : `object`
+
+        > An indexed item
+
+        # Returns
+
+        `dict or None`
+
+        > A dict of the values of _item_ to their counts or `None` if it is missing the tag
+        """
+        return self._indexed[item]
+
+    def counts(self, values = None):
+        """Gives the total number of times each value occurs
+
+        # Parameters
+
+        _values_ : `optional [iterable]`
+
+        > Default `None`, if given only these values are counted
+
+        # Returns
+
+        `dict[object : int]`
+
+        > The values mapped to their counts, values that do not occur are left out
+        """
+        if values is None:
+            values = self._values
+        retDict = {}
+        for entry in values:
+            if entry in self._values and entry not in retDict:
+                retDict[entry] = sum(self._values[entry].values())
+        return retDict
+
+class IDIndex(CollectionIndex):
+    """An index of items by their ids, used by [CollectionWithIDs.createIDIndex()](./classes/CollectionWithIDs.html#metaknowledge.CollectionWithIDs.createIDIndex) and the id keyed set operations, e.g. [CollectionWithIDs.unionByID()](./classes/CollectionWithIDs.html#metaknowledge.CollectionWithIDs.unionByID).
+
+    Bad items are kept in a separate set as their ids need not be unique, they are matched by their hashes like in the collection.
+
+    # \_\_Init\_\_
+
+    # Parameters
+
+    _items_ : `optional [iterable]`
+
+    > Default `()`, the items to start with
+    """
+    def add(self, item):
+        if item.bad:
+            self._bad.add(item)
+        else:
+            self._byID[item._id] = item
+
+    def discard(self, item):
+        if item.bad:
+            self._bad.discard(item)
+        else:
+            self._byID.pop(item._id, None)
+
+    def clear(self):
+        #ids to the items that are not bad
+        self._byID = {}
+        self._bad = set()
+
+    def copy(self):
+        """Creates a copy of the index that can be changed without affecting this one
+
+        # Returns
+
+        `IDIndex`
+
+        > The copy
+        """
+        return self._fromParts(self._byID.copy(), self._bad.copy())
+
+    @classmethod
+    def _fromParts(cls, byID, bad):
+        """Makes an index from the dict of ids to items and the set of bad items, they are not copied"""
+        index = cls()
+        index._byID = byID
+        index._bad = bad
+        return index
+
+    def get(self, idVal):
+        """Gives the item with the id _idVal_
+
+        # Parameters
+
+        _idVal_ : `str`
+
+        > The id
+
+        # Returns
+
+        `object`
+
+        > The item or `None` if no item that is not bad has the id
+        """
+        return self._byID.get(idVal)
+
+    def byID(self):
+        """Gives the items that are not bad by their ids
+
+        # Returns
+
+        `dict[str : object]`
+
+        > The ids mapped to the items, this must not be modified
+        """
+        return self._byID
+
+    def badItems(self):
+        """Gives the bad items
+
+        # Returns
+
+        `set`
+
+        > The bad items, this must not be modified
+        """
+        return self._bad
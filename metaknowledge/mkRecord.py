@@ -316,6 +316,15 @@ class ExtendedRecord(Record, metaclass = abc.ABCMeta):
         #Memoizing stuff
         self._computedFields = {}
 
+    #The tags of the original entry that were not loaded, records that were
+    #not projected share this one
+    _droppedTags = frozenset()
+
+    @property
+    def droppedTags(self):
+        """The `frozenset` of the tags that were in the original entry but were skipped when it was read, as they were not in the _onlyTheseTags_ given to the parser. Records with dropped tags cannot be written back to a file."""
+        return self._droppedTags
+
     def __contains__(self, item):
         """Checks if the tag _item_ is in the Record"""
         #Check all the dicts
@@ -327,10 +336,7 @@ class ExtendedRecord(Record, metaclass = abc.ABCMeta):
                 computedVal = self.specialFuncs(item)
             except KeyError:
                 return False
-            self._computedFields[item] = computedVal
-            alt = self.getAltName(item)
-            if alt is not None:
-                self._computedFields[alt] = computedVal
+            self._memoize(item, computedVal)
             return True
 
 
@@ -353,15 +359,28 @@ class ExtendedRecord(Record, metaclass = abc.ABCMeta):
                         computedVal = self.specialFuncs(key)
                     except KeyError:
                         raise KeyError("'{}' could not be found in the Record".format(key)) from BaseException
-                #Both refer to the same object, computedVal
-                self._computedFields[key] = computedVal
-                alt = self.getAltName(key)
-                if alt is not None:
-                    self._computedFields[alt] = computedVal
+                self._memoize(key, computedVal)
                 return computedVal
             else:
                 raise TypeError("Keys to Records must be strings they cannot be of the type '{}'.".format(type(key).__name__)) from BaseException
 
+    def _memoize(self, key, computedVal):
+        """Saves _computedVal_ as the processed value of _key_ and of its alternate name"""
+        #Both refer to the same object, computedVal
+        self._computedFields[key] = computedVal
+        alt = self.getAltName(key)
+        if alt is not None:
+            self._computedFields[alt] = computedVal
+
+    def _rawField(self, key):
+        """Returns a tuple of the tag in the original entry _key_ refers to and its raw value, or `None` if _key_ is not in the entry"""
+        if key in self._fieldDict:
+            return key, self._fieldDict[key]
+        alt = self.getAltName(key)
+        if alt in self._fieldDict:
+            return alt, self._fieldDict[alt]
+        return None
+
     #Extra options added to the defaults to make access to raw data easier
     def get(self, tag, default = None, raw = False):
         """Allows access to the raw values or is an Exception safe wrapper to `__getitem__`.
@@ -399,6 +418,18 @@ class ExtendedRecord(Record, metaclass = abc.ABCMeta):
             except KeyError:
                 return default
 
+    def _getUnsaved(self, tag, default = None, raw = False):
+        """Like `get()` but the values processed to give _tag_ are not saved by the `Record`, so reading all the tags of many `Records` does not keep all of their values. Values that were already saved are still used."""
+        if raw:
+            return self.get(tag, default = default, raw = True)
+        computedFields = self._computedFields
+        #New values are put in the first map, which is dropped after
+        self._computedFields = collections.ChainMap({}, computedFields)
+        try:
+            return self.get(tag, default = default)
+        finally:
+            self._computedFields = computedFields
+
     def values(self, raw = False):
         """Like `values` for dicts but with a `raw` option
 
@@ -766,6 +797,55 @@ class ExtendedRecord(Record, metaclass = abc.ABCMeta):
             s = """@{0}{{ {1},\n    {2}\n}}""".format('misc', bibID, '\n    '.join(keyEntries))
         return s
 
+def _keptTagSet(onlyTheseTags, recordClass, requiredTags):
+    """Makes the set of raw tags records of _recordClass_ keep when they are read with _onlyTheseTags_, used by the parsers. The long names in _onlyTheseTags_ are converted with the `getAltName()` of _recordClass_ and the tags in _requiredTags_, such as the tag of the id, are always kept.
+
+    # Parameters
+
+    _onlyTheseTags_ : `iterable[str] or None`
+
+    > The tags requested, either as tags or long names
+
+    _recordClass_ : `type`
+
+    > The `ExtendedRecord` subclass being read
+
+    _requiredTags_ : `iterable[str]`
+
+    > The tags the parser needs
+
+    # Returns
+
+    `frozenset[str] or None`
+
+    > The tags to keep, `None` if _onlyTheseTags_ is `None`
+    """
+    if onlyTheseTags is None:
+        return None
+    keptTags = set(requiredTags)
+    for tag in onlyTheseTags:
+        keptTags.add(tag)
+        altName = recordClass.getAltName(tag)
+        if altName is not None:
+            keptTags.add(altName)
+    return frozenset(keptTags)
+
+def _projectFieldDict(fieldDict, keptTags, droppedTags):
+    #Removes the tags not in keptTags from fieldDict, adding them to droppedTags
+    for tag in [t for t in fieldDict if t not in keptTags]:
+        del fieldDict[tag]
+        droppedTags.add(tag)
+
+#Most records of a file drop the same tags so the sets are shared
+_droppedTagSets = {}
+
+def _sharedTagSet(tags):
+    """Returns a `frozenset` of _tags_, equal sets are returned as the same object to save memory."""
+    tags = frozenset(tags)
+    if not tags:
+        return ExtendedRecord._droppedTags
+    return _droppedTagSets.setdefault(tags, tags)
+
 def _bibFormatter(s, maxLength):
     """Formats a string, list or number to make it good for a bib file by:
         * if too long splits up the string correctly
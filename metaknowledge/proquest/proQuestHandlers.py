@@ -1,4 +1,5 @@
 from ..mkExceptions import BadProQuestFile
+from ..mkRecord import _keptTagSet
 
 from .recordProQuest import ProQuestRecord
 
@@ -39,7 +40,7 @@ def isProQuestFile(infile, checkedLines = 2):
     else:
         return False
 
-def proQuestParser(proFile):
+def proQuestParser(proFile, onlyTheseTags = None):
     """Parses a ProQuest file, _proFile_, to extract the individual entries.
 
     A ProQuest file has three sections, first a list of the contained entries, second the full metadata and finally a bibtex formatted entry for the record. This parser only uses the first two as the bibtex contains no information the second section does not. Also, the first section is only used to verify the second section. The returned [ProQuestRecord](../classes/ProQuestRecord.html#metaknowledge.proquest.ProQuestRecord) contains the data from the second section, with the same key strings as ProQuest uses and the unlabeled sections are called in order, `'Name'`, `'Author'` and `'url'`.
@@ -50,6 +51,10 @@ def proQuestParser(proFile):
 
     > A path to a valid ProQuest file, use [isProQuestFile](#metaknowledge.proquest.proQuestHandlers.isProQuestFile) to verify
 
+    _onlyTheseTags_ : `optional [iterable[str]]`
+
+    > Default `None`, if given only the entries with these keys are kept, along with `'ProQuest document ID'` and `'Title'` as they are needed to check the file, the records list the rest in their `droppedTags`.
+
     # Returns
 
     `set[ProQuestRecord]`
@@ -57,6 +62,7 @@ def proQuestParser(proFile):
     > Records for each of the entries
     """
     #assumes the file is ProQuest
+    keptTags = _keptTagSet(onlyTheseTags, ProQuestRecord, ['ProQuest document ID', 'Title'])
     nameDict = {}
     recSet = set()
     error = None
@@ -84,7 +90,7 @@ def proQuestParser(proFile):
                     break
                 elif line.startswith('Document '):
                     n = int(line[9:].split(' of ')[0])
-                    R = ProQuestRecord(f, sFile = proFile, sLine = lineNum)
+                    R = ProQuestRecord(f, sFile = proFile, sLine = lineNum, keptTags = keptTags)
                     if R.get('Title') != nameDict[n]:
                         error = BadProQuestFile("The numbering of the titles at the beginning of the file does not match the records inside. Line {} has a record titled '{}' with number {}, the name should be '{}'.".format(lineNum, R.get('Title', "TITLE MISSING"), n, nameDict[n]))
                         raise StopIteration
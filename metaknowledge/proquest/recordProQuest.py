@@ -3,7 +3,7 @@ import io
 import itertools
 
 from ..mkExceptions import BadProQuestRecord, RecordsNotCompatible
-from ..mkRecord import ExtendedRecord
+from ..mkRecord import ExtendedRecord, _projectFieldDict, _sharedTagSet
 
 from .tagProcessing.specialFunctions import proQuestSpecialTagToFunc
 from .tagProcessing.tagFunctions import proQuestTagToFunc
@@ -12,26 +12,31 @@ class ProQuestRecord(ExtendedRecord):
     """Class for full ProQuest entries.
 
     This class is an [ExtendedRecord](./ExtendedRecord.html#metaknowledge.ExtendedRecord) capable of generating its own id number. You should not create them directly, but instead use [proQuestParser()](../modules/proquest.html#metaknowledge.proquest.proQuestHandlers.proQuestParser) on a ProQuest file.
+
+    If _keptTags_ is given only those entries are kept, the others are listed in `droppedTags`.
     """
-    def __init__(self, inRecord, recNum = None, sFile = "", sLine = 0):
+    def __init__(self, inRecord, recNum = None, sFile = "", sLine = 0, keptTags = None):
         bad = False
         error = None
         fieldDict = None
+        droppedTags = set()
         try:
             if isinstance(inRecord, dict) or isinstance(inRecord, collections.OrderedDict):
                 fieldDict = collections.OrderedDict(inRecord)
+                if keptTags is not None:
+                    _projectFieldDict(fieldDict, keptTags, droppedTags)
             elif isinstance(inRecord, enumerate) or isinstance(inRecord, itertools.chain):
                 #Already enumerated
                 #itertools.chain is for the parser upstream to insert stuff into the stream
-                fieldDict = proQuestRecordParser(inRecord, recNum)
+                fieldDict = proQuestRecordParser(inRecord, recNum, keptTags, droppedTags)
             elif isinstance(inRecord, io.IOBase):
-                fieldDict = proQuestRecordParser(enumerate(inRecord), recNum)
+                fieldDict = proQuestRecordParser(enumerate(inRecord), recNum, keptTags, droppedTags)
             elif isinstance(inRecord, str):
                 #Probaly a better way to do this but it isn't going to be used much, so no need to improve it
                 def addCharToEnd(lst):
                     for s in lst:
                         yield s + '\n'
-                fieldDict = proQuestRecordParser(enumerate(addCharToEnd(inRecord.split('\n')), start = 1), recNum)
+                fieldDict = proQuestRecordParser(enumerate(addCharToEnd(inRecord.split('\n')), start = 1), recNum, keptTags, droppedTags)
                 #string io
             else:
                 raise TypeError("Unsupported input type '{}', ProQuestRecords cannot be created from '{}'".format(inRecord, type(inRecord)))
@@ -46,6 +51,8 @@ class ProQuestRecord(ExtendedRecord):
             bad = True
             error = BadProQuestRecord("Missing ProQuest document ID")
         ExtendedRecord.__init__(self, fieldDict, self._proID, bad, error, sFile =sFile, sLine = sLine)
+        if droppedTags:
+            self._droppedTags = _sharedTagSet(droppedTags)
 
     def encoding(self):
         return 'utf-8'
@@ -67,7 +74,7 @@ class ProQuestRecord(ExtendedRecord):
     def writeRecord(self, infile):
         raise RecordsNotCompatible("ProQuest's data format cannot be written back to file. You can still write out a csv with writeCSV().")
 
-def proQuestRecordParser(enRecordFile, recNum):
+def proQuestRecordParser(enRecordFile, recNum, keptTags = None, droppedTags = None):
     """The parser [ProQuestRecords](../classes/ProQuestRecord.html#metaknowledge.proquest.ProQuestRecord) use. This takes an entry from [proQuestParser()](#metaknowledge.proquest.proQuestHandlers.proQuestParser) and parses it a part of the creation of a `ProQuestRecord`.
 
     # Parameters
@@ -80,6 +87,14 @@ def proQuestRecordParser(enRecordFile, recNum):
 
     > The number given to the entry in the first section of the ProQuest file
 
+    _keptTags_ : `optional [set[str]]`
+
+    > Default `None`, if given only the entries in _keptTags_ are stored, the lines of the others are skipped
+
+    _droppedTags_ : `optional [set[str]]`
+
+    > Default `None`, must be given with _keptTags_, the entries that were skipped are added to it
+
     # Returns
 
     `collections.OrderedDict`
@@ -88,6 +103,7 @@ def proQuestRecordParser(enRecordFile, recNum):
     """
     tagDict = collections.OrderedDict()
     currentEntry = 'Name'
+    skippedEntries = set()
     while True:
         lineNum, line = next(enRecordFile)
         if line == '_' * 60 + '\n':
@@ -95,14 +111,23 @@ def proQuestRecordParser(enRecordFile, recNum):
         elif line == '\n':
             pass
         elif currentEntry is 'Name' or currentEntry is 'url':
-            tagDict[currentEntry] = [line.rstrip()]
+            if keptTags is None or currentEntry in keptTags:
+                tagDict[currentEntry] = [line.rstrip()]
+            else:
+                droppedTags.add(currentEntry)
             currentEntry = None
         elif ':' in line and not line.startswith('http://'):
             splitLine = line.split(': ')
             currentEntry = splitLine[0]
-            tagDict[currentEntry] = [': '.join(splitLine[1:]).rstrip()]
+            if keptTags is None or currentEntry in keptTags:
+                tagDict[currentEntry] = [': '.join(splitLine[1:]).rstrip()]
+            else:
+                droppedTags.add(currentEntry)
+                skippedEntries.add(currentEntry)
             if currentEntry == 'Author':
                 currentEntry = 'url'
+        elif currentEntry in skippedEntries:
+            pass
         else:
             tagDict[currentEntry].append(line.rstrip())
     return tagDict
@@ -3,6 +3,9 @@ import os
 import os.path
 import csv
 import re
+import struct
+import functools
+import concurrent.futures
 try:
     import collections.abc
 except ImportError:
@@ -14,11 +17,19 @@ from .constants import __version__
 from .mkRecord import Record, _pandasPrep
 from .progressBar import _ProgressBar
 from .WOS.tagProcessing.funcDicts import tagToFullDict, fullToTagDict, normalizeToTag
-from .citation import Citation
+from .citation import Citation, classifyJournals, _shareCitation
 from .fileHandlers import recordHandlers
-from .mkExceptions import BadWOSRecord, RCTypeError, BadInputFile, BadRecord, RCValueError, RecordsNotCompatible, UnknownFile
-
-from .mkCollection import CollectionWithIDs
+from .WOS import WOSRecord
+from .mkExceptions import BadWOSRecord, RCTypeError, BadInputFile, BadRecord, RCValueError, RecordsNotCompatible, UnknownFile, cacheError
+from .mkCache import RecordDirCache
+from .mkIndex import CitationIndex
+from .mkFrozen import freezeRecords, FrozenRecordCollection
+from .sparseNetworks import incidenceMatrix, coOccurrenceMatrix, coOccurrenceGraph, rowOverlaps, normalizeOverlaps
+from .arrowExport import _importArrow, valueKind, combineKinds, arrowType, arrowValue, batched
+from .dataFrames import _importPandas, ColumnBuilder
+from .genders.nameGender import namesGenders
+
+from .mkCollection import CollectionWithIDs, reduceCounts
 
 from .scopus.scopusHandlers import scopusHeader
 
@@ -61,14 +72,26 @@ class RecordCollection(CollectionWithIDs):
 
     _cached_ : `optional [bool]`
 
-    > Default `False`, if `True` and the _inCollection_ is a directory (a string giving the path to a directory) then the initialized `RecordCollection` will be saved in the directory as a Python pickle with the suffix `'.mkDirCache'`. Then if the `RecordCollection` is initialized a second time it will be recovered from the file, which is much faster than reprising every file in the directory.
+    > Default `False`, if `True` and the _inCollection_ is a directory (a string giving the path to a directory) then the raw contents of the parsed records will be saved in the directory in a file with the suffix `'.mkRecordDirCache'`. Then if the `RecordCollection` is initialized a second time the records will be recovered from the file, which is much faster than reparsing every file in the directory.
+
+    > _metaknowledge_ saves the size, last modification time and a hash of the contents of each parsed file and checks these when recreating the `RecordCollection`, so only files that have been modified or added are reparsed and the records of deleted files are dropped. The extension given to `__init__()` is taken into account as well and each suffix is given its own cache.
+
+    > The cache is a binary file of the records' raw fields, see [mkCache](../functions_methods/index.html#module-metaknowledge.mkCache) for details, reading it does not execute any code.
+
+    _workers_ : `optional [int]`
+
+    > Default `None`, if an integer greater than 1 and _inCollection_ is a directory, the files in the directory are parsed in parallel by a pool of _workers_ processes, one file per task. The resulting `RecordCollection` is the same as the one created by reading the files one at a time, including its `errors` and `bad` attributes.
 
-    > _metaknowledge_ saves the names of the parsed files as well as their last modification times and will check these when recreating the `RecordCollection`, so modifying existing files or adding new ones will result in the entire directory being reanalyzed and a new cache file being created. The extension given to `__init__()` is taken into account as well and each suffix is given its own cache.
+    _lazy_ : `optional [bool]`
 
-    > **Note** The pickle allows for arbitrary python code execution so only use caches that you trust.
+    > Default `False`, if `True` the records of WOS files keep only their WOS number and where they are in their file, the fields are read from the file when they are first used, see [wosParser()](../modules/WOS.html#metaknowledge.WOS.wosHandlers.wosParser). This uses much less memory when only a few tags are used. The files must not be modified or deleted while the `RecordCollection` is in use. Records from other sources and those read from the cache are loaded as normal.
+
+    _onlyTheseTags_ : `optional [iterable]`
+
+    > Default `None`, if an iterable of tags (or their long names) is given only those fields are kept when the files are read, along with the ones giving the id of each record, the rest are skipped by the parsers. This greatly reduces the memory used when only a few tags are needed. The skipped tags of each record are in its `droppedTags` and such records cannot be written back to a file with [writeFile()](#metaknowledge.RecordCollection.writeFile). A cache made with one set of tags is only used with the same set.
     """
 
-    def __init__(self, inCollection = None, name = '', extension = '', cached = False, quietStart = False):
+    def __init__(self, inCollection = None, name = '', extension = '', cached = False, quietStart = False, workers = None, lazy = False, onlyTheseTags = None):
         progArgs = (0, "Starting to make a RecordCollection")
         if metaknowledge.VERBOSE_MODE and not quietStart:
             progKwargs = {'dummy' : False}
@@ -95,58 +118,54 @@ class RecordCollection(CollectionWithIDs):
                     if not name:
                         name = os.path.splitext(os.path.split(inCollection)[1])[0]
                     try:
-                        for recordType, processor, detector in recordHandlers:
-                            if detector(inCollection):
-                                recordTypes.add(recordType)
-                                recordsSet, pError = processor(inCollection)
-                                if pError is not None:
-                                    bad = True
-                                    errors[inCollection] = pError
-                                break
+                        recordType, recordsSet, pError = _readRecordFile(inCollection, lazy = lazy, onlyTheseTags = onlyTheseTags)
+                        recordTypes.add(recordType)
+                        if pError is not None:
+                            bad = True
+                            errors[inCollection] = pError
                     except UnknownFile:
                         raise BadInputFile("'{}' does not match any known file type.\nIts header might be damaged or it could have been modified by another program.".format(inCollection))
                 elif os.path.isdir(inCollection):
-                    count = 0
                     PBar.updateVal(0, "RecordCollection from files in {}".format(inCollection))
                     if extension and not name:
                         name = "{}-files-from-{}".format(extension, inCollection)
                     elif not name:
                         name = "files-from-{}".format(inCollection)
                     recordsSet = set()
-                    flist = []
-                    for f in os.listdir(inCollection):
-                        fullF = os.path.join(os.path.abspath(inCollection), f)
-                        if fullF.endswith(extension) and not fullF.endswith('mkRecordDirCache') and os.path.isfile(fullF):
-                            flist.append(fullF)
+                    flist = _getRecordFileList(inCollection, extension)
+                    toParse = flist
                     if cached:
-                        PBar.updateVal(0, "Trying to load from cache")
+                        PBar.updateVal(0, "Checking the cache for changed files")
                         cacheName = os.path.join(inCollection, '{}.[{}].mkRecordDirCache'.format(os.path.basename(os.path.abspath(inCollection)), extension))
-                        if self._loadFromCache(cacheName, flist, name, extension):
-                            try:
-                                PBar.finish("Done reloading {} Records from cache".format(len(self)))
-                            except AttributeError:
-                                PBar.finish("Done reloading from the cache {}. Warning an error occured.".format(cacheName))
-                            return
-                        else:
-                            PBar.updateVal(0, 'Cache error, rereading files')
+                        dirCache = RecordDirCache(cacheName, extension, onlyTheseTags = onlyTheseTags)
+                        toParse = dirCache.staleFiles(flist)
+                    if workers is not None and workers > 1 and len(toParse) > 1:
+                        parsedResults = dict(zip(toParse, _readRecordFilesParallel(toParse, workers, PBar, lazy = lazy, onlyTheseTags = onlyTheseTags)))
+                    else:
+                        parsedResults = dict(zip(toParse, _readRecordFilesSerial(toParse, PBar, lazy = lazy, onlyTheseTags = onlyTheseTags)))
+                    fileResults = []
                     for fileName in flist:
-                        count += 1
-                        PBar.updateVal(count / len(flist), "Reading records from: {}".format(fileName))
-                        try:
-                            for recordType, processor, detector in recordHandlers:
-                                if detector(fileName):
-                                    recordTypes.add(recordType)
-                                    recs, pError = processor(fileName)
-                                    if pError is not None:
-                                        bad = True
-                                        errors[fileName] = pError
-                                    recordsSet |= recs
-                                    break
-                        except UnknownFile:
+                        if fileName in parsedResults:
+                            fileResults.append(parsedResults[fileName])
+                        else:
+                            PBar.updateVal(len(fileResults) / len(flist), "Reading records from cache: {}".format(fileName))
+                            try:
+                                fileResults.append(dirCache.readFile(fileName))
+                            except (cacheError, ValueError, KeyError, IndexError, struct.error):
+                                parsedResults[fileName] = _readRecordFileOrNone(fileName, lazy = lazy, onlyTheseTags = onlyTheseTags)
+                                fileResults.append(parsedResults[fileName])
+                    for fileName, result in zip(flist, fileResults):
+                        if result is None:
                             if extension != '':
                                 raise BadInputFile("'{}' does not match any known file type, but has the requested extension '{}'. Its header might be damaged or it could have been modified by another program.".format(fileName, extension))
                             else:
-                                pass
+                                continue
+                        recordType, recs, pError = result
+                        recordTypes.add(recordType)
+                        if pError is not None:
+                            bad = True
+                            errors[fileName] = pError
+                        recordsSet |= recs
                 else:
                     raise RCTypeError("'{}' is not a path to a directory or file. Strings cannot be used to initialize RecordCollections".format(inCollection))
             elif isinstance(inCollection, collections.abc.Iterable):
@@ -163,7 +182,7 @@ class RecordCollection(CollectionWithIDs):
                     pass
                 else:
                     PBar.updateVal(1, "Writing RecordCollection cache to {}".format(cacheName))
-                    self._createCache(cacheName, flist, name, extension)
+                    dirCache.write(flist, parsedResults)
             try:
                 PBar.finish("Done making a RecordCollection of {} Records".format(len(self)))
             except AttributeError:
@@ -208,10 +227,20 @@ class RecordCollection(CollectionWithIDs):
         """
         if dropBad:
             self.dropBadEntries()
-        if invert:
-            self._collection = {r for r in self._collection if r['pubType'] != ptVal.upper()}
+        ptIndex = self._tagIndex('pubType')
+        if ptIndex is not None:
+            if invert:
+                kept = self._collection - ptIndex.lookup(ptVal.upper())
+            else:
+                kept = ptIndex.lookup(ptVal.upper())
+        elif invert:
+            kept = {r for r in self._collection if r['pubType'] != ptVal.upper()}
         else:
-            self._collection = {r for r in self._collection if r['pubType'] == ptVal.upper()}
+            kept = {r for r in self._collection if r['pubType'] == ptVal.upper()}
+        if self._indexes:
+            for r in self._collection - kept:
+                self._indexDiscard(r)
+        self._collection = kept
 
     def writeFile(self, fname = None):
         """Writes the `RecordCollection` to a file, the written file's format is identical to those download from WOS. The order of `Records` written is random.
@@ -222,6 +251,9 @@ class RecordCollection(CollectionWithIDs):
 
         > Default `None`, if given the output file will written to _fanme_, if `None` the `RecordCollection`'s name's first 200 characters are used with the suffix .isi
         """
+        for R in self._collection:
+            if R.droppedTags:
+                raise RecordsNotCompatible("The RecordCollection cannot be written to a file as its Records were read with onlyTheseTags, the tags {} were dropped from {}.".format(', '.join(sorted(R.droppedTags)), R))
         if len(self._collectedTypes) < 2:
             recEncoding = self.peek().encoding()
         else:
@@ -321,6 +353,7 @@ class RecordCollection(CollectionWithIDs):
             csvWriterFields = retrievedFields
         if genderCounts:
             csvWriterFields += ['num-Male', 'num-Female', 'num-Unknown']
+            genders = self.genderCounts()
         if splitByTag is None:
             f = open(baseFileName, mode = 'w', encoding = 'utf-8', newline = '')
             csvWriter = csv.DictWriter(f, csvWriterFields, delimiter = csvDelimiter, quotechar = csvQuote, quoting=csv.QUOTE_ALL)
@@ -350,7 +383,7 @@ class RecordCollection(CollectionWithIDs):
             if numAuthors:
                 recDict["num-Authors"] = len(R.get('authorsShort', []))
             if genderCounts:
-                recDict['num-Male'], recDict['num-Female'], recDict['num-Unknown'] = R.authGenders(_countsTuple = True)
+                recDict['num-Male'], recDict['num-Female'], recDict['num-Unknown'] = genders[R]
             if splitByTag:
                 for sTag in splitVal:
                     if sTag in filesDict:
@@ -740,11 +773,12 @@ class RecordCollection(CollectionWithIDs):
             retDict["num-Authors"] = []
         if genderCounts:
             retDict.update({'num-Male' : [], 'num-Female' : [], 'num-Unknown' : []})
+            genders = self.genderCounts()
         for R in self:
             if numAuthors:
                 retDict["num-Authors"].append(len(R.get('authorsShort', [])))
             if genderCounts:
-                m, f, u = R.authGenders(_countsTuple = True)
+                m, f, u = genders[R]
                 retDict['num-Male'].append(m)
                 retDict['num-Female'].append(f)
                 retDict['num-Unknown'].append(u)
@@ -752,6 +786,327 @@ class RecordCollection(CollectionWithIDs):
                 retDict[k].append(v)
         return retDict
 
+    def freeze(self, fileName = None):
+        """Writes the raw fields of the `Records` to a memory mapped file and returns a read only [FrozenRecordCollection](../functions_methods/index.html#metaknowledge.mkFrozen.FrozenRecordCollection) of them. Worker processes given the `FrozenRecordCollection`, or chunks of it, map the same file instead of receiving copies of the `Records`, see [mkFrozen](../functions_methods/index.html#module-metaknowledge.mkFrozen).
+
+        The processed values of the `Records` are not stored, each process computes the ones it uses. The file is not deleted automatically, call `remove()` on the `FrozenRecordCollection` when it is no longer needed.
+
+        # Parameters
+
+        _fileName_ : `optional [str]`
+
+        > Default `None`, the path of the file, if `None` a new file is made in `/dev/shm`, so it is kept in memory, or if that is not available the temporary directory
+
+        # Returns
+
+        `FrozenRecordCollection`
+
+        > The `Records` in the file
+        """
+        return FrozenRecordCollection(freezeRecords(self, fileName = fileName, name = self.name))
+
+    def precompute(self, tags, workers = None, chunkSize = 1000):
+        """Processes the values of _tags_ for all the `Records`, so later uses of them, e.g. by the network or stats methods, only need to look them up. The first time a processed tag, like `'citations'` or `'authorsFull'`, is read from a `Record` its raw value is parsed and the result saved by the `Record`, this does that for all of them at once and can spread the parsing across processes.
+
+        The values are the same as those made when the tags are read one `Record` at a time. `Records` that have already processed a tag are skipped and tags that are computed from the whole `Record`, like `'selfCitation'`, are always made in this process.
+
+        # Parameters
+
+        _tags_ : `str or iterable[str]`
+
+        > The tag or tags to process, long or short names can be used
+
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the raw values are sent to a pool of _workers_ processes to be parsed, otherwise they are parsed in this process
+
+        _chunkSize_ : `optional [int]`
+
+        > Default `1000`, the number of values sent to a worker process at once
+        """
+        if isinstance(tags, str):
+            tags = [tags]
+        if not isinstance(chunkSize, int) or chunkSize < 1:
+            raise RCValueError("chunkSize must be a positive integer, not {}.".format(chunkSize))
+        #Raw values are grouped by their Record type and tag, as those give the function that parses them
+        toProcess = {}
+        progArgs = (0, "Finding the values of '{}' to process".format("', '".join(tags)))
+        if metaknowledge.VERBOSE_MODE:
+            progKwargs = {'dummy' : False}
+        else:
+            progKwargs = {'dummy' : True}
+        with _ProgressBar(*progArgs, **progKwargs) as PBar:
+            for tag in tags:
+                for R in self:
+                    if tag in R._computedFields:
+                        continue
+                    field = R._rawField(tag)
+                    if field is None:
+                        #Not in the entry, so it is made by the Record if it can be
+                        R.get(tag)
+                    elif field[0] not in R._computedFields:
+                        rawTag, rawValue = field
+                        toProcess.setdefault((type(R), rawTag), ([], []))
+                        toProcess[(type(R), rawTag)][0].append(R)
+                        toProcess[(type(R), rawTag)][1].append(rawValue)
+            chunks = []
+            for (recType, rawTag), (recs, rawValues) in toProcess.items():
+                for start in range(0, len(recs), chunkSize):
+                    chunks.append((recType, rawTag, recs[start:start + chunkSize], rawValues[start:start + chunkSize]))
+            if workers is not None and workers > 1 and len(chunks) > 1:
+                with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+                    futures = {executor.submit(_processTagValues, recType, rawTag, rawValues) : i for i, (recType, rawTag, recs, rawValues) in enumerate(chunks)}
+                    for count, future in enumerate(concurrent.futures.as_completed(futures), start = 1):
+                        recType, rawTag, recs, rawValues = chunks[futures[future]]
+                        #WOS citations parsed by the workers are shared through the same cache as those parsed here, keyed by their strings
+                        shareCites = issubclass(recType, WOSRecord) and rawTag == 'CR' and not metaknowledge.FAST_CITES
+                        for R, rawValue, computedVal in zip(recs, rawValues, future.result()):
+                            if shareCites:
+                                computedVal = [_shareCitation(c, cite) for c, cite in zip(computedVal, rawValue)]
+                            R._memoize(rawTag, computedVal)
+                        PBar.updateVal(count / len(chunks), "Processed {} of {} chunks of values".format(count, len(chunks)))
+            else:
+                for count, (recType, rawTag, recs, rawValues) in enumerate(chunks, start = 1):
+                    for R, computedVal in zip(recs, _processTagValues(recType, rawTag, rawValues)):
+                        R._memoize(rawTag, computedVal)
+                    PBar.updateVal(count / len(chunks), "Processed {} of {} chunks of values".format(count, len(chunks)))
+            PBar.finish("Done processing the values of '{}' for {} Records".format("', '".join(tags), len(self)))
+
+    def toArrow(self, onlyTheseTags = None, longNames = False, raw = False, numAuthors = True, genderCounts = False, batchSize = 10000):
+        """Creates a [pyarrow](https://arrow.apache.org/docs/python/) `Table` with each column a tag and each row a `Record`. Tags with many values, like the authors or citations, are list columns and numbers are stored as numbers, so the table can be used by pandas (`RC.toArrow().to_pandas()`) or DuckDB without reparsing strings.
+
+        The type of each column is found by reading all the values of its tag, tags whose values are of different types are stored as strings, or lists if any of the values are lists. The `Records` are then converted _batchSize_ at a time, the values processed for this are not kept by the `Records` so only the table itself holds all of them. To write the table to a file without holding it use [writeParquet()](#metaknowledge.RecordCollection.writeParquet).
+
+        Requires pyarrow, which can be installed with `pip install metaknowledge[arrow]`.
+
+        # Parameters
+
+        _onlyTheseTags_ : `optional [iterable]`
+
+        > Default `None`, if an iterable (list, tuple, etc) only the tags in _onlyTheseTags_ will be used, if not given then all tags in the records are given.
+
+        _longNames_ : `optional [bool]`
+
+        > Default `False`, if `True` the columns will be named with the tags' longer names, otherwise the short 2 character ones will be used.
+
+        _raw_ : `optional [bool]`
+
+        > Default `False`, if `True` the raw values for each `Record`'s field will be provided, otherwise the processed values are given.
+
+        _numAuthors_ : `optional [bool]`
+
+        > Default `True`, if `True` adds the number of authors as the column `'num-Authors'`.
+
+        _genderCounts_ : `optional [bool]`
+
+        > Default `False`, if `True` adds the number of male, female and unknown authors as the columns `'num-Male'`, `'num-Female'` and `'num-Unknown'`, this needs the gender data.
+
+        _batchSize_ : `optional [int]`
+
+        > Default `10000`, the number of `Records` converted at once
+
+        # Returns
+
+        `pyarrow.Table`
+
+        > The table of the `Records`
+        """
+        pyarrow, parquet = _importArrow()
+        schema, batches = self._arrowBatches(onlyTheseTags, longNames, raw, numAuthors, genderCounts, batchSize)
+        return pyarrow.Table.from_batches(list(batches), schema = schema)
+
+    def writeParquet(self, fname = None, onlyTheseTags = None, longNames = False, raw = False, numAuthors = True, genderCounts = False, batchSize = 10000, compression = 'snappy'):
+        """Writes the `Records` to a [Parquet](https://parquet.apache.org/) file with the same columns as [toArrow()](#metaknowledge.RecordCollection.toArrow). Each batch of _batchSize_ `Records` is written as it is converted, so the memory used does not grow with the size of the collection.
+
+        Requires pyarrow, which can be installed with `pip install metaknowledge[arrow]`.
+
+        # Parameters
+
+        _fname_ : `optional [str]`
+
+        > Default `None`, the name of the file to write to, if `None` it uses the collections name suffixed by .parquet.
+
+        _onlyTheseTags_ : `optional [iterable]`
+
+        > Default `None`, if an iterable (list, tuple, etc) only the tags in _onlyTheseTags_ will be used, if not given then all tags in the records are given.
+
+        _longNames_ : `optional [bool]`
+
+        > Default `False`, if `True` the columns will be named with the tags' longer names, otherwise the short 2 character ones will be used.
+
+        _raw_ : `optional [bool]`
+
+        > Default `False`, if `True` the raw values for each `Record`'s field will be provided, otherwise the processed values are given.
+
+        _numAuthors_ : `optional [bool]`
+
+        > Default `True`, if `True` adds the number of authors as the column `'num-Authors'`.
+
+        _genderCounts_ : `optional [bool]`
+
+        > Default `False`, if `True` adds the number of male, female and unknown authors as the columns `'num-Male'`, `'num-Female'` and `'num-Unknown'`, this needs the gender data.
+
+        _batchSize_ : `optional [int]`
+
+        > Default `10000`, the number of `Records` converted and written at once, each batch is a row group of the file
+
+        _compression_ : `optional [str]`
+
+        > Default `'snappy'`, the compression used by the file, any that pyarrow supports
+        """
+        pyarrow, parquet = _importArrow()
+        if fname is None:
+            fname = "{}.parquet".format(self.name[:200])
+        schema, batches = self._arrowBatches(onlyTheseTags, longNames, raw, numAuthors, genderCounts, batchSize)
+        with parquet.ParquetWriter(fname, schema, compression = compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+    def _arrowBatches(self, onlyTheseTags, longNames, raw, numAuthors, genderCounts, batchSize):
+        """Gives the schema of the columns of toArrow() and a generator of the record batches"""
+        pyarrow, parquet = _importArrow()
+        if not isinstance(batchSize, int) or batchSize < 1:
+            raise RCValueError("batchSize must be a positive integer, not {}.".format(batchSize))
+        #The values are all read first to find the types of the columns, then again for each batch, the Records do not keep them so the memory used stays bounded
+        kinds = {}
+        if onlyTheseTags:
+            tags = []
+            for t in onlyTheseTags:
+                t = fullToTagDict.get(t, t)
+                if t not in kinds:
+                    kinds[t] = None
+                    tags.append(t)
+            for R in self:
+                for t in tags:
+                    val = R._getUnsaved(t, raw = raw)
+                    if val is not None:
+                        kinds[t] = combineKinds(kinds[t], valueKind(val))
+        else:
+            tags = []
+            for R in self:
+                for t in R.keys():
+                    if t not in kinds:
+                        kinds[t] = None
+                        tags.append(t)
+                    val = R._getUnsaved(t, raw = raw)
+                    if val is not None:
+                        kinds[t] = combineKinds(kinds[t], valueKind(val))
+        #Tags with no values are strings
+        kinds = [kinds[t] or 'string' for t in tags]
+        if longNames:
+            try:
+                names = [tagToFullDict[t] for t in tags]
+            except KeyError:
+                raise KeyError("One of the tags could not be converted to a long name.")
+        else:
+            names = list(tags)
+        fields = [pyarrow.field(n, arrowType(k)) for n, k in zip(names, kinds)]
+        if numAuthors:
+            fields.append(pyarrow.field('num-Authors', pyarrow.int64()))
+        if genderCounts:
+            fields += [pyarrow.field(n, pyarrow.int64()) for n in ('num-Male', 'num-Female', 'num-Unknown')]
+        schema = pyarrow.schema(fields)
+        def batchGen():
+            tagColumns = {t : i for i, t in enumerate(tags)}
+            for recs in batched(self, batchSize):
+                values = [[None] * len(recs) for t in tags]
+                for j, R in enumerate(recs):
+                    #Without onlyTheseTags each Record only needs its own tags to be read
+                    for t in (tags if onlyTheseTags else R.keys()):
+                        i = tagColumns[t]
+                        values[i][j] = arrowValue(R._getUnsaved(t, raw = raw), kinds[i])
+                columns = [pyarrow.array(vals, type = field.type) for vals, field in zip(values, fields)]
+                if numAuthors:
+                    columns.append(pyarrow.array([len(R._getUnsaved('authorsShort', [])) for R in recs], type = pyarrow.int64()))
+                if genderCounts:
+                    counts = _authorGenderCounts([set(R._getUnsaved('authorsFull', [])) for R in recs])
+                    for i in range(3):
+                        columns.append(pyarrow.array([c[i] for c in counts], type = pyarrow.int64()))
+                yield pyarrow.RecordBatch.from_arrays(columns, schema = schema)
+        return schema, batchGen()
+
+    def toDataFrame(self, columns = None, categorical = None, longNames = False, raw = False, numAuthors = True, genderCounts = False):
+        """Creates a pandas `DataFrame` with each column a tag and each row a `Record`, like `pandas.DataFrame(RC.makeDict())` but made in one pass over the `Records` without making a list for each column. If _columns_ is not given each `Record` is only asked for its own tags, so when there are different kinds of `Records` the tags of one kind are not read as long names from the others.
+
+        The columns are typed by their values: integers, floats and booleans are numpy arrays, using the pandas nullable types if there are missing values, strings can be `Categoricals` and other values, like lists, or columns of mixed types are objects. Repeated strings are only stored once, so journal names or document types take much less memory as categories.
+
+        # Parameters
+
+        _columns_ : `optional [iterable]`
+
+        > Default `None`, if an iterable (list, tuple, etc) only the tags in _columns_ will be used, in the order given, if not given then all tags in the records are given.
+
+        _categorical_ : `optional [bool or iterable]`
+
+        > Default `None`, if an iterable only the string columns of the tags in it are `Categoricals`, if `True` all the string columns are, if `False` none are and if `None` the string columns with at most half as many distinct values as `Records` with the tag are.
+
+        _longNames_ : `optional [bool]`
+
+        > Default `False`, if `True` the columns will be named with the tags' longer names, otherwise the short 2 character ones will be used.
+
+        _raw_ : `optional [bool]`
+
+        > Default `False`, if `True` the raw values for each `Record`'s field will be provided, otherwise the processed values are given.
+
+        _numAuthors_ : `optional [bool]`
+
+        > Default `True`, if `True` adds the number of authors as the column `'num-Authors'`.
+
+        _genderCounts_ : `optional [bool]`
+
+        > Default `False`, if `True` adds the number of male, female and unknown authors as the columns `'num-Male'`, `'num-Female'` and `'num-Unknown'`, this needs the gender data.
+
+        # Returns
+
+        `pandas.DataFrame`
+
+        > The `DataFrame` of the `Records`
+        """
+        numpy, pandas = _importPandas()
+        numRecs = len(self)
+        #The columns are in the order their tags are found
+        builders = {}
+        if columns:
+            for t in columns:
+                builders.setdefault(fullToTagDict.get(t, t), ColumnBuilder(numRecs))
+        if numAuthors:
+            authorCounts = numpy.zeros(numRecs, dtype = numpy.int64)
+        if genderCounts:
+            genders = numpy.zeros((3, numRecs), dtype = numpy.int64)
+            recordGenders = self.genderCounts()
+        for i, R in enumerate(self):
+            for t in (list(builders) if columns else R.keys()):
+                try:
+                    builder = builders[t]
+                except KeyError:
+                    builder = builders[t] = ColumnBuilder(numRecs)
+                val = R.get(t, raw = raw)
+                if val is not None:
+                    builder.set(i, val)
+            if numAuthors:
+                authorCounts[i] = len(R.get('authorsShort', []))
+            if genderCounts:
+                genders[:, i] = recordGenders[R]
+        if categorical is None or isinstance(categorical, bool):
+            categoricalTags = None
+        else:
+            categoricalTags = {fullToTagDict.get(t, t) for t in categorical}
+        frameDict = {}
+        for t, builder in builders.items():
+            if longNames:
+                try:
+                    name = tagToFullDict[t]
+                except KeyError:
+                    raise KeyError("One of the tags could not be converted to a long name.")
+            else:
+                name = t
+            frameDict[name] = builder.finish(categorical = categorical if categoricalTags is None else t in categoricalTags)
+        if numAuthors:
+            frameDict['num-Authors'] = authorCounts
+        if genderCounts:
+            frameDict.update({'num-Male' : genders[0], 'num-Female' : genders[1], 'num-Unknown' : genders[2]})
+        return pandas.DataFrame(frameDict, copy = False)
+
     def rpys(self, minYear = None, maxYear = None, dropYears = None, rankEmptyYears = False):
         """This implements _Referenced Publication Years Spectroscopy_ a techinique for finding import years in citation data. The authors of the original papers have a website with more information, found [here](http://www.leydesdorff.net/software/rpys/).
 
@@ -764,6 +1119,8 @@ class RecordCollection(CollectionWithIDs):
         3. `'abs-deviation'`, deviation from the 5-year median. Calculated by taking the absolute deviation of the count from the median of it and the next 2 years and the preceding 2 years
         4. `'rank'`, the rank of the year, the highest ranked year being the one with the highest deviation, the second highest being the second highest deviation and so on. All years with 0 count are given the rank 0 by default
 
+        For collections too large to be loaded, or to get the spectra of each citing year, use [streamRPYS()](../modules/recordStreaming.html#metaknowledge.recordStreaming.streamRPYS).
+
         # Parameters
 
         _minYear_ : `optional int`
@@ -802,41 +1159,31 @@ class RecordCollection(CollectionWithIDs):
 
         if dropYears is None:
             dropYears = set()
+        elif isinstance(dropYears, int):
+            dropYears = {dropYears}
         yearCounts = {}
         retDict = {'year' : [], 'count' : [], 'abs-deviation' : [], 'rank' : []}
 
         for R in self:
-            try:
-                cites = R['citations']
-            except KeyError:
-                continue
-            recYear = R.get('year', float('inf'))
-            for cite in cites:
-                try:
-                    #year can be None
-                    cYear = int(cite.year)
-                except (AttributeError, TypeError):
+            recYear = R.get('year')
+            if recYear is None:
+                recYear = float('inf')
+            for cYear in _citedYears(R):
+                #need the extra years for the normlization
+                if (maxYear is not None and cYear > (maxYear + 2)) or (minYear is not None and cYear < (minYear - 2)):
+                    continue
+                #years from before the paper are an error
+                elif recYear < (cYear + 2):
                     continue
-                else:
-                    #need the extra years for the normlization
-                    if (maxYear is not None and cYear > (maxYear + 2)) or (minYear is not None and cYear < (minYear - 2)):
-                        continue
-                    #years from before the paper are an error
-                    elif recYear < (cYear + 2):
-                        continue
                 if cYear in yearCounts:
                     yearCounts[cYear] += 1
                 else:
                     yearCounts[cYear] = 1
 
         if minYear is None:
-            smallest = min(yearCounts.keys())
-            if smallest > 1000:
-                minYear = smallest
+            minYear = max(min(yearCounts.keys(), default = 1000), 1000)
         if maxYear is None:
-            biggest = max(yearCounts.keys())
-            if biggest < 2100:
-                maxYear = biggest
+            maxYear = min(max(yearCounts.keys(), default = 2100), 2100)
 
         targetYears = set(( i for i in range(minYear, maxYear + 1) if i not in dropYears))
 
@@ -887,8 +1234,7 @@ class RecordCollection(CollectionWithIDs):
         maleCount = 0
         femaleCount = 0
         unknownCount = 0
-        for R in self:
-            m, f, u = R.authGenders(_countsTuple = True)
+        for m, f, u in self.genderCounts().values():
             maleCount += m
             femaleCount += f
             unknownCount += u
@@ -897,6 +1243,18 @@ class RecordCollection(CollectionWithIDs):
             return {'Male' : maleCount / tot, 'Female' : femaleCount / tot, 'Unknown' : unknownCount / tot}
         return {'Male' : maleCount, 'Female' : femaleCount, 'Unknown' : unknownCount}
 
+    def genderCounts(self):
+        """Gives the number of male, female and unknown authors of each Record, the same counts as [Record.authGenders()](./Record.html#metaknowledge.Record.authGenders) with _countsOnly_ `True`. The names of all the authors in the collection are classified together so each distinct name is only looked up once, this is what [makeDict()](#metaknowledge.RecordCollection.makeDict), [writeCSV()](#metaknowledge.RecordCollection.writeCSV) and the other exports use for their gender counts.
+
+        # Returns
+
+        `dict[Record : tuple[int, int, int]]`
+
+        > Each Record mapped to its numbers of male, female and unknown authors
+        """
+        recs = list(self)
+        return dict(zip(recs, _authorGenderCounts([set(R.get('authorsFull', [])) for R in recs])))
+
     def getCitations(self, field = None, values = None, pandasFriendly = True, counts = True):
         """Creates a pandas ready dict with each row a different citation the contained Records and columns containing the original string, year, journal, author's name and the number of times it occured.
 
@@ -939,7 +1297,7 @@ class RecordCollection(CollectionWithIDs):
         else:
             return list(set(retCites))
 
-    def networkCoAuthor(self, detailedInfo = False, weighted = True, dropNonJournals = False, count = True, useShortNames = False, citeProfile = False):
+    def networkCoAuthor(self, detailedInfo = False, weighted = True, dropNonJournals = False, count = True, useShortNames = False, citeProfile = False, engine = "networkx", maxAuthors = None, maxAuthorsMode = "drop"):
         """Creates a coauthorship network for the RecordCollection.
 
         # Parameters
@@ -966,12 +1324,28 @@ class RecordCollection(CollectionWithIDs):
 
         > Default `True`, causes the number of occurrences of a node to be counted
 
+        _engine_ : `optional [str]`
+
+        > Default `"networkx"`, how the edges are made. `"networkx"` adds each pair of authors to the graph one at a time, while `"matrix"` counts all the pairs with a sparse matrix product and adds the edges at the end. Both give the same network but `"matrix"` is much faster when there are papers with many authors, it requires [scipy](https://www.scipy.org/).
+
+        _maxAuthors_ : `optional [int]`
+
+        > Default `None`, if given papers with more than _maxAuthors_ authors are handled according to _maxAuthorsMode_
+
+        _maxAuthorsMode_ : `optional [str]`
+
+        > Default `"drop"`, what to do with the papers with more than _maxAuthors_ authors. `"drop"` leaves them out, `"truncate"` only uses their first _maxAuthors_ authors and `"fractional"` uses fractional counting, each pair of authors adds `1 / (number of authors - 1)` to their edge's weight instead of 1. To use fractional counting for all papers set _maxAuthors_ to `1`
+
         # Returns
 
         `Networkx Graph`
 
         > A networkx graph with author names as nodes and collaborations as edges.
         """
+        if engine not in ["networkx", "matrix"]:
+            raise RCValueError("{} is not an allowed engine, it must be 'networkx' or 'matrix'.".format(engine))
+        if maxAuthorsMode not in ["drop", "truncate", "fractional"]:
+            raise RCValueError("{} is not an allowed maxAuthorsMode, it must be 'drop', 'truncate' or 'fractional'.".format(maxAuthorsMode))
         grph = nx.Graph()
         pcount = 0
         progArgs = (0, "Starting to make a co-authorship network")
@@ -1010,25 +1384,65 @@ class RecordCollection(CollectionWithIDs):
                     attributeMaker = lambda x: {'citeProfile' : {}}
                 else:
                     attributeMaker = lambda x: {}
+        def nodeAttributes(recordInfo):
+            nodeDat = recordInfo.copy()
+            if citeProfile:
+                #Each author needs their own profile
+                nodeDat['citeProfile'] = {}
+            return nodeDat
         with _ProgressBar(*progArgs, **progKwargs) as PBar:
+            if engine == "matrix":
+                nodeDats = collections.OrderedDict()
+                rows = []
+                rowWeights = []
+            knownJournals = {}
             for R in self:
                 if PBar:
                     pcount += 1
                     PBar.updateVal(pcount/ len(self), "Analyzing: " + str(R))
-                if dropNonJournals and not R.createCitation().isJournal():
+                if dropNonJournals and not classifyJournals([R.createCitation()], known = knownJournals)[0]:
                     continue
                 if useShortNames:
                     authsList = R.get('authorsShort', [])
                 else:
                     authsList = R.get('authorsFull', [])
-                if authsList:
+                pairWeight = 1
+                if maxAuthors is not None and len(authsList) > maxAuthors:
+                    if maxAuthorsMode == "drop":
+                        continue
+                    elif maxAuthorsMode == "truncate":
+                        authsList = authsList[:maxAuthors]
+                    else:
+                        pairWeight = 1 / (len(authsList) - 1)
+                if authsList and engine == "matrix":
+                    authsList = list(authsList)
+                    detailedInfo = attributeMaker(R)
+                    if citeProfile:
+                        citesLst = R.get('citations', [])
+                    #The pairs are counted by the matrix, the author at position i is reached i + 1 times by the pairwise loop
+                    for i, auth in enumerate(authsList):
+                        try:
+                            nodeDat = nodeDats[auth]
+                        except KeyError:
+                            nodeDat = nodeDats[auth] = nodeAttributes(detailedInfo)
+                            if count:
+                                nodeDat['count'] = 0
+                        if count:
+                            nodeDat['count'] += i + 1
+                        if citeProfile:
+                            profile = nodeDat['citeProfile']
+                            for c in citesLst:
+                                profile[c] = profile.get(c, 0) + i + 1
+                    rows.append(authsList)
+                    rowWeights.append(pairWeight)
+                elif authsList:
                     authsList = list(authsList)
                     detailedInfo = attributeMaker(R)
                     if citeProfile:
                         citesLst = R.get('citations', [])
                     for i, auth1 in enumerate(authsList):
                         if auth1 not in grph:
-                            grph.add_node(auth1, **detailedInfo.copy())
+                            grph.add_node(auth1, **nodeAttributes(detailedInfo))
                         elif count:
                             grph.nodes[auth1]['count'] += 1
                         if citeProfile:
@@ -1039,7 +1453,7 @@ class RecordCollection(CollectionWithIDs):
                                     grph.nodes[auth1]['citeProfile'][c] = 1
                         for auth2 in authsList[i + 1:]:
                             if auth2 not in grph:
-                                grph.add_node(auth2, **detailedInfo.copy())
+                                grph.add_node(auth2, **nodeAttributes(detailedInfo))
                             elif count:
                                 grph.nodes[auth2]['count'] += 1
                             if citeProfile:
@@ -1049,11 +1463,18 @@ class RecordCollection(CollectionWithIDs):
                                     except KeyError:
                                         grph.nodes[auth2]['citeProfile'][c] = 1
                             if grph.has_edge(auth1, auth2) and weighted:
-                                grph.edges[auth1, auth2]['weight'] += 1
+                                grph.edges[auth1, auth2]['weight'] += pairWeight
                             elif weighted:
-                                grph.add_edge(auth1, auth2, weight = 1)
+                                grph.add_edge(auth1, auth2, weight = pairWeight)
                             else:
                                 grph.add_edge(auth1, auth2)
+            if engine == "matrix":
+                if PBar:
+                    PBar.updateVal(.95, "Counting co-authorships")
+                A, nodeIndices = incidenceMatrix(rows)
+                if maxAuthorsMode != "fractional" or maxAuthors is None:
+                    rowWeights = None
+                grph = coOccurrenceGraph(A, list(nodeDats.items()), weighted, rowWeights = rowWeights)
             if citeProfile:
                 if PBar:
                     PBar.updateVal(.99, "Extracting citation profiles")
@@ -1072,7 +1493,7 @@ class RecordCollection(CollectionWithIDs):
                 PBar.finish("Done making a co-authorship network from {}".format(self))
         return grph
 
-    def networkCoCitation(self, dropAnon = True, nodeType = "full", nodeInfo = True, fullInfo = False, weighted = True, dropNonJournals = False, count = True, keyWords = None, detailedCore = True, detailedCoreAttributes = False, coreOnly = False, expandedCore = False, addCR = False):
+    def networkCoCitation(self, dropAnon = True, nodeType = "full", nodeInfo = True, fullInfo = False, weighted = True, dropNonJournals = False, count = True, keyWords = None, detailedCore = True, detailedCoreAttributes = False, coreOnly = False, expandedCore = False, addCR = False, engine = "networkx"):
         """Creates a co-citation network for the RecordCollection.
 
         # Parameters
@@ -1127,6 +1548,10 @@ class RecordCollection(CollectionWithIDs):
 
         > default `False`, if `True` all citations in the ouput graph that are records in the collection will be duplicated for each author. If the nodes are `"full"`, `"original"` or `"author"` this will result in new noded being created for the other options the results are **not** defined or tested. Edges will be created between each of the nodes for each record expanded, attributes will be copied from exiting nodes.
 
+        _engine_ : `optional [str]`
+
+        > default `"networkx"`, how the edges are made. `"networkx"` adds the citations of each Record to the graph one pair at a time, while `"matrix"` counts the co-citations with a sparse matrix product, see [coCitationMatrix()](#metaknowledge.RecordCollection.coCitationMatrix), and adds all the edges at the end. Both give the same network but `"matrix"` is much faster on large collections, it requires [scipy](https://www.scipy.org/).
+
         # Returns
 
         `Networkx Graph`
@@ -1136,6 +1561,8 @@ class RecordCollection(CollectionWithIDs):
         allowedTypes = ["full", "original", "author", "journal", "year"]
         if nodeType not in allowedTypes:
             raise RCValueError("{} is not an allowed nodeType.".format(nodeType))
+        if engine not in ["networkx", "matrix"]:
+            raise RCValueError("{} is not an allowed engine, it must be 'networkx' or 'matrix'.".format(engine))
         coreValues = []
         if bool(detailedCore):
             try:
@@ -1160,14 +1587,27 @@ class RecordCollection(CollectionWithIDs):
             else:
                 coreCitesDict = None
                 coreCites = None
-            for R in self:
+            if engine == "matrix":
+                A, firstCites = self._citationIncidence(nodeType, dropAnon, dropNonJournals, keyWords, coreCites, PBar)
                 if PBar:
-                    pcount += 1
-                    PBar.updateVal(pcount / len(self), "Analyzing: {}".format(R))
-                Cites = R.get('citations')
-                if Cites:
-                    filteredCites = filterCites(Cites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites)
-                    addToNetwork(tmpgrph, filteredCites, count, weighted, nodeType, nodeInfo , fullInfo, coreCitesDict, coreValues, detailedCoreAttributes, addCR, headNd = None)
+                    PBar.updateVal(.9, "Multiplying the incidence matrix")
+                occurrences = A.sum(axis = 0).A1
+                nodeTuples = []
+                for i, c in enumerate(firstCites.values()):
+                    nodeTuples.append(makeNodeTuple(c, makeID(c, nodeType), nodeInfo, fullInfo, nodeType, count, coreCitesDict, coreValues, detailedCoreAttributes, addCR))
+                    if count:
+                        nodeTuples[-1][1]['count'] = int(occurrences[i])
+                tmpgrph = coOccurrenceGraph(A, nodeTuples, weighted)
+            else:
+                knownJournals = {}
+                for R in self:
+                    if PBar:
+                        pcount += 1
+                        PBar.updateVal(pcount / len(self), "Analyzing: {}".format(R))
+                    Cites = R.get('citations')
+                    if Cites:
+                        filteredCites = filterCites(Cites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites, knownJournals)
+                        addToNetwork(tmpgrph, filteredCites, count, weighted, nodeType, nodeInfo , fullInfo, coreCitesDict, coreValues, detailedCoreAttributes, addCR, headNd = None)
             if expandedCore:
                 if PBar:
                     PBar.updateVal(.98, "Expanding core Records")
@@ -1176,6 +1616,71 @@ class RecordCollection(CollectionWithIDs):
                 PBar.finish("Done making a co-citation network from {}".format(self))
         return tmpgrph
 
+    def coCitationMatrix(self, nodeType = "full", dropAnon = True, dropNonJournals = False, keyWords = None, coreOnly = False):
+        """Creates the co-citation matrix of the RecordCollection, the sparse matrix version of [networkCoCitation()](#metaknowledge.RecordCollection.networkCoCitation).
+
+        A Record by citation incidence matrix _A_, with the number of times each Record cites each citation, is made once and the co-citation counts are its product `A.T * A`. This requires [scipy](https://www.scipy.org/).
+
+        # Parameters
+
+        _nodeType_ : `optional [str]`
+
+        > One of `"full"`, `"original"`, `"author"`, `"journal"` or `"year"`. Specifies the value of the nodes, as in [networkCoCitation()](#metaknowledge.RecordCollection.networkCoCitation)
+
+        _dropAnon_ : `optional [bool]`
+
+        > default `True`, if `True` citations labeled anonymous are removed
+
+        _dropNonJournals_ : `optional [bool]`
+
+        > default `False`, wether to drop citations of non-journals
+
+        _keyWords_ : `optional [str] or [list[str]]`
+
+        > A string or list of strings that the citations are checked against, if they contain any of the strings they are removed
+
+        _coreOnly_ : `optional [bool]`
+
+        > default `False`, if `True` only Citations from the RecordCollection will be included
+
+        # Returns
+
+        `(scipy.sparse.csr_matrix, list)`
+
+        > The square matrix of co-citation counts and the list of node IDs giving its rows and columns. Entry `(i, j)` is the number of times _i_ and _j_ are cited together, the diagonal is the sum over the Records of the square of the number of times they cite the node, which is the number of Records citing it if no Record repeats a citation
+        """
+        allowedTypes = ["full", "original", "author", "journal", "year"]
+        if nodeType not in allowedTypes:
+            raise RCValueError("{} is not an allowed nodeType.".format(nodeType))
+        if coreOnly:
+            coreCites = {R.createCitation() for R in self}
+        else:
+            coreCites = None
+        A, firstCites = self._citationIncidence(nodeType, dropAnon, dropNonJournals, keyWords, coreCites)
+        return coOccurrenceMatrix(A), list(firstCites.keys())
+
+    def _citationIncidence(self, nodeType, dropAnon, dropNonJournals, keyWords, coreCites, PBar = None):
+        """Makes the incidence matrix of the Records and their filtered citations, along with an OrderedDict of the node IDs, in column order, mapped to the first Citation giving them"""
+        firstCites = collections.OrderedDict()
+        knownJournals = {}
+        def citeRows():
+            pcount = 0
+            for R in self:
+                if PBar:
+                    pcount += 1
+                    PBar.updateVal(pcount / len(self) * .9, "Analyzing: {}".format(R))
+                Cites = R.get('citations')
+                if Cites:
+                    row = []
+                    for c in filterCites(Cites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites, knownJournals):
+                        nID = makeID(c, nodeType)
+                        if nID not in firstCites:
+                            firstCites[nID] = c
+                        row.append(nID)
+                    yield row
+        A, nodeIndices = incidenceMatrix(citeRows())
+        return A, firstCites
+
     def networkCitation(self, dropAnon = False, nodeType = "full", nodeInfo = True, fullInfo = False, weighted = True, dropNonJournals = False, count = True, directed = True, keyWords = None, detailedCore = True, detailedCoreAttributes = False, coreOnly = False, expandedCore = False, recordToCite = True, addCR = False, _quiet = False):
         """Creates a citation network for the RecordCollection.
 
@@ -1273,16 +1778,17 @@ class RecordCollection(CollectionWithIDs):
             else:
                 coreCitesDict = None
                 coreCites = None
+            knownJournals = {}
             for R in self:
                 if PBar:
                     pcount += 1
                     PBar.updateVal(pcount/ len(self), "Analyzing: " + str(R))
                 reRef = R.createCitation()
-                if len(filterCites([reRef], nodeType, dropAnon, dropNonJournals, keyWords, coreCites)) == 0:
+                if len(filterCites([reRef], nodeType, dropAnon, dropNonJournals, keyWords, coreCites, knownJournals)) == 0:
                     continue
                 rCites = R.get('citations')
                 if rCites:
-                    filteredCites = filterCites(rCites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites)
+                    filteredCites = filterCites(rCites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites, knownJournals)
                     addToNetwork(tmpgrph, filteredCites, count, weighted, nodeType, nodeInfo, fullInfo, coreCitesDict, coreValues, detailedCoreAttributes, addCR, recordToCite, headNd = reRef)
             if expandedCore:
                 if PBar:
@@ -1291,7 +1797,7 @@ class RecordCollection(CollectionWithIDs):
             PBar.finish("Done making a citation network from {}".format(self))
         return tmpgrph
 
-    def networkBibCoupling(self, weighted = True, fullInfo = False, addCR = False):
+    def networkBibCoupling(self, weighted = True, fullInfo = False, addCR = False, engine = "networkx", minShared = 1, normalize = None):
         """Creates a bibliographic coupling network based on citations for the RecordCollection.
 
         # Parameters
@@ -1304,17 +1810,59 @@ class RecordCollection(CollectionWithIDs):
 
         > Default `False`, if `True` the full citation string will be added to each of the nodes of the network.
 
+        _engine_ : `optional str`
+
+        > Default `"networkx"`, how the edges are made. `"networkx"` makes the citation network and then links every pair of Records citing each node, while `"matrix"` counts the shared references with a sparse matrix product, see [bibCouplingMatrix()](#metaknowledge.RecordCollection.bibCouplingMatrix). Both give the same network but `"matrix"` is much faster when some references are cited many times, it requires [scipy](https://www.scipy.org/).
+
+        _minShared_ : `optional int`
+
+        > Default `1`, the number of references two Records must share to be linked, it requires the `"matrix"` _engine_
+
+        _normalize_ : `optional str`
+
+        > Default `None`, if `"salton"` the weights are the Salton (cosine) index of the Records' references and if `"jaccard"` their Jaccard index, the number of shared references is then given by the edge attribute `'shared'`. It requires the `"matrix"` _engine_ and _weighted_
+
         # Returns
 
         `Networkx Graph`
 
         > A graph of the bibliographic coupling
         """
+        if engine not in ["networkx", "matrix"]:
+            raise RCValueError("{} is not an allowed engine, it must be 'networkx' or 'matrix'.".format(engine))
+        if normalize not in [None, "salton", "jaccard"]:
+            raise RCValueError("{} is not an allowed normalization, it must be None, 'salton' or 'jaccard'.".format(normalize))
+        if engine != "matrix" and (minShared != 1 or normalize is not None):
+            raise RCValueError("minShared and normalize require the 'matrix' engine.")
+        if normalize is not None and not weighted:
+            raise RCValueError("normalize requires a weighted network.")
         progArgs = (0, "Make a citation network for coupling")
         if metaknowledge.VERBOSE_MODE:
             progKwargs = {'dummy' : False}
         else:
             progKwargs = {'dummy' : True}
+        if engine == "matrix":
+            with _ProgressBar(*progArgs, **progKwargs) as PBar:
+                coreCitesDict = {R.createCitation() : R for R in self}
+                coreValues = ['id', 'authorsFull', 'year', 'title', 'journal', 'volume', 'beginningPage']
+                A, sourceIDs, firstCites = self._referenceIncidence(PBar)
+                PBar.updateVal(.6, "Multiplying the incidence matrix")
+                U = rowOverlaps(A, minShared = minShared)
+                workingGrph = nx.Graph()
+                for nID, c in firstCites.items():
+                    if c in coreCitesDict:
+                        nodeName, nodeDat = makeNodeTuple(c, nID, True, fullInfo, "full", False, coreCitesDict, coreValues, False, addCR)
+                        workingGrph.add_node(nodeName, **nodeDat)
+                edgeNodes = zip([sourceIDs[i] for i in U.row.tolist()], [sourceIDs[i] for i in U.col.tolist()])
+                if normalize is not None:
+                    weights = normalizeOverlaps(U, A.getnnz(axis = 1), normalize)
+                    workingGrph.add_edges_from(((n1, n2, {'weight' : w, 'shared' : c}) for (n1, n2), w, c in zip(edgeNodes, weights.tolist(), U.data.tolist())))
+                elif weighted:
+                    workingGrph.add_weighted_edges_from(((n1, n2, c) for (n1, n2), c in zip(edgeNodes, U.data.tolist())))
+                else:
+                    workingGrph.add_edges_from(edgeNodes)
+                PBar.finish("Done making a bib-coupling network from {}".format(self))
+            return workingGrph
         with _ProgressBar(*progArgs, **progKwargs) as PBar:
             citeGrph = self.networkCitation(weighted = False, directed = True, detailedCore = True, fullInfo = fullInfo, count = False, nodeInfo = True, addCR = addCR, _quiet = True)
             pcount = 0
@@ -1347,16 +1895,77 @@ class RecordCollection(CollectionWithIDs):
             PBar.finish("Done making a bib-coupling network from {}".format(self))
         return workingGrph
 
-    def _extractTagged(self, taglist):
-        recordsWithTags = set()
+    def bibCouplingMatrix(self, minShared = 1, normalize = None):
+        """Creates the bibliographic coupling matrix of the RecordCollection, the sparse matrix version of [networkBibCoupling()](#metaknowledge.RecordCollection.networkBibCoupling).
+
+        A Record by reference incidence matrix _A_ is made once and the number of references each pair of Records share is its product `A * A.T`. The product is made a block of Records at a time and pairs sharing fewer than _minShared_ references are dropped as it is made. This requires [scipy](https://www.scipy.org/).
+
+        # Parameters
+
+        _minShared_ : `optional int`
+
+        > Default `1`, the number of references two Records must share to be given an entry
+
+        _normalize_ : `optional str`
+
+        > Default `None`, if `"salton"` the entries are the Salton (cosine) index of the Records' references and if `"jaccard"` their Jaccard index, otherwise they are the number of shared references
+
+        # Returns
+
+        `(scipy.sparse.csr_matrix, list[str])`
+
+        > The symmetric coupling matrix, with an empty diagonal, and the list of the IDs of the Records (as given by [Citation.ID()](./Citation.html#metaknowledge.citation.Citation.ID)) giving its rows and columns. Records that cite nothing are not included
+        """
+        if normalize not in [None, "salton", "jaccard"]:
+            raise RCValueError("{} is not an allowed normalization, it must be None, 'salton' or 'jaccard'.".format(normalize))
+        A, sourceIDs, firstCites = self._referenceIncidence()
+        U = rowOverlaps(A, minShared = minShared)
+        if normalize is not None:
+            U.data = normalizeOverlaps(U, A.getnnz(axis = 1), normalize)
+        U = U.tocsr()
+        return (U + U.T).tocsr(), sourceIDs
+
+    def _referenceIncidence(self, PBar = None):
+        """Makes the binary incidence matrix of the Records and the references they cite, Records with the same ID share a row. Also gives the list of the IDs of the rows and an OrderedDict of all the node IDs mapped to the first Citation giving them, in the order [networkCitation()](#metaknowledge.RecordCollection.networkCitation) adds them"""
+        firstCites = collections.OrderedDict()
+        sourceRows = collections.OrderedDict()
+        pcount = 0
         for R in self:
-            for t in taglist:
+            if PBar:
+                pcount += 1
+                PBar.updateVal(.6 * pcount / len(self), "Analyzing: {}".format(R))
+            rCites = R.get('citations')
+            if rCites:
+                reRef = R.createCitation()
+                hID = reRef.ID()
+                if hID not in firstCites:
+                    firstCites[hID] = reRef
+                row = sourceRows.setdefault(hID, [])
+                for c in rCites:
+                    nID = c.ID()
+                    if nID not in firstCites:
+                        firstCites[nID] = c
+                    row.append(nID)
+        A, nodeIndices = incidenceMatrix(sourceRows.values())
+        A.data[:] = 1
+        return A, list(sourceRows.keys()), firstCites
+
+    def _extractTagged(self, taglist):
+        tagIndexes = [self._tagIndex(t) for t in taglist]
+        if tagIndexes and None not in tagIndexes:
+            recordsWithTags = set(self._collection)
+            for tagIndex in tagIndexes:
+                recordsWithTags -= tagIndex.missing()
+        else:
+            recordsWithTags = set()
+            for R in self:
                 hasTags = True
-                if t not in R.tags:
-                    hasTags = False
-                    break
-            if hasTags:
-                recordsWithTags.add(R)
+                for t in taglist:
+                    if t not in R:
+                        hasTags = False
+                        break
+                if hasTags:
+                    recordsWithTags.add(R)
         return RecordCollection(recordsWithTags, repr(self) + "_tags(" + ','.join(taglist) + ')', quietStart = True)
 
     def yearSplit(self, startYear, endYear, dropMissingYears = True):
@@ -1376,27 +1985,35 @@ class RecordCollection(CollectionWithIDs):
 
         > Default `True`, if `True` Records with missing years will be dropped. If `False` a `TypeError` exception will be raised
 
+        If there is an index of `'year'`, from [createIndex()](./CollectionWithIDs.html#metaknowledge.CollectionWithIDs.createIndex), only the years in the range are looked at.
+
         # Returns
 
         `RecordCollection`
 
         > A RecordCollection of Records from _startYear_ to _endYear_
         """
-        recordsInRange = set()
-        for R in self:
-            try:
-                if R.get('year') >= startYear and R.get('year') <= endYear:
-                    recordsInRange.add(R)
-            except TypeError:
-                if dropMissingYears:
-                    pass
-                else:
-                    raise
+        yearIndex = self._tagIndex('year')
+        if yearIndex is not None:
+            if not dropMissingYears and yearIndex.missing():
+                raise TypeError("The RecordCollection '{}' has Records with no year.".format(self.name))
+            recordsInRange = yearIndex.between(startYear, endYear)
+        else:
+            recordsInRange = set()
+            for R in self:
+                try:
+                    if R.get('year') >= startYear and R.get('year') <= endYear:
+                        recordsInRange.add(R)
+                except TypeError:
+                    if dropMissingYears:
+                        pass
+                    else:
+                        raise
         RCret = RecordCollection(recordsInRange, name = "{}({}-{})".format(self.name, startYear, endYear), quietStart = True)
         RCret._collectedTypes = self._collectedTypes.copy()
         return RCret
 
-    def localCiteStats(self, pandasFriendly = False, keyType = "citation"):
+    def localCiteStats(self, pandasFriendly = False, keyType = "citation", workers = None):
         """Returns a dict with all the citations in the CR field as keys and the number of times they occur as the values
 
         # Parameters
@@ -1409,6 +2026,10 @@ class RecordCollection(CollectionWithIDs):
 
         > default `'citation'`, the type of key to use for the dictionary, the valid strings are `'citation'`, `'journal'`, `'year'` or `'author'`. IF changed from `'citation'` all citations matching the requested option will be contracted and their counts added together.
 
+        _workers_ : `optional [int]`
+
+        > Default `None`, if an integer greater than 1 the citations are counted by a pool of _workers_ processes, with [mapReduce()](./Collection.html#metaknowledge.Collection.mapReduce)
+
         # Returns
 
         `dict[str, int or Citation : int]`
@@ -1422,39 +2043,30 @@ class RecordCollection(CollectionWithIDs):
             progKwargs = {'dummy' : False}
         else:
             progKwargs = {'dummy' : True}
+        citeIndex = self._getIndex('citations')
+        if citeIndex is not None:
+            _checkCiteKeyType(keyType)
+            citesDict = {}
+            for c, citing in citeIndex.citations():
+                _countCitations([c], keyType, citesDict, sum(citing.values()))
+            return _citeStatsOutput(citesDict, pandasFriendly)
+        if workers is not None and workers > 1:
+            _checkCiteKeyType(keyType)
+            citesDict = self.mapReduce(functools.partial(_localCiteCounts, keyType = keyType), reduceCounts, workers = workers, initial = {})
+            return _citeStatsOutput(citesDict, pandasFriendly)
         with _ProgressBar(*progArgs, **progKwargs) as PBar:
-            keyTypesLst = ["citation", "journal", "year", "author"]
             citesDict = {}
-            if keyType not in keyTypesLst:
-                raise TypeError("{} is not a valid key type, only '{}' or '{}' are.".format(keyType, "', '".join(keyTypesLst[:-1]), keyTypesLst[-1]))
+            _checkCiteKeyType(keyType)
             for R in self:
                 rCites = R.get('citations')
                 if PBar:
                     count += 1
                     PBar.updateVal(count / recCount, "Analysing: {}".format(R.UT))
                 if rCites:
-                    for c in rCites:
-                        if keyType == keyTypesLst[0]:
-                            cVal = c
-                        else:
-                            cVal = getattr(c, keyType)
-                            if cVal is None:
-                                continue
-                        if cVal in citesDict:
-                            citesDict[cVal] += 1
-                        else:
-                            citesDict[cVal] = 1
+                    _countCitations(rCites, keyType, citesDict)
             if PBar:
                 PBar.finish("Done, {} {} fields analysed".format(len(citesDict), keyType))
-        if pandasFriendly:
-            citeLst = []
-            countLst = []
-            for cite, occ in citesDict.items():
-                citeLst.append(cite)
-                countLst.append(occ)
-            return {"Citations" : citeLst, "Counts" : countLst}
-        else:
-            return citesDict
+        return _citeStatsOutput(citesDict, pandasFriendly)
 
     def localCitesOf(self, rec):
         """Takes in a Record, WOS string, citation string or Citation and returns a RecordCollection of all records that cite it.
@@ -1474,7 +2086,7 @@ class RecordCollection(CollectionWithIDs):
         localCites = []
         if isinstance(rec, Record):
             recCite = rec.createCitation()
-        if isinstance(rec, str):
+        elif isinstance(rec, str):
             try:
                 recCite = self.getID(rec)
             except ValueError:
@@ -1491,6 +2103,9 @@ class RecordCollection(CollectionWithIDs):
             recCite = rec
         else:
             raise ValueError("{} is not a valid input, rec must be a Record, string or Citation object.".format(rec))
+        citeIndex = self._getIndex('citations')
+        if citeIndex is not None:
+            return RecordCollection(inCollection = citeIndex.citing(recCite), name = "Records_citing_'{}'".format(rec), quietStart = True)
         for R in self:
             rCites = R.get('citations')
             if rCites:
@@ -1531,80 +2146,22 @@ class RecordCollection(CollectionWithIDs):
 
         > Default `False`, if `True` causes the search across the original to be case sensitive, **only** the `'all'` option can be case sensitive
         """
-        retRecs = []
         keyString = str(keyString)
-        for R in self:
-            try:
-                if field == 'all':
-                    for cite in R.get('citations'):
-                        if caseSensitive:
-                            if keyString in cite.original:
-                                retRecs.append(R)
-                                break
-                        else:
-                            if keyString.upper() in cite.original.upper():
-                                retRecs.append(R)
-                                break
-                elif field == 'author':
-                    for cite in R.get('citations'):
-                        try:
-                            if keyString.upper() in cite.author.upper():
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'journal':
-                    for cite in R.get('citations'):
-                        try:
-                            if keyString.upper() in cite.journal:
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'year':
-                    for cite in R.get('citations'):
-                        try:
-                            if int(keyString) == cite.year:
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'V':
-                    for cite in R.get('citations'):
-                        try:
-                            if keyString.upper() in cite.V:
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'P':
-                    for cite in R.get('citations'):
-                        try:
-                            if keyString.upper() in cite.P:
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'misc':
-                    for cite in R.get('citations'):
-                        try:
-                            if keyString.upper() in cite.misc:
-                                retRecs.append(R)
-                                break
-                        except AttributeError:
-                            pass
-                elif field == 'anonymous':
-                    for cite in R.get('citations'):
-                        if cite.isAnonymous():
-                            retRecs.append(R)
-                            break
-                elif field == 'bad':
-                    for cite in R.get('citations'):
-                        if cite.bad:
-                            retRecs.append(R)
+        citeIndex = self._getIndex('citations')
+        if citeIndex is not None:
+            retRecs = set()
+            for cite, citing in citeIndex.citations():
+                if _citeMatches(cite, keyString, field, caseSensitive):
+                    retRecs.update(citing)
+        else:
+            retRecs = set()
+            for R in self:
+                rCites = R.get('citations')
+                if rCites:
+                    for cite in rCites:
+                        if _citeMatches(cite, keyString, field, caseSensitive):
+                            retRecs.add(R)
                             break
-            except TypeError:
-                pass
         if reverse:
             excluded = []
             for R in self:
@@ -1614,6 +2171,174 @@ class RecordCollection(CollectionWithIDs):
         else:
             return RecordCollection(inCollection = retRecs, name = self.name, quietStart = True)
 
+    def createCitationIndex(self):
+        """Creates an index of the citations of the `Records`, mapping each citation to the `Records` citing it. The index is kept current as `Records` are added to or removed from the `RecordCollection`, and while it exists [localCitesOf()](#metaknowledge.RecordCollection.localCitesOf), [localCiteStats()](#metaknowledge.RecordCollection.localCiteStats) and [citeFilter()](#metaknowledge.RecordCollection.citeFilter) use it instead of reading every `Record`.
+
+        Making the index reads the citations of all the `Records`, so it is only worth it if the citations are queried more than a few times. It is not copied to new `RecordCollections` made from this one, except by [copy()](#metaknowledge.RecordCollection.copy).
+        """
+        self._addIndex('citations', CitationIndex())
+
+    def dropCitationIndex(self):
+        """Removes the index made by [createCitationIndex()](#metaknowledge.RecordCollection.createCitationIndex), if there is one
+        """
+        self._dropIndex('citations')
+
+
+def _getRecordFileList(dirPath, extension):
+    """Returns the paths of the files in _dirPath_ ending with _extension_ that could hold records, cache files are skipped."""
+    flist = []
+    for f in os.listdir(dirPath):
+        fullF = os.path.join(os.path.abspath(dirPath), f)
+        if fullF.endswith(extension) and not fullF.endswith('mkRecordDirCache') and os.path.isfile(fullF):
+            flist.append(fullF)
+    return flist
+
+def _readRecordFile(fileName, lazy = False, onlyTheseTags = None):
+    """Parses _fileName_ with the first handler in `recordHandlers` whose detector accepts it, if _lazy_ WOS files are read lazily and _onlyTheseTags_ is given to the parser.
+
+    Returns a tuple of the record type's name, the set of Records and the parsing error (or `None`). Raises `UnknownFile` if no handler accepts the file.
+    """
+    for recordType, processor, detector in recordHandlers:
+        if detector(fileName):
+            if lazy and recordType == "WOSRecord":
+                recs, pError = processor(fileName, lazy = True, onlyTheseTags = onlyTheseTags)
+            else:
+                recs, pError = processor(fileName, onlyTheseTags = onlyTheseTags)
+            return recordType, recs, pError
+
+def _readRecordFileOrNone(fileName, lazy = False, onlyTheseTags = None):
+    #Used by the worker processes, UnknownFile is turned into None so the
+    #caller can decide what to do with it in file order
+    try:
+        return _readRecordFile(fileName, lazy = lazy, onlyTheseTags = onlyTheseTags)
+    except UnknownFile:
+        return None
+
+def _readRecordFilesSerial(flist, PBar, lazy = False, onlyTheseTags = None):
+    results = []
+    for count, fileName in enumerate(flist, start = 1):
+        PBar.updateVal(count / len(flist), "Reading records from: {}".format(fileName))
+        results.append(_readRecordFileOrNone(fileName, lazy = lazy, onlyTheseTags = onlyTheseTags))
+    return results
+
+def _readRecordFilesParallel(flist, workers, PBar, lazy = False, onlyTheseTags = None):
+    """Parses the files in _flist_ with a pool of _workers_ processes, one file per task.
+
+    The results are returned in the same order as _flist_ so merging them gives the same `RecordCollection` as a serial read, while _PBar_ is updated as each file finishes.
+    """
+    results = [None] * len(flist)
+    with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = {executor.submit(_readRecordFileOrNone, fileName, lazy, onlyTheseTags) : i for i, fileName in enumerate(flist)}
+        for count, future in enumerate(concurrent.futures.as_completed(futures), start = 1):
+            i = futures[future]
+            results[i] = future.result()
+            PBar.updateVal(count / len(flist), "Read {} of {} files, last was: {}".format(count, len(flist), flist[i]))
+    return results
+
+def _processTagValues(recordType, rawTag, rawValues):
+    """Parses each of _rawValues_ of _rawTag_ as a Record of _recordType_ would, this is what the worker processes of [precompute()](#metaknowledge.RecordCollection.precompute) run."""
+    processor = recordType.tagProcessingFunc(rawTag)
+    return [processor(rawValue) for rawValue in rawValues]
+
+#The start of Citation.wosCiteRegex, it always matches so the year found is the same as the Citation's
+_citeYearRegex = re.compile(r"([^0-9,][^,]+)?(, )?(-?[0-9]{1,5})?")
+
+def _citedYears(R):
+    """The years of the citations of _R_, used by [rpys()](#metaknowledge.RecordCollection.rpys). If _R_ is a WOSRecord whose citations have not been processed only the years are read from the raw `'CR'` lines, no Citations are made."""
+    years = []
+    if isinstance(R, WOSRecord) and 'CR' not in R._computedFields:
+        for c in R.get('CR', [], raw = True):
+            cYear = _citeYearRegex.match(c).group(3)
+            if cYear is not None:
+                years.append(int(cYear))
+    else:
+        for cite in R.get('citations') or []:
+            try:
+                #year can be None
+                years.append(int(cite.year))
+            except (AttributeError, TypeError):
+                continue
+    return years
+
+def _authorGenderCounts(authSets):
+    """Gives the numbers of male, female and unknown names in each of the sets of names _authSets_, all the names are classified together"""
+    genders = namesGenders((auth for auths in authSets for auth in auths))
+    retCounts = []
+    for auths in authSets:
+        counts = [0, 0, 0]
+        for auth in auths:
+            g = genders[auth]
+            if g == 'Male':
+                counts[0] += 1
+            elif g == 'Female':
+                counts[1] += 1
+            elif g == 'Unknown':
+                counts[2] += 1
+        retCounts.append(tuple(counts))
+    return retCounts
+
+def _checkCiteKeyType(keyType):
+    keyTypesLst = ["citation", "journal", "year", "author"]
+    if keyType not in keyTypesLst:
+        raise TypeError("{} is not a valid key type, only '{}' or '{}' are.".format(keyType, "', '".join(keyTypesLst[:-1]), keyTypesLst[-1]))
+
+def _citeMatches(cite, keyString, field, caseSensitive):
+    """Checks if _cite_ has _keyString_ in _field_, as [citeFilter()](#metaknowledge.RecordCollection.citeFilter) does."""
+    if field == 'all':
+        if caseSensitive:
+            return keyString in cite.original
+        else:
+            return keyString.upper() in cite.original.upper()
+    elif field == 'anonymous':
+        return cite.isAnonymous()
+    elif field == 'bad':
+        return cite.bad
+    elif field not in ['author', 'journal', 'year', 'V', 'P', 'misc']:
+        return False
+    val = getattr(cite, field, None)
+    if val is None:
+        return False
+    elif field == 'year':
+        return int(keyString) == val
+    elif field == 'author':
+        return keyString.upper() in val.upper()
+    else:
+        return keyString.upper() in val
+
+def _countCitations(rCites, keyType, citesDict, occurrences = 1):
+    """Adds the counts of the citations in _rCites_, keyed as [localCiteStats()](#metaknowledge.RecordCollection.localCiteStats) does with _keyType_, to _citesDict_, each citation is counted _occurrences_ times."""
+    for c in rCites:
+        if keyType == "citation":
+            cVal = c
+        else:
+            cVal = getattr(c, keyType)
+            if cVal is None:
+                continue
+        if cVal in citesDict:
+            citesDict[cVal] += occurrences
+        else:
+            citesDict[cVal] = occurrences
+    return citesDict
+
+def _localCiteCounts(records, keyType):
+    """Counts the citations of _records_ as [localCiteStats()](#metaknowledge.RecordCollection.localCiteStats) does, used by its worker processes"""
+    citesDict = {}
+    for R in records:
+        rCites = R.get('citations')
+        if rCites:
+            _countCitations(rCites, keyType, citesDict)
+    return citesDict
+
+def _citeStatsOutput(citesDict, pandasFriendly):
+    if pandasFriendly:
+        citeLst = []
+        countLst = []
+        for cite, occ in citesDict.items():
+            citeLst.append(cite)
+            countLst.append(occ)
+        return {"Citations" : citeLst, "Counts" : countLst}
+    else:
+        return citesDict
 
 def addToNetwork(grph, nds, count, weighted, nodeType, nodeInfo, fullInfo, coreCitesDict, coreValues, detailedValues, addCR, recordToCite = True, headNd = None):
     """Addeds the citations _nds_ to _grph_, according to the rules give by _nodeType_, _fullInfo_, etc.
@@ -1760,12 +2485,15 @@ def makeNodeTuple(citation, idVal, nodeInfo, fullInfo, nodeType, count, coreCite
     return (idVal, d)
 
 
-def filterCites(cites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites):
+def filterCites(cites, nodeType, dropAnon, dropNonJournals, keyWords, coreCites, knownJournals = None):
+    #knownJournals is given to classifyJournals() so callers filtering many lists only look up each journal once
     filteredCites = []
-    for c in cites:
+    if dropNonJournals:
+        journalMask = classifyJournals(cites, known = knownJournals)
+    for i, c in enumerate(cites):
         if nodeType != "full" and hasattr(c, nodeType) and not getattr(c, nodeType):
             pass
-        elif dropNonJournals and not c.isJournal():
+        elif dropNonJournals and not journalMask[i]:
             pass
         elif dropAnon and c.isAnonymous():
             pass
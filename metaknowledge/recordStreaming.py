@@ -0,0 +1,281 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Functions for working with records one file at a time, without building a [RecordCollection](../classes/RecordCollection.html#metaknowledge.RecordCollection).
+
+Only the records of the file currently being read are kept in memory, so these can be used on corpora too large to be loaded all at once.
+"""
+import os
+import os.path
+import array
+
+from .mkExceptions import BadInputFile, RCTypeError, UnknownFile, mkException
+from .mkCollection import _countTagValues, _rankedSeriesOutput
+from .recordCollection import _getRecordFileList, _readRecordFile, _checkCiteKeyType, _countCitations, _citeStatsOutput, _citedYears
+
+#Number of cited years read before they are added to the counts
+_rpysBatchSize = 2 ** 20
+
+#The citing year of Records without one, it is after every cited year
+_noYear = 2 ** 62
+
+def iterRecords(inPath, extension = '', errors = None):
+    """A generator that yields the `Records` in _inPath_, reading one file at a time.
+
+    The files are parsed with the same handlers as [RecordCollection](../classes/RecordCollection.html#metaknowledge.RecordCollection) so any file type it can read can be used. The records of each file are yielded in the order they occur in the file.
+
+    # Parameters
+
+    _inPath_ : `str`
+
+    > The path to a file or to a directory of files
+
+    _extension_ : `optional [str]`
+
+    > Default `''`, if _inPath_ is a directory only the files ending with _extension_ are read. If it is not empty any file ending with _extension_ that cannot be read raises a `BadInputFile` exception, like it does when creating a `RecordCollection`
+
+    _errors_ : `optional [dict]`
+
+    > Default `None`, if a `dict` is given the errors raised while reading each file are added to it, keyed by the file's path. This is the same as the `errors` attribute of a `RecordCollection`
+
+    # Returns
+
+    `generator[Record]`
+
+    > The `Records` in _inPath_
+    """
+    if not isinstance(inPath, str):
+        raise RCTypeError("iterRecords() requires a path to a file or directory, not {}.".format(inPath))
+    inPath = os.path.realpath(os.path.expanduser(inPath))
+    if os.path.isfile(inPath):
+        if not inPath.endswith(extension):
+            raise RCTypeError("extension of input file does not match requested extension")
+        flist = [inPath]
+        strict = True
+    elif os.path.isdir(inPath):
+        flist = _getRecordFileList(inPath, extension)
+        strict = extension != ''
+    else:
+        raise RCTypeError("'{}' is not a path to a directory or file.".format(inPath))
+    for fileName in flist:
+        try:
+            recordType, recs, pError = _readRecordFile(fileName)
+        except UnknownFile:
+            if strict:
+                raise BadInputFile("'{}' does not match any known file type.\nIts header might be damaged or it could have been modified by another program.".format(fileName))
+            else:
+                continue
+        if pError is not None and errors is not None:
+            errors[fileName] = pError
+        for R in sorted(recs, key = lambda x: x._sourceLine):
+            yield R
+        #Let the file's records be freed before reading the next one
+        del recs
+
+def _recordSource(records, extension):
+    if isinstance(records, str):
+        return iterRecords(records, extension = extension)
+    else:
+        return records
+
+def streamRankedSeries(records, tag, outputFile = None, giveCounts = True, giveRanks = False, greatestFirst = True, pandasMode = True, limitTo = None, extension = ''):
+    """The streaming version of [rankedSeries()](../classes/CollectionWithIDs.html#metaknowledge.CollectionWithIDs.rankedSeries), the values of _tag_ are counted one record at a time so only the counts are kept in memory.
+
+    # Parameters
+
+    _records_ : `str or iterable[Record]`
+
+    > A path to a file or directory, which will be read with [iterRecords()](#metaknowledge.recordStreaming.iterRecords), or any iterable of `Records`
+
+    _extension_ : `optional [str]`
+
+    > Default `''`, the extension given to `iterRecords()` if _records_ is a path
+
+    All other parameters are the same as those of `rankedSeries()`
+
+    # Returns
+
+    `dict[str:list[value]] or list[str]`
+
+    > A `dict` or `list` will be returned depending on if _pandasMode_ is `True`
+    """
+    if giveRanks and giveCounts:
+        raise mkException("rankedSeries cannot return counts and ranks only one of giveRanks or giveCounts can be True.")
+    seriesDict = _countTagValues(_recordSource(records, extension), tag, limitTo)
+    return _rankedSeriesOutput(seriesDict, tag, outputFile, giveCounts, giveRanks, greatestFirst, pandasMode)
+
+def streamLocalCiteStats(records, pandasFriendly = False, keyType = "citation", extension = ''):
+    """The streaming version of [localCiteStats()](../classes/RecordCollection.html#metaknowledge.RecordCollection.localCiteStats), the citations are counted one record at a time so only the counts are kept in memory.
+
+    # Parameters
+
+    _records_ : `str or iterable[Record]`
+
+    > A path to a file or directory, which will be read with [iterRecords()](#metaknowledge.recordStreaming.iterRecords), or any iterable of `Records`
+
+    _pandasFriendly_ : `optional [bool]`
+
+    > default `False`, makes the output be a dict with two keys one `'Citations'` is the citations the other is their occurrence counts as `'Counts'`.
+
+    _keyType_ : `optional [str]`
+
+    > default `'citation'`, the type of key to use for the dictionary, the valid strings are `'citation'`, `'journal'`, `'year'` or `'author'`.
+
+    _extension_ : `optional [str]`
+
+    > Default `''`, the extension given to `iterRecords()` if _records_ is a path
+
+    # Returns
+
+    `dict[str, int or Citation : int]`
+
+    > A dictionary with keys as given by _keyType_ and integers giving their rates of occurrence
+    """
+    _checkCiteKeyType(keyType)
+    citesDict = {}
+    for R in _recordSource(records, extension):
+        rCites = R.get('citations')
+        if rCites:
+            _countCitations(rCites, keyType, citesDict)
+    return _citeStatsOutput(citesDict, pandasFriendly)
+
+def streamRPYS(records, minYear = None, maxYear = None, dropYears = None, rankEmptyYears = False, byCitingYear = False, extension = ''):
+    """The streaming version of [rpys()](../classes/RecordCollection.html#metaknowledge.RecordCollection.rpys), _Referenced Publication Years Spectroscopy_. Only the cited years are read from each record, for WOS records they are read from the raw `'CR'` lines without making [Citations](../classes/Citation.html#metaknowledge.citation.Citation), and they are counted in a numpy array indexed by year, so only the counts are kept in memory.
+
+    The deviations from the 5-year medians and the ranks are computed for all the years at once. If _byCitingYear_ is `True` this is done separately for the citations made in each year, giving the _multi-RPYS_ matrix, where each row is the spectrum of one citing year. `Records` without a year are then skipped.
+
+    This requires [numpy](http://www.numpy.org/).
+
+    # Parameters
+
+    _records_ : `str or iterable[Record]`
+
+    > A path to a file or directory, which will be read with [iterRecords()](#metaknowledge.recordStreaming.iterRecords), or any iterable of `Records`
+
+    _byCitingYear_ : `optional [bool]`
+
+    > Default `False`, if `True` the spectra of each citing year are returned as a matrix
+
+    _extension_ : `optional [str]`
+
+    > Default `''`, the extension given to `iterRecords()` if _records_ is a path
+
+    All other parameters are the same as those of `rpys()`
+
+    # Returns
+
+    `dict[str:list or numpy.ndarray]`
+
+    > If _byCitingYear_ is `False` the same table as `rpys()`. Otherwise `'citing-year'` and `'year'` are lists of the citing and cited years and `'count'`, `'abs-deviation'` and `'rank'` are 2-D arrays with a row for each citing year and a column for each cited year
+    """
+    numpy = _importNumpy()
+    if dropYears is None:
+        dropYears = []
+    elif isinstance(dropYears, int):
+        dropYears = [dropYears]
+    counts, citingStart, citedStart = _rpysCounts(numpy, _recordSource(records, extension), byCitingYear)
+    if minYear is None or maxYear is None:
+        citedYears = numpy.flatnonzero(counts.any(axis = 0)) + citedStart
+        if minYear is None:
+            minYear = max(int(citedYears[0]), 1000) if len(citedYears) > 0 else 1000
+        if maxYear is None:
+            maxYear = min(int(citedYears[-1]), 2100) if len(citedYears) > 0 else 2100
+    #The counts from 2 years before minYear to 2 years after maxYear, the extra years are for the medians
+    spectra = numpy.zeros((counts.shape[0], max(maxYear - minYear + 5, 4)), dtype = numpy.int64)
+    lo = max(minYear - 2, citedStart)
+    hi = min(maxYear + 3, citedStart + counts.shape[1])
+    if lo < hi:
+        spectra[:, lo - minYear + 2 : hi - minYear + 2] = counts[:, lo - citedStart : hi - citedStart]
+    years, yearCounts, deviations, ranks = _rpysTable(numpy, spectra, minYear, dropYears, rankEmptyYears)
+    if byCitingYear:
+        return {
+            'citing-year' : list(range(citingStart, citingStart + counts.shape[0])),
+            'year' : years.tolist(),
+            'count' : yearCounts,
+            'abs-deviation' : deviations,
+            'rank' : ranks,
+        }
+    else:
+        return {
+            'year' : years.tolist(),
+            'count' : yearCounts[0].tolist(),
+            'abs-deviation' : deviations[0].tolist(),
+            'rank' : ranks[0].tolist(),
+        }
+
+def _importNumpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("streamRPYS() requires numpy, it can be installed with 'pip install metaknowledge[matrix]'. The error was: {}".format(e)) from None
+    return numpy
+
+def _rpysCounts(numpy, records, byCitingYear):
+    """Counts the cited years of _records_, dropping those less than 2 years before their citing year. Returns the counts, with one row or a row for each citing year, and the first citing and cited years"""
+    counts = numpy.zeros((1, 0), dtype = numpy.int64)
+    citingStart = citedStart = 0
+    citing = array.array('q')
+    cited = array.array('q')
+    for R in records:
+        recYear = R.get('year')
+        if recYear is None:
+            if byCitingYear:
+                continue
+            recYear = _noYear
+        cYears = _citedYears(R)
+        cited.extend(cYears)
+        citing.extend([recYear] * len(cYears))
+        if len(cited) >= _rpysBatchSize:
+            counts, citingStart, citedStart = _addYearCounts(numpy, counts, citingStart, citedStart, citing, cited, byCitingYear)
+            citing = array.array('q')
+            cited = array.array('q')
+    counts, citingStart, citedStart = _addYearCounts(numpy, counts, citingStart, citedStart, citing, cited, byCitingYear)
+    return counts, citingStart, citedStart
+
+def _addYearCounts(numpy, counts, citingStart, citedStart, citing, cited, byCitingYear):
+    """Adds the pairs of _citing_ and _cited_ years to _counts_, growing it if they are outside of it"""
+    citing = numpy.frombuffer(citing, dtype = numpy.int64)
+    cited = numpy.frombuffer(cited, dtype = numpy.int64)
+    #years from before the paper are an error
+    keep = cited <= citing - 2
+    citing = citing[keep]
+    cited = cited[keep]
+    if len(cited) == 0:
+        return counts, citingStart, citedStart
+    if byCitingYear:
+        rows = citing
+    else:
+        rows = numpy.zeros(len(cited), dtype = numpy.int64)
+    if counts.size == 0:
+        citingStart = int(rows.min())
+        citedStart = int(cited.min())
+        newShape = (int(rows.max()) - citingStart + 1, int(cited.max()) - citedStart + 1)
+        counts = numpy.zeros(newShape, dtype = numpy.int64)
+    else:
+        newCitingStart = min(citingStart, int(rows.min()))
+        newCitedStart = min(citedStart, int(cited.min()))
+        newShape = (max(citingStart + counts.shape[0], int(rows.max()) + 1) - newCitingStart, max(citedStart + counts.shape[1], int(cited.max()) + 1) - newCitedStart)
+        if newShape != counts.shape:
+            grown = numpy.zeros(newShape, dtype = numpy.int64)
+            grown[citingStart - newCitingStart : citingStart - newCitingStart + counts.shape[0], citedStart - newCitedStart : citedStart - newCitedStart + counts.shape[1]] = counts
+            counts = grown
+            citingStart = newCitingStart
+            citedStart = newCitedStart
+    cells = (rows - citingStart) * counts.shape[1] + (cited - citedStart)
+    counts += numpy.bincount(cells, minlength = counts.size).reshape(counts.shape)
+    return counts, citingStart, citedStart
+
+def _rpysTable(numpy, spectra, minYear, dropYears, rankEmptyYears):
+    """Computes the RPYS table of each row of _spectra_, whose columns are the counts of the years from 2 years before _minYear_ to 2 years after the last year"""
+    windows = numpy.lib.stride_tricks.sliding_window_view(spectra, 5, axis = 1)
+    years = numpy.arange(minYear, minYear + windows.shape[1])
+    targets = numpy.isin(years, list(dropYears), invert = True)
+    years = years[targets]
+    yearCounts = spectra[:, 2:-2][:, targets]
+    medians = numpy.partition(windows[:, targets], 2, axis = 2)[:, :, 2]
+    deviations = yearCounts - medians
+    #The highest rank goes to the highest deviation, ties are ranked by year
+    order = numpy.argsort(deviations, axis = 1, kind = 'stable')
+    ranks = numpy.empty_like(deviations)
+    numpy.put_along_axis(ranks, order, numpy.broadcast_to(numpy.arange(1, len(years) + 1), order.shape), axis = 1)
+    if not rankEmptyYears:
+        ranks[yearCounts == 0] = 0
+    return years, yearCounts, deviations, ranks
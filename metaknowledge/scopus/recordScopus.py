@@ -7,8 +7,8 @@ import re
 from .tagProcessing.tagFunctions import scopusTagToFunction
 from .tagProcessing.specialFunctions import scopusSpecialTagToFunc
 
-from ..mkRecord import ExtendedRecord
-from ..mkExceptions import RCTypeError, BadScopusFile, BadScopusRecord
+from ..mkRecord import ExtendedRecord, _projectFieldDict, _sharedTagSet
+from ..mkExceptions import RCTypeError, BadScopusFile, BadScopusRecord, RecordsNotCompatible
 
 scopusHeader = [
     'Authors',
@@ -60,15 +60,18 @@ class ScopusRecord(ExtendedRecord):
 
     This class is an [ExtendedRecord](./ExtendedRecord.html#metaknowledge.ExtendedRecord) capable of generating its own id number. You should not create them directly, but instead use [scopusParser()](../modules/scopus.html#metaknowledge.scopus.scopusHandlers.scopusParser) on a scopus **CSV** file.
     """
-    def __init__(self, inRecord, sFile = "", sLine = 0, header = None):
+    def __init__(self, inRecord, sFile = "", sLine = 0, header = None, keptTags = None):
         bad = False
         error = None
         fieldDict = None
+        droppedTags = set()
         try:
             if isinstance(inRecord, dict) or isinstance(inRecord, collections.OrderedDict):
                 fieldDict = collections.OrderedDict(inRecord)
+                if keptTags is not None:
+                    _projectFieldDict(fieldDict, keptTags, droppedTags)
             elif isinstance(inRecord, str):
-                fieldDict = scopusRecordParser(inRecord, header = header)
+                fieldDict = scopusRecordParser(inRecord, header = header, keptTags = keptTags, droppedTags = droppedTags)
             else:
                 raise RCTypeError("Unsupported input type '{}', ScopusRecords cannot be created from '{}'".format(inRecord, type(inRecord)))
         except (BadScopusRecord, IndexError) as b:
@@ -83,6 +86,8 @@ class ScopusRecord(ExtendedRecord):
                 bad = True
                 error = BadScopusRecord("Missing EID")
         ExtendedRecord.__init__(self, fieldDict, self._scopusNum, bad, error, sFile = sFile, sLine = sLine)
+        if droppedTags:
+            self._droppedTags = _sharedTagSet(droppedTags)
 
     def encoding(self):
         return 'utf-8'
@@ -101,6 +106,8 @@ class ScopusRecord(ExtendedRecord):
     def writeRecord(self, f):
         if self.bad:
             raise BadScopusRecord("This record cannot be converted to a file as the input was malformed.\nThe original line number (if any) is: {} and the original file is: '{}'".format(self._sourceLine, self._sourceFile))
+        elif self._droppedTags:
+            raise RecordsNotCompatible("This record cannot be written to a file as the tags {} were dropped when it was read.".format(', '.join(sorted(self._droppedTags))))
         else:
             f.write(','.join(('"{}"'.format(self._fieldDict.get(k, '')) for k in scopusHeader)))
 
@@ -166,7 +173,7 @@ class ScopusRecord(ExtendedRecord):
 firstQuotingRegex = re.compile(r'("")*"([^"]|"$)')
 innerQuotingRegex = re.compile(r'("")*"([^"|$])')
 
-def scopusRecordParser(record, header = None):
+def scopusRecordParser(record, header = None, keptTags = None, droppedTags = None):
     """The parser [ScopusRecords](../classes/ScopusRecord.html#metaknowledge.scopus.ScopusRecord) use. This takes a line from [scopusParser()](#metaknowledge.scopus.scopusHandlers.scopusParser) and parses it as a part of the creation of a `ScopusRecord`.
 
     **Note** this is for csv files downloaded from scopus _not_ the text records as those are less complete. Also, Scopus uses double quotes (`"`) to quote strings, such as abstracts, in the csv so double quotes in the string must be escaped. For reasons not fully understandable by mortals they choose to use two double quotes in a row (`""`) to represent an escaped double quote. This parser does not unescape these quotes, but it does correctly handle their interacts with the outer double quotes.
@@ -177,6 +184,18 @@ def scopusRecordParser(record, header = None):
 
     > string ending with a newline containing the record's entry
 
+    _header_ : `optional [list[str]]`
+
+    > Default `None`, the columns of the file if they differ from `scopusHeader`
+
+    _keptTags_ : `optional [set[str]]`
+
+    > Default `None`, if given only the columns in _keptTags_ are stored
+
+    _droppedTags_ : `optional [set[str]]`
+
+    > Default `None`, must be given with _keptTags_, the non-empty columns that were skipped are added to it
+
     # Returns
 
     `dict`
@@ -218,4 +237,7 @@ def scopusRecordParser(record, header = None):
             tagDict[key] = valString
         else:
             tagDict[key] = currentVal
+    if keptTags is not None:
+        #The columns have to be split to be skipped so they are removed after
+        _projectFieldDict(tagDict, keptTags, droppedTags)
     return tagDict
@@ -5,6 +5,7 @@ import csv
 from .recordScopus import ScopusRecord, scopusHeader
 
 from ..mkExceptions import BadScopusFile
+from ..mkRecord import _keptTagSet
 
 def isScopusFile(infile, checkedLines = 2, maxHeaderDiff = 3):
     """Determines if _infile_ is the path to a Scopus csv file. A file is considerd to be a Scopus file if it has the correct encoding (`utf-8` with BOM (Byte Order Mark)) and within the first _checkedLines_ a line contains the complete header, the list of all header entries in order is found in [`scopus.scopusHeader`](#metaknowledge.scopus).
@@ -43,7 +44,7 @@ def isScopusFile(infile, checkedLines = 2, maxHeaderDiff = 3):
     else:
         return False
 
-def scopusParser(scopusFile):
+def scopusParser(scopusFile, onlyTheseTags = None):
     """Parses a scopus file, _scopusFile_, to extract the individual lines as [ScopusRecords](../classes/ScopusRecord.html#metaknowledge.scopus.ScopusRecord).
 
     A Scopus file is a csv (Comma-separated values) with a complete header, see [`scopus.scopusHeader`](#metaknowledge.scopus) for the entries, and each line after it containing a record's entry. The string valued entries are quoted with double quotes which means double quotes inside them can cause issues, see [scopusRecordParser()](#metaknowledge.scopus.recordScopus.scopusRecordParser) for more information.
@@ -54,6 +55,10 @@ def scopusParser(scopusFile):
 
     > A path to a valid scopus file, use [isScopusFile()](#metaknowledge.scopus.scopusHandlers.isScopusFile) to verify
 
+    _onlyTheseTags_ : `optional [iterable[str]]`
+
+    > Default `None`, if given only the columns with these names are kept, along with the EID, the records list the rest in their `droppedTags`.
+
     # Returns
 
     `set[ScopusRecord]`
@@ -61,6 +66,7 @@ def scopusParser(scopusFile):
     > Records for each of the entries
     """
     #assumes the file is Scopus
+    keptTags = _keptTagSet(onlyTheseTags, ScopusRecord, ['EID'])
     recSet = set()
     error = None
     lineNum = 0
@@ -75,7 +81,7 @@ def scopusParser(scopusFile):
             try:
                 for line, row in enumerate(openfile, start = 2):
                     lineNum = line
-                    recSet.add(ScopusRecord(row, header = header, sFile = scopusFile, sLine = line))
+                    recSet.add(ScopusRecord(row, header = header, sFile = scopusFile, sLine = line, keptTags = keptTags))
             except BadScopusFile as e:
                 if error is None:
                     error = BadScopusFile("The file '{}' becomes unparsable after line: {}, due to the error: {} ".format(scopusFile, lineNum, e))
@@ -0,0 +1,200 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
+"""Helpers for making networks from sparse incidence matrices, the rows are Records and the columns the nodes they contain.
+
+These depend on [numpy](http://www.numpy.org/) and [scipy](https://www.scipy.org/), which are only imported when the helpers are used.
+"""
+import networkx as nx
+
+def _importSparse():
+    try:
+        import numpy
+        import scipy.sparse
+    except ImportError as e:
+        raise ImportError("The matrix engine requires numpy and scipy, they can be installed with 'pip install metaknowledge[matrix]'. The error was: {}".format(e)) from None
+    return numpy, scipy.sparse
+
+def incidenceMatrix(rows, columns = None):
+    """Makes the incidence matrix of _rows_, each row is a list of the nodes it contains, nodes can be repeated
+
+    # Parameters
+
+    _rows_ : `iterable[list[hashable]]`
+
+    > The nodes of each row, in order
+
+    _columns_ : `optional [dict[hashable : int]]`
+
+    > Default `None`, if given the nodes mapped to their columns, nodes not in it are skipped
+
+    # Returns
+
+    `(scipy.sparse.csr_matrix, dict[hashable : int])`
+
+    > The matrix with the number of times each node is in each row and a dict mapping the nodes to their columns, in the order they were first seen, or _columns_ if it was given
+    """
+    numpy, sparse = _importSparse()
+    indices = []
+    indptr = [0]
+    if columns is None:
+        nodeIndices = {}
+        for row in rows:
+            for nd in row:
+                try:
+                    indices.append(nodeIndices[nd])
+                except KeyError:
+                    indices.append(nodeIndices.setdefault(nd, len(nodeIndices)))
+            indptr.append(len(indices))
+    else:
+        nodeIndices = columns
+        for row in rows:
+            indices += [nodeIndices[nd] for nd in row if nd in nodeIndices]
+            indptr.append(len(indices))
+    data = numpy.ones(len(indices), dtype = numpy.int32)
+    A = sparse.csr_matrix((data, numpy.array(indices, dtype = numpy.int32), numpy.array(indptr, dtype = numpy.int64)), shape = (len(indptr) - 1, len(nodeIndices)))
+    #Repeated nodes in a row are added together
+    A.sum_duplicates()
+    return A, nodeIndices
+
+def coOccurrenceMatrix(A, rowWeights = None):
+    """Gives the number of times each pair of nodes (columns) of _A_ occur together, `A.T * A`
+
+    # Parameters
+
+    _A_ : `scipy.sparse.csr_matrix`
+
+    > An incidence matrix from [incidenceMatrix()](#metaknowledge.sparseNetworks.incidenceMatrix)
+
+    _rowWeights_ : `optional [sequence[float]]`
+
+    > Default `None`, if given each row's co-occurrences are multiplied by its weight, `A.T * W * A`
+
+    # Returns
+
+    `scipy.sparse.csr_matrix`
+
+    > The square co-occurrence matrix
+    """
+    if rowWeights is None:
+        return (A.T @ A).tocsr()
+    numpy, sparse = _importSparse()
+    return (A.T @ (sparse.diags(numpy.asarray(rowWeights, dtype = numpy.float64)) @ A)).tocsr()
+
+def coOccurrenceGraph(A, nodeTuples, weighted, rowWeights = None):
+    """Makes the undirected co-occurrence graph of the incidence matrix _A_ all at once.
+
+    The edges match those made by adding the rows one at a time: each pair of entries in a row is an edge, so a node that is repeated in a row gets a self loop.
+
+    # Parameters
+
+    _A_ : `scipy.sparse.csr_matrix`
+
+    > An incidence matrix from [incidenceMatrix()](#metaknowledge.sparseNetworks.incidenceMatrix)
+
+    _nodeTuples_ : `list[(hashable, dict)]`
+
+    > The nodes and their attributes, in column order
+
+    _weighted_ : `bool`
+
+    > If `True` the edges will have the attribute `'weight'`, the number of co-occurrences
+
+    _rowWeights_ : `optional [sequence[float]]`
+
+    > Default `None`, if given the pairs of each row add its weight to their edges instead of 1
+
+    # Returns
+
+    `networkx Graph`
+
+    > The co-occurrence network
+    """
+    numpy, sparse = _importSparse()
+    grph = nx.Graph()
+    grph.add_nodes_from(nodeTuples)
+    nodeIDs = [nd for nd, dat in nodeTuples]
+    upper = sparse.triu(coOccurrenceMatrix(A, rowWeights = rowWeights), k = 1, format = 'coo')
+    #A node repeated n times in a row is paired with itself n(n - 1) / 2 times
+    repeats = A.copy()
+    repeats.data = repeats.data * (repeats.data - 1) // 2
+    if rowWeights is not None:
+        repeats = sparse.diags(numpy.asarray(rowWeights, dtype = numpy.float64)) @ repeats
+    loops = numpy.asarray(repeats.sum(axis = 0)).ravel()
+    loopIndices = numpy.flatnonzero(loops)
+    rows = upper.row.tolist() + loopIndices.tolist()
+    cols = upper.col.tolist() + loopIndices.tolist()
+    if weighted:
+        weights = upper.data.tolist() + loops[loopIndices].tolist()
+        grph.add_weighted_edges_from(zip([nodeIDs[i] for i in rows], [nodeIDs[i] for i in cols], weights))
+    else:
+        grph.add_edges_from(zip([nodeIDs[i] for i in rows], [nodeIDs[i] for i in cols]))
+    return grph
+
+def rowOverlaps(A, minShared = 1, blockSize = 1024):
+    """Gives the upper triangle of `A * A.T`, the number of columns each pair of rows of _A_ share when _A_ is binary. The product is made _blockSize_ rows at a time and the entries below _minShared_ are dropped from each block as it is made, so the full product is never stored.
+
+    # Parameters
+
+    _A_ : `scipy.sparse.csr_matrix`
+
+    > An incidence matrix
+
+    _minShared_ : `optional [int]`
+
+    > default `1`, the smallest overlap kept
+
+    _blockSize_ : `optional [int]`
+
+    > default `1024`, the number of rows multiplied at once
+
+    # Returns
+
+    `scipy.sparse.coo_matrix`
+
+    > The overlaps of the rows, only entries above the diagonal are given
+    """
+    numpy, sparse = _importSparse()
+    AT = A.T.tocsr()
+    rows = []
+    cols = []
+    data = []
+    for start in range(0, A.shape[0], blockSize):
+        block = (A[start:start + blockSize] @ AT).tocoo()
+        keep = (block.col > block.row + start) & (block.data >= minShared)
+        rows.append(block.row[keep] + start)
+        cols.append(block.col[keep])
+        data.append(block.data[keep])
+    if rows:
+        rows, cols, data = numpy.concatenate(rows), numpy.concatenate(cols), numpy.concatenate(data)
+    return sparse.coo_matrix((data, (rows, cols)), shape = (A.shape[0], A.shape[0]), dtype = A.dtype)
+
+def normalizeOverlaps(U, rowTotals, normalize):
+    """Normalizes the overlaps _U_ from [rowOverlaps()](#metaknowledge.sparseNetworks.rowOverlaps) by the sizes of the rows
+
+    # Parameters
+
+    _U_ : `scipy.sparse.coo_matrix`
+
+    > The overlaps
+
+    _rowTotals_ : `numpy.ndarray`
+
+    > The number of columns in each row
+
+    _normalize_ : `str`
+
+    > `"salton"` for the Salton (cosine) index, the overlap divided by the geometric mean of the row sizes, or `"jaccard"` for the Jaccard index, the overlap divided by the size of the union of the rows
+
+    # Returns
+
+    `numpy.ndarray`
+
+    > The normalized values, in the order of `U.data`
+    """
+    numpy, sparse = _importSparse()
+    shared = U.data.astype(numpy.float64)
+    if normalize == "salton":
+        return shared / numpy.sqrt(rowTotals[U.row].astype(numpy.float64) * rowTotals[U.col])
+    elif normalize == "jaccard":
+        return shared / (rowTotals[U.row] + rowTotals[U.col] - shared)
+    else:
+        raise ValueError("{} is not a known normalization, it must be 'salton' or 'jaccard'.".format(normalize))
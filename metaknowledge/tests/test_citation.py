@@ -1,6 +1,10 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
 import unittest
+import pickle
+import glob
+import os
 import metaknowledge
+import metaknowledge.journalAbbreviations.backend as j9Backend
 
 class TestCitation(unittest.TestCase):
     def setUp(self):
@@ -63,3 +67,79 @@ class TestCitation(unittest.TestCase):
         self.assertTrue(c.bad)
         self.assertEqual(c.ID(), '1, 2')
         self.assertEqual(str(c.error), "The citation did not fully match the expected pattern")
+
+    def test_citation_compact(self):
+        self.assertFalse(hasattr(self.Cite, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.Cite.notAField = 1
+        c = metaknowledge.Citation("John D., 2015, TOPICS IN COGNITIVE SCIENCE, V2, P7")
+        self.assertIs(c.journal, self.Cite.journal)
+        self.assertIs(c.ID(), self.Cite.ID())
+        cPickled = pickle.loads(pickle.dumps(self.Cite))
+        self.assertEqual(cPickled, self.Cite)
+        self.assertEqual(hash(cPickled), hash(self.Cite))
+        self.assertEqual(cPickled.allButDOI(), self.Cite.allButDOI())
+        self.assertEqual(cPickled.Extra(), self.Cite.Extra())
+        self.assertFalse(hasattr(metaknowledge.Citation("Nunez R."), 'extraAuthors'))
+
+    def test_citation_cache(self):
+        metaknowledge.clearCitationCache()
+        cites = ["John D., 2015, TOPICS IN COGNITIVE SCIENCE, V1, P1", "Nunez R., 1998, MATH COGNITION, V4, P85", "Nunez R."]
+        made = [metaknowledge.citationFromString(c) for c in cites + cites]
+        for i in range(len(cites)):
+            self.assertIs(made[i], made[i + len(cites)])
+            self.assertEqual(made[i], metaknowledge.Citation(cites[i]))
+        self.assertEqual(metaknowledge.citationCacheStats(), {'hits' : 3, 'misses' : 3, 'size' : 3, 'maxSize' : 100000})
+        try:
+            metaknowledge.setCitationCacheSize(2)
+            self.assertEqual(metaknowledge.citationCacheStats()['size'], 2)
+            #The least recently used one is dropped
+            self.assertIsNot(metaknowledge.citationFromString(cites[0]), made[0])
+            self.assertIs(metaknowledge.citationFromString(cites[2]), made[2])
+            metaknowledge.setCitationCacheSize(0)
+            self.assertEqual(metaknowledge.citationCacheStats()['size'], 0)
+            self.assertIsNot(metaknowledge.citationFromString(cites[2]), metaknowledge.citationFromString(cites[2]))
+            with self.assertRaises(ValueError):
+                metaknowledge.setCitationCacheSize(-1)
+        finally:
+            metaknowledge.setCitationCacheSize(100000)
+        R = max(metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi"), key = lambda x : len(x.get('CR', raw = True, default = [])))
+        metaknowledge.clearCitationCache()
+        self.assertIs(R.get('CR')[0], metaknowledge.citationFromString(R.get('CR', raw = True)[0]))
+        self.assertEqual(metaknowledge.citationCacheStats()['misses'], len(set(R.get('CR', raw = True))))
+
+    def test_j9Lookup(self):
+        try:
+            j9Backend.addToDB({'TOPICS IN COGNITIVE SCIENCE' : 'TOPICS IN COGNITIVE SCIENCE', 'J COGN' : 'JOURNAL OF COGNITION|COGNITION', 'EXCLUDED J' : 'EXCLUDED'}, dbname = 'testJ9Lookup')
+            j9Backend.excludeFromDB('EXCLUDED J', dbname = 'testJ9LookupManual')
+            j9Backend.addToDB('MANUAL J', dbname = 'testJ9LookupManual')
+            lookup = j9Backend.getj9Lookup(dbname = 'testJ9Lookup', manualDB = 'testJ9LookupManual')
+            self.assertTrue(os.path.isfile(lookup.compiledName))
+            self.assertEqual(dict(lookup), j9Backend.getj9dict(dbname = 'testJ9Lookup', manualDB = 'testJ9LookupManual'))
+            self.assertEqual(len(lookup), 4)
+            self.assertEqual(lookup['J COGN'], ['JOURNAL OF COGNITION', 'COGNITION'])
+            self.assertEqual(lookup['EXCLUDED J'], [''])
+            self.assertNotIn('J COG', lookup)
+            self.assertIsNone(lookup.get('ZZZ'))
+            lookup.update({'ZZZ' : 'Z|ZZ'})
+            self.assertEqual(lookup['ZZZ'], ['Z', 'ZZ'])
+            self.assertEqual(dict(j9Backend.getj9Lookup(dbname = 'testJ9Lookup', returnDict = 'WOS'))['EXCLUDED J'], ['EXCLUDED'])
+            lookup.close()
+        finally:
+            for fName in glob.glob(os.path.join(os.path.dirname(j9Backend.__file__), 'testJ9Lookup*')):
+                os.remove(fName)
+
+    def test_classifyJournals(self):
+        oldDict = metaknowledge.citation.abbrevDict
+        try:
+            metaknowledge.citation.abbrevDict = j9Backend.J9Lookup(overlay = {'TOPICS IN COGNITIVE SCIENCE' : ['TOPICS IN COGNITIVE SCIENCE'], 'EXCLUDED J' : ['']})
+            cites = [self.Cite, metaknowledge.Citation("John D., 2015, EXCLUDED J, V1"), metaknowledge.Citation("John D., 2015, BOOK"), metaknowledge.Citation("John D., 2015"), self.Cite]
+            known = {}
+            self.assertEqual(metaknowledge.classifyJournals(cites, known = known), [True, False, False, False, True])
+            self.assertEqual(known, {'TOPICS IN COGNITIVE SCIENCE' : True, 'EXCLUDED J' : False, 'BOOK' : False, None : False})
+            self.assertEqual(metaknowledge.classifyJournals(['TOPICS IN COGNITIVE SCIENCE', '', None]), [True, False, False])
+            self.assertEqual([bool(c.isJournal()) for c in cites], metaknowledge.classifyJournals(cites))
+            self.assertEqual(metaknowledge.filterNonJournals(cites), [self.Cite, self.Cite])
+            self.assertEqual(metaknowledge.filterNonJournals(cites, invert = True), cites[1:4])
+        finally:
+            metaknowledge.citation.abbrevDict = oldDict
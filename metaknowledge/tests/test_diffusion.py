@@ -1,7 +1,16 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2015
 import unittest
+import networkx as nx
 import metaknowledge
 
+def makeRecord(wosNum, authors, year, citations = ()):
+    #Used by test_matrixGraph, each Record's Citations differ by their page, its WOS number
+    lines = ['PT J', 'AU ' + authors[0]] + ['   ' + a for a in authors[1:]]
+    lines += ['TI Paper {}'.format(wosNum), 'SO TEST', 'J9 J TEST', 'PY {}'.format(year), 'VL 1', 'BP {}'.format(wosNum)]
+    if citations:
+        lines += ['CR ' + citations[0]] + ['   ' + c for c in citations[1:]]
+    lines += ['UT WOS:{}'.format(wosNum), 'ER']
+    return metaknowledge.WOSRecord('\n'.join(lines))
 
 class TestDiffusion(unittest.TestCase):
     def setUp(self):
@@ -46,3 +55,53 @@ class TestDiffusion(unittest.TestCase):
         self.assertNotEqual(dyear["TargetCount"], dwc["SourceCount"])
         self.assertEqual(len([c for c in dyear["TargetCount"] if c > 1]), 9)
         self.assertTrue(1979 in dyear['year'])
+
+    def test_matrixEngine(self):
+        for kwargs in [{}, {'sourceType' : "WC"}, {'extraValue' : 'year'}, {'compareCounts' : True}]:
+            self.assertEqual(metaknowledge.diffusionCount(self.RC, self.RC, **kwargs), metaknowledge.diffusionCount(self.RC, self.RC, engine = 'matrix', **kwargs))
+        M, targets, sources = metaknowledge.diffusionMatrix(self.RC, self.RC, sourceType = "WC", targetType = "PY", useAllAuthors = True)
+        self.assertEqual(M.shape, (len(targets), len(sources)))
+        self.assertEqual(M.sum(), sum(metaknowledge.diffusionCount(self.RC, self.RC, sourceType = "WC").values()))
+        with self.assertRaises(RuntimeError):
+            metaknowledge.diffusionCount(self.RC, self.RC, engine = 'igraph')
+
+    def test_matrixGraph(self):
+        R1 = makeRecord(1, ['Doe, J', 'Roe, R'], 2000)
+        R2 = makeRecord(2, ['Poe, P'], 2001)
+        #T2 cites R1 by its second author too, the graph only matches first authors
+        T1 = makeRecord(3, ['Low, L'], 2010, ['Doe J, 2000, J TEST, V1, P1', 'Poe P, 2001, J TEST, V1, P2'])
+        T2 = makeRecord(4, ['Moe, M'], 2010, ['Doe J, 2000, J TEST, V1, P1', 'Low L, 2010, J TEST, V1, P3', 'Roe R, 2000, J TEST, V1, P1'])
+        source = metaknowledge.RecordCollection({R1, R2, T1}, name = 'source')
+        target = metaknowledge.RecordCollection({T1, T2}, name = 'target')
+        G = metaknowledge.diffusionGraph(source, target, sourceType = 'UT', targetType = 'UT', engine = 'matrix')
+        self.assertIsInstance(G, nx.DiGraph)
+        self.assertEqual(dict(G.nodes(data = True)), {
+            'WOS:1' : {'source' : True, 'target' : False},
+            'WOS:2' : {'source' : True, 'target' : False},
+            'WOS:3' : {'source' : True, 'target' : True},
+            'WOS:4' : {'source' : False, 'target' : True},
+            })
+        self.assertEqual({(u, v) : d for u, v, d in G.edges(data = True)}, {
+            ('WOS:1', 'WOS:3') : {'weight' : 1},
+            ('WOS:2', 'WOS:3') : {'weight' : 1},
+            ('WOS:1', 'WOS:4') : {'weight' : 1},
+            ('WOS:3', 'WOS:4') : {'weight' : 1},
+            })
+        Gyear = metaknowledge.diffusionGraph(source, target, sourceType = 'UT', targetType = 'year', engine = 'matrix')
+        self.assertEqual(dict(Gyear.nodes(data = True)), {
+            'WOS:1' : {'source' : True, 'target' : False},
+            'WOS:2' : {'source' : True, 'target' : False},
+            'WOS:3' : {'source' : True, 'target' : False},
+            2010 : {'source' : False, 'target' : True},
+            })
+        self.assertEqual({(u, v) : d for u, v, d in Gyear.edges(data = True)}, {
+            ('WOS:1', 2010) : {'weight' : 2},
+            ('WOS:2', 2010) : {'weight' : 1},
+            ('WOS:3', 2010) : {'weight' : 1},
+            })
+        #diffusionMatrix() matches all the authors by default, like diffusionCount()
+        M, targetNodes, sourceNodes = metaknowledge.diffusionMatrix(source, target, sourceType = 'UT', targetType = 'UT')
+        self.assertEqual(M[targetNodes.index('WOS:4'), sourceNodes.index('WOS:1')], 2)
+        M, targetNodes, sourceNodes = metaknowledge.diffusionMatrix(source, target, sourceType = 'UT', targetType = 'UT', useAllAuthors = False)
+        self.assertEqual(M[targetNodes.index('WOS:4'), sourceNodes.index('WOS:1')], 1)
+        self.assertEqual(metaknowledge.diffusionCount(source, target, sourceType = 'UT', engine = 'matrix'), {'WOS:1' : 3, 'WOS:2' : 1, 'WOS:3' : 1})
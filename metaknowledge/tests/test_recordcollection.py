@@ -3,11 +3,35 @@ import unittest
 import metaknowledge
 import metaknowledge.WOS
 import os
+import shutil
+import tempfile
 import filecmp
+import operator
 import networkx as nx
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+try:
+    import pandas
+except ImportError:
+    pandas = None
 
 disableJournChecking = True
 
+def countCitations(records):
+    #Used by test_freeze, the worker processes need to be able to import it
+    return sum((len(R.get('citations', [])) for R in records))
+
+def coAuthorNetwork(records):
+    #Used by test_mapReduce
+    return records.networkCoAuthor()
+
+def makeDict(records):
+    #Used by test_mapReduce
+    return records.makeDict(genderCounts = False)
+
 class TestRecordCollection(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -28,6 +52,14 @@ class TestRecordCollection(unittest.TestCase):
         RC = metaknowledge.RecordCollection("metaknowledge/tests/")
         self.assertEqual(len(RC), 1032)
 
+    def test_parallelRead(self):
+        RC = metaknowledge.RecordCollection("metaknowledge/tests/")
+        RCpar = metaknowledge.RecordCollection("metaknowledge/tests/", workers = 2)
+        self.assertEqual(RC, RCpar)
+        self.assertEqual(RC.bad, RCpar.bad)
+        self.assertEqual(set(RC.errors.keys()), set(RCpar.errors.keys()))
+        self.assertEqual(RC._collectedTypes, RCpar._collectedTypes)
+
     def test_caching(self):
         RC = metaknowledge.RecordCollection("metaknowledge/tests/", cached = True, name = 'testingCache', extension = 'testFile.isi')
         self.assertTrue(os.path.isfile("metaknowledge/tests/tests.[testFile.isi].mkRecordDirCache"))
@@ -39,6 +71,74 @@ class TestRecordCollection(unittest.TestCase):
         self.assertEqual(RC, RC2)
         os.remove("metaknowledge/tests/tests.[testFile.isi].mkRecordDirCache")
 
+    def test_cachePerFile(self):
+        with tempfile.TemporaryDirectory() as tmpDir:
+            for fName in ["testFile.isi", "OnePaper.isi", "medline_test.medline", "scopus_testing.csv.scopus"]:
+                shutil.copy(os.path.join("metaknowledge/tests", fName), tmpDir)
+            RC = metaknowledge.RecordCollection(tmpDir, cached = True)
+            cacheName = os.path.join(tmpDir, "{}.[].mkRecordDirCache".format(os.path.basename(tmpDir)))
+            with open(cacheName, 'rb') as f:
+                self.assertEqual(f.read(8), b'mkRCache')
+            RCcached = metaknowledge.RecordCollection(tmpDir, cached = True)
+            self.assertEqual(RC, RCcached)
+            self.assertEqual(RC.errors.keys(), RCcached.errors.keys())
+            self.assertEqual({R._sourceFile for R in RC}, {R._sourceFile for R in RCcached})
+            flist = sorted(os.path.join(os.path.realpath(tmpDir), f) for f in os.listdir(tmpDir) if not f.endswith('mkRecordDirCache'))
+            dirCache = metaknowledge.mkCache.RecordDirCache(cacheName, '')
+            self.assertEqual(dirCache.staleFiles(flist), [])
+            dirCache.close()
+            #Changing only the modification time does not invalidate a file
+            os.utime(flist[0], (0, 0))
+            onePaper = [f for f in flist if f.endswith("OnePaper.isi")][0]
+            with open("metaknowledge/tests/TwoPaper.isi") as fIn, open(onePaper, 'w') as fOut:
+                fOut.write(fIn.read())
+            dirCache = metaknowledge.mkCache.RecordDirCache(cacheName, '')
+            self.assertEqual(dirCache.staleFiles(flist), [onePaper])
+            dirCache.close()
+            medlineFile = [f for f in flist if f.endswith("medline_test.medline")][0]
+            os.remove(medlineFile)
+            dirCache = metaknowledge.mkCache.RecordDirCache(cacheName, '')
+            oldEntries = {f : dict(e) for f, e in dirCache.files.items()}
+            dirCache.close()
+            RCchanged = metaknowledge.RecordCollection(tmpDir, cached = True)
+            dirCache = metaknowledge.mkCache.RecordDirCache(cacheName, '')
+            #Only the changed file's segment was written, the others were left in place
+            self.assertNotIn(medlineFile, dirCache.files)
+            self.assertGreater(dirCache.files[onePaper]['offset'], oldEntries[onePaper]['offset'])
+            for fName, entry in dirCache.files.items():
+                if fName != onePaper:
+                    self.assertEqual(entry['offset'], oldEntries[fName]['offset'])
+            dirCache.close()
+            RCexpected = metaknowledge.RecordCollection(tmpDir)
+            self.assertEqual(RCchanged, RCexpected)
+            self.assertEqual(RCchanged, metaknowledge.RecordCollection(tmpDir, cached = True))
+
+    def test_onlyTheseTags(self):
+        with tempfile.TemporaryDirectory() as tmpDir:
+            for fName in ["testFile.isi", "medline_test.medline", "scopus_testing.csv.scopus", "ProQuest_TestFile.testtxt"]:
+                shutil.copy(os.path.join("metaknowledge/tests", fName), tmpDir)
+            RCfull = metaknowledge.RecordCollection(tmpDir)
+            RC = metaknowledge.RecordCollection(tmpDir, cached = True, onlyTheseTags = ['title', 'TI', 'Title', 'PY'])
+            self.assertEqual(len(RC), len(RCfull))
+            fullDict = {R.id : R for R in RCfull if not R.bad}
+            for R in RC:
+                if R.bad:
+                    continue
+                self.assertLessEqual(len(R._fieldDict), 4)
+                self.assertEqual(R.get('title'), fullDict[R.id].get('title'))
+                self.assertEqual(set(R._fieldDict) | R.droppedTags, set(fullDict[R.id]._fieldDict))
+            with self.assertRaises(metaknowledge.RecordsNotCompatible):
+                RC.writeFile(os.path.join(tmpDir, "projected.txt"))
+            self.assertFalse(os.path.isfile(os.path.join(tmpDir, "projected.txt")))
+            RCcached = metaknowledge.RecordCollection(tmpDir, cached = True, onlyTheseTags = ['title', 'TI', 'Title', 'PY'])
+            self.assertEqual({R.id : R.droppedTags for R in RC if not R.bad}, {R.id : R.droppedTags for R in RCcached if not R.bad})
+            #A cache of different tags is not used
+            RCother = metaknowledge.RecordCollection(tmpDir, cached = True, onlyTheseTags = ['AU'])
+            for R in RCother:
+                if isinstance(R, metaknowledge.WOSRecord) and not R.bad:
+                    self.assertIn('AU', R._fieldDict)
+                    self.assertNotIn('TI', R._fieldDict)
+
     def test_bad(self):
         self.assertTrue(metaknowledge.RecordCollection('metaknowledge/tests/badFile.isi').bad)
         with self.assertRaises(metaknowledge.mkExceptions.RCTypeError):
@@ -153,6 +253,39 @@ class TestRecordCollection(unittest.TestCase):
         RC6 = RC5 & self.RCbad
         self.assertNotEqual(self.RC, RC6)
 
+    def test_opsByID(self):
+        RCother = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+        RChalf = self.RC.yearSplit(1970, 1979)
+        RChalf |= self.RCbad
+        RCotherHalf = RCother.yearSplit(1975, 3000)
+        for indexed in [False, True]:
+            RC1 = RChalf.copy()
+            RC2 = RCotherHalf.copy()
+            if indexed:
+                RC1.createIDIndex()
+                RC2.createIDIndex()
+            self.assertEqual(RC1.unionByID(RC2), RChalf | RCotherHalf)
+            self.assertEqual(RC1.intersectionByID(RC2), RChalf & RCotherHalf)
+            self.assertEqual(RC1.differenceByID(RC2), RChalf - RCotherHalf)
+            self.assertEqual(RC1.symmetricDifferenceByID(RC2), RChalf ^ RCotherHalf)
+            self.assertTrue(RC1.unionByID(RC2).bad)
+            self.assertEqual(len(RChalf), len(RC1))
+            RCunion = RC1.unionByID(RC2, inPlace = True)
+            self.assertIs(RCunion, RC1)
+            self.assertEqual(RC1, RChalf | RCotherHalf)
+            self.assertEqual(RC1._getIndex('ids') is not None, indexed)
+            RC1.differenceByID(RC2, inPlace = True)
+            self.assertEqual(RC1, RChalf - RCotherHalf)
+            R = RChalf.yearSplit(1970, 1974).peek()
+            self.assertIs(RC1.getID(R.id), R)
+            self.assertTrue(RC1.containsID(R.id))
+            RC1.removeID(R.id)
+            self.assertFalse(RC1.containsID(R.id))
+            with self.assertRaises(KeyError):
+                RC1.removeID(R.id)
+        with self.assertRaises(metaknowledge.CollectionTypeError):
+            self.RC.unionByID(metaknowledge.GrantCollection([]))
+
     def test_opErrors(self):
         with self.assertRaises(TypeError):
             self.RC <= 1
@@ -311,6 +444,34 @@ class TestRecordCollection(unittest.TestCase):
         stats = self.RC.genderStats(asFractions = True)
         self.assertEqual(stats['Male'], 0.08333333333333333)
 
+    def test_genderCounts(self):
+        nameGender = metaknowledge.genders.nameGender
+        oldPath = nameGender.targetFilePath
+        oldMapping = nameGender.mappingDict
+        with tempfile.TemporaryDirectory() as tmpDir:
+            try:
+                nameGender.targetFilePath = os.path.join(tmpDir, 'namesData.csv')
+                nameGender.mappingDict = None
+                with open(nameGender.targetFilePath, 'w') as f:
+                    f.write(','.join(nameGender.csvFields) + '\n')
+                    for name, gender in [('s', 'Male'), ('F', 'Female'), ('h', 'Male'), ('Ocd', 'Unknown')]:
+                        f.write('{},1,1,1,{},1,1,1,1\n'.format(name, gender))
+                mapping = nameGender.getMapping()
+                self.assertTrue(os.path.isfile(nameGender.targetFilePath + nameGender.compiledExtension))
+                self.assertEqual(mapping, nameGender._readCSVMapping())
+                self.assertEqual(mapping, {'S' : 'Male', 'F' : 'Female', 'H' : 'Male', 'Ocd' : 'Unknown'})
+                counts = self.RC.genderCounts()
+                self.assertEqual(len(counts), len(self.RC))
+                for R in self.RC:
+                    self.assertEqual(counts[R], R.authGenders(_countsTuple = True))
+                self.assertEqual(self.RC.genderStats(), {'Male' : 15, 'Female' : 6, 'Unknown' : 51})
+                dictGenders = self.RC.makeDict(onlyTheseTags = ['UT'])
+                self.assertEqual(sum(dictGenders['num-Female']), 6)
+                self.assertEqual(sorted(dictGenders['num-Male']), sorted((c[0] for c in counts.values())))
+            finally:
+                nameGender.targetFilePath = oldPath
+                nameGender.mappingDict = oldMapping
+
     def test_getCitations(self):
         cites = self.RC.getCitations()
         self.assertIn('LAUE MV, 1920, RELATIVITATSTHEORIE, V1, P227', cites['citeString'])
@@ -362,6 +523,24 @@ class TestRecordCollection(unittest.TestCase):
         self.assertEqual(metaknowledge.graphStats(Gexplode, sentenceString = True), "The graph has 73 nodes, 366 edges, 0 isolates, 5 self loops, a density of 0.140411 and a transitivity of 0.523179")
         self.assertIn('AUDOIN C, 1976, J PHYS E SCI INSTRUM', Gcr.node['Huard S, 1979, CAN J PHYS']['citations'])
 
+    def test_coCiteMatrix(self):
+        for kwargs in [{}, {'nodeType' : 'author', 'weighted' : False}, {'nodeType' : 'year', 'fullInfo' : True, 'count' : False}, {'nodeType' : 'original', 'coreOnly' : True}, {'keyWords' : 'a', 'expandedCore' : True}]:
+            G = self.RC.networkCoCitation(**kwargs)
+            Gmatrix = self.RC.networkCoCitation(engine = 'matrix', **kwargs)
+            self.assertEqual(dict(G.nodes(data = True)), dict(Gmatrix.nodes(data = True)))
+            self.assertEqual(len(G.edges()), len(Gmatrix.edges()))
+            for n1, n2, dat in G.edges(data = True):
+                self.assertEqual(Gmatrix.edges[n1, n2], dat)
+        C, nodeIDs = self.RC.coCitationMatrix()
+        G = self.RC.networkCoCitation()
+        self.assertEqual(C.shape, (len(G), len(G)))
+        self.assertEqual(set(nodeIDs), set(G.nodes()))
+        n1, n2, dat = next(iter((e for e in G.edges(data = True) if e[0] != e[1])))
+        self.assertEqual(C[nodeIDs.index(n1), nodeIDs.index(n2)], dat['weight'])
+        self.assertEqual(C[nodeIDs.index(n2), nodeIDs.index(n1)], dat['weight'])
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.networkCoCitation(engine = 'numpy')
+
     def test_coAuth(self):
         Gdefault = self.RC.networkCoAuthor()
         if not disableJournChecking:
@@ -372,6 +551,26 @@ class TestRecordCollection(unittest.TestCase):
         if not disableJournChecking:
             self.assertEqual(metaknowledge.graphStats(Gdetailed, sentenceString = True), 'The graph has 45 nodes, 46 edges, 9 isolates, 0 self loops, a density of 0.0464646 and a transitivity of 0.822581')
 
+    def test_coAuthMatrix(self):
+        for kwargs in [{}, {'weighted' : False, 'count' : False}, {'detailedInfo' : True, 'citeProfile' : True}, {'maxAuthors' : 3}, {'maxAuthors' : 3, 'maxAuthorsMode' : 'truncate'}, {'maxAuthors' : 2, 'maxAuthorsMode' : 'fractional'}]:
+            G = self.RC.networkCoAuthor(**kwargs)
+            Gmatrix = self.RC.networkCoAuthor(engine = 'matrix', **kwargs)
+            self.assertEqual(dict(G.nodes(data = True)), dict(Gmatrix.nodes(data = True)))
+            self.assertEqual(len(G.edges()), len(Gmatrix.edges()))
+            for n1, n2, dat in G.edges(data = True):
+                self.assertEqual(Gmatrix.edges[n1, n2].keys(), dat.keys())
+                if 'weight' in dat:
+                    self.assertAlmostEqual(Gmatrix.edges[n1, n2]['weight'], dat['weight'])
+        Gdrop = self.RC.networkCoAuthor(maxAuthors = 3)
+        self.assertEqual(Gdrop.size(weight = 'weight'), sum((len(R.get('authorsFull', [])) * (len(R.get('authorsFull', [])) - 1) // 2 for R in self.RC if len(R.get('authorsFull', [])) <= 3)))
+        #Fractional counting gives each paper a total weight of half its number of authors
+        Gfrac = self.RC.networkCoAuthor(maxAuthors = 1, maxAuthorsMode = 'fractional', engine = 'matrix')
+        self.assertAlmostEqual(Gfrac.size(weight = 'weight'), sum((len(R.get('authorsFull', [])) / 2 for R in self.RC if len(R.get('authorsFull', [])) > 1)))
+        Gprofile = self.RC.networkCoAuthor(citeProfile = True)
+        self.assertGreater(len(set((dat['citeProfileCites'] for n, dat in Gprofile.nodes(data = True)))), 1)
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.networkCoAuthor(maxAuthors = 3, maxAuthorsMode = 'cap')
+
     def test_cite(self):
         Gdefault = self.RC.networkCitation(fullInfo = True, count = False, dropAnon = True)
         Ganon = self.RC.networkCitation(dropAnon = False)
@@ -405,6 +604,30 @@ class TestRecordCollection(unittest.TestCase):
         G = self.RC.networkBibCoupling()
         self.assertEqual(metaknowledge.graphStats(G, sentenceString = True), 'The graph has 32 nodes, 304 edges, 1 isolates, 0 self loops, a density of 0.612903 and a transitivity of 0.836511')
 
+    def test_bibCouplingMatrix(self):
+        G = self.RC.networkBibCoupling()
+        Gmatrix = self.RC.networkBibCoupling(engine = 'matrix')
+        self.assertEqual(dict(G.nodes(data = True)), dict(Gmatrix.nodes(data = True)))
+        self.assertEqual(len(G.edges()), len(Gmatrix.edges()))
+        for n1, n2, dat in G.edges(data = True):
+            self.assertEqual(Gmatrix.edges[n1, n2], dat)
+        Gmin = self.RC.networkBibCoupling(engine = 'matrix', minShared = 3)
+        self.assertEqual(len(Gmin.edges()), len([e for e in G.edges(data = True) if e[2]['weight'] >= 3]))
+        Gsalton = self.RC.networkBibCoupling(engine = 'matrix', normalize = 'salton')
+        Gjaccard = self.RC.networkBibCoupling(engine = 'matrix', normalize = 'jaccard')
+        C, nodeIDs = self.RC.bibCouplingMatrix(normalize = 'jaccard')
+        refCounts = {R.createCitation().ID() : len(set(c.ID() for c in R.get('citations'))) for R in self.RC if R.get('citations')}
+        for n1, n2, dat in G.edges(data = True):
+            self.assertEqual(Gsalton.edges[n1, n2]['shared'], dat['weight'])
+            self.assertAlmostEqual(Gsalton.edges[n1, n2]['weight'], dat['weight'] / (refCounts[n1] * refCounts[n2]) ** .5)
+            self.assertAlmostEqual(Gjaccard.edges[n1, n2]['weight'], dat['weight'] / (refCounts[n1] + refCounts[n2] - dat['weight']))
+            self.assertAlmostEqual(C[nodeIDs.index(n1), nodeIDs.index(n2)], Gjaccard.edges[n1, n2]['weight'])
+        self.assertEqual(C.nnz, 2 * len(G.edges()))
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.networkBibCoupling(minShared = 2)
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.networkBibCoupling(engine = 'matrix', normalize = 'cosine')
+
     def test_coOccurnce(self):
         self.assertEqual(sum(self.RC.cooccurrenceCounts('TI', *tuple(self.RC.tags()))['Longitudinal and transverse effects of nonspecular reflection'].values()), 104)
 
@@ -491,6 +714,251 @@ class TestRecordCollection(unittest.TestCase):
         RCnocite = metaknowledge.RecordCollection('metaknowledge/tests/OnePaperNoCites.isi')
         self.assertEqual(len(RCnocite.citeFilter('')), 0)
 
+    def test_citationIndex(self):
+        RCindexed = self.RC.copy()
+        RCindexed.createCitationIndex()
+        queries = [('',), ('', 'anonymous'), (1970, 'year'), ('meller', 'author'), ('PHYS', 'journal'), ('V1', 'V'), ('', 'bad')]
+        for args in queries:
+            self.assertEqual(self.RC.citeFilter(*args), RCindexed.citeFilter(*args))
+            self.assertEqual(self.RC.citeFilter(*args, reverse = True), RCindexed.citeFilter(*args, reverse = True))
+        for keyType in ['citation', 'year', 'author']:
+            self.assertEqual(self.RC.localCiteStats(keyType = keyType), RCindexed.localCiteStats(keyType = keyType))
+        C = metaknowledge.Citation("COSTADEB.O, 1974, LETT NUOVO CIMENTO, V10, P852")
+        self.assertEqual(self.RC.localCitesOf(C), RCindexed.localCitesOf(C))
+        R = RCindexed.localCitesOf(C).peek()
+        RCindexed.discard(R)
+        self.assertEqual(len(RCindexed.localCitesOf(C)), len(self.RC.localCitesOf(C)) - 1)
+        self.assertNotIn(R, RCindexed.citeFilter(''))
+        RCindexed.add(R)
+        self.assertEqual(self.RC.localCitesOf(C), RCindexed.localCitesOf(C))
+        RCindexed -= self.RC
+        self.assertEqual(len(RCindexed.localCitesOf(C)), 0)
+        self.assertEqual(RCindexed.localCiteStats(), {})
+        RCindexed |= self.RC
+        self.assertEqual(self.RC.localCiteStats(), RCindexed.localCiteStats())
+        RCindexed.dropCitationIndex()
+        self.assertIsNone(RCindexed._getIndex('citations'))
+        self.assertEqual(self.RC.localCitesOf(C), RCindexed.localCitesOf(C))
+
+    def test_citationIndexFastCites(self):
+        #The cached Citations have their strings so the cache is emptied to make new ones
+        metaknowledge.citation._citationCache.clear()
+        metaknowledge.FAST_CITES = True
+        try:
+            RCfast = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+            RCindexed = RCfast.copy()
+            RCindexed.createCitationIndex()
+            self.assertFalse(hasattr(RCindexed.peek().get('citations')[0], 'original'))
+            for keyType in ['citation', 'year', 'author']:
+                self.assertEqual(RCfast.localCiteStats(keyType = keyType), RCindexed.localCiteStats(keyType = keyType))
+            C = metaknowledge.Citation("COSTADEB.O, 1974, LETT NUOVO CIMENTO, V10, P852")
+            self.assertEqual(RCfast.localCitesOf(C), RCindexed.localCitesOf(C))
+            R = RCindexed.localCitesOf(C).peek()
+            RCindexed.discard(R)
+            self.assertEqual(len(RCindexed.localCitesOf(C)), len(RCfast.localCitesOf(C)) - 1)
+        finally:
+            metaknowledge.FAST_CITES = False
+            metaknowledge.citation._citationCache.clear()
+
+    def test_tagIndex(self):
+        RCindexed = self.RC.copy()
+        RCindexed.createIndex('year')
+        RCindexed.createIndex('authorsFull')
+        self.assertIs(RCindexed._tagIndex('PY'), RCindexed._tagIndex('year'))
+        self.assertEqual(self.RC.yearSplit(1970, 1979), RCindexed.yearSplit(1970, 1979))
+        self.assertEqual(self.RC.rankedSeries('authorsFull'), RCindexed.rankedSeries('authorsFull'))
+        self.assertEqual(self.RC.rankedSeries('AF', limitTo = ['Girard, S']), RCindexed.rankedSeries('AF', limitTo = ['Girard, S']))
+        self.assertEqual(sorted(zip(*self.RC.timeSeries('authorsFull').values())), sorted(zip(*RCindexed.timeSeries('authorsFull').values())))
+        R = RCindexed.yearSplit(1975, 1975).peek()
+        RCindexed.discard(R)
+        self.assertEqual(len(RCindexed.yearSplit(1975, 1975)), len(self.RC.yearSplit(1975, 1975)) - 1)
+        RCindexed.add(R)
+        self.assertEqual(self.RC.yearSplit(1975, 1975), RCindexed.yearSplit(1975, 1975))
+        RCindexed.createIndex('pubType')
+        RCindexed.dropNonJournals()
+        self.assertEqual(len(RCindexed), len(RCindexed.yearSplit(0, 3000)))
+        self.assertTrue(all(R['pubType'] == 'J' for R in RCindexed))
+        RCindexed.dropIndex('PY')
+        self.assertIsNone(RCindexed._tagIndex('year'))
+        with self.assertRaises(metaknowledge.TagError):
+            RCindexed.createIndex(1)
+        with self.assertRaises(TypeError):
+            metaknowledge.mkIndex.CollectionIndex()
+
+    def test_tagIndexUnhashable(self):
+        RCmedline = metaknowledge.RecordCollection("metaknowledge/tests/medline_test.medline")
+        #The affiliations are dicts so cannot be indexed
+        withAD = {R for R in RCmedline if 'AD' in R}
+        RCindexed = RCmedline.copy()
+        for R in withAD:
+            RCindexed.discard(R)
+        RCindexed.createIndex('year')
+        RCindexed.createIndex('AD')
+        RCbefore = RCindexed.copy()
+        R = withAD.pop()
+        with self.assertRaises(metaknowledge.TagError):
+            RCindexed.add(R)
+        self.assertNotIn(R, RCindexed)
+        self.assertEqual(RCindexed, RCbefore)
+        self.assertEqual(RCindexed.yearSplit(0, 3000), RCbefore)
+        with self.assertRaises(metaknowledge.TagError):
+            RCindexed |= RCmedline
+        self.assertEqual(RCindexed.yearSplit(0, 3000), RCbefore)
+        RCindexed.dropIndex('AD')
+        RCindexed.add(R)
+        self.assertIn(R, RCindexed.yearSplit(0, 3000))
+
+    def test_mapReduce(self):
+        self.assertEqual(self.RC.mapReduce(len, operator.add, chunkSize = 3), len(self.RC))
+        self.assertEqual(self.RC.mapReduce(len, operator.add, chunkSize = 3, workers = 2), len(self.RC))
+        self.assertEqual(metaknowledge.RecordCollection().mapReduce(len, operator.add, initial = 0), 0)
+        self.assertEqual(dict(self.RC.rankedSeries('authorsShort', pandasMode = False, workers = 2)), dict(self.RC.rankedSeries('authorsShort', pandasMode = False)))
+        self.assertEqual(self.RC.localCiteStats(keyType = 'journal', workers = 2), self.RC.localCiteStats(keyType = 'journal'))
+        self.assertEqual(self.RC.cooccurrenceCounts('year', 'authorsShort', 'keywords', workers = 2), self.RC.cooccurrenceCounts('year', 'authorsShort', 'keywords'))
+        G = self.RC.mapReduce(coAuthorNetwork, metaknowledge.reduceGraphs, chunkSize = 5)
+        Gserial = self.RC.networkCoAuthor()
+        self.assertEqual(dict(G.nodes(data = True)), dict(Gserial.nodes(data = True)))
+        self.assertEqual({(frozenset((n1, n2)), w) for n1, n2, w in G.edges(data = 'weight')}, {(frozenset((n1, n2)), w) for n1, n2, w in Gserial.edges(data = 'weight')})
+        self.assertEqual(metaknowledge.reduceCounts({'a' : 1, 'b' : {'c' : 2}}, {'a' : 2, 'b' : {'c' : 1, 'd' : 1}}), {'a' : 3, 'b' : {'c' : 3, 'd' : 1}})
+        self.assertEqual(metaknowledge.reduceLists({'a' : [1]}, {'a' : [2], 'b' : [3]}), {'a' : [1, 2], 'b' : [None, 3]})
+        self.assertEqual(metaknowledge.reduceLists({'a' : [1], 'b' : [2]}, {'a' : [3, 4]}), {'a' : [1, 3, 4], 'b' : [2, None, None]})
+        #The chunks have different sets of tags
+        reducedDict = self.RC.mapReduce(makeDict, metaknowledge.reduceLists, chunkSize = 3)
+        fullDict = self.RC.makeDict(genderCounts = False)
+        self.assertEqual(set(reducedDict.keys()), set(fullDict.keys()))
+        self.assertTrue(all(len(val) == len(self.RC) for val in reducedDict.values()))
+        self.assertEqual(sorted(str(row) for row in zip(*(reducedDict[k] for k in fullDict))), sorted(str(row) for row in zip(*fullDict.values())))
+        RCmixed = metaknowledge.RecordCollection("metaknowledge/tests/", cached = False)
+        self.assertTrue(RCmixed.mapReduce(lambda c : type(c) is metaknowledge.RecordCollection and c._collectedTypes == {type(R).__name__ for R in c}, operator.and_, chunkSize = 7))
+        with self.assertRaises(metaknowledge.mkException):
+            self.RC.mapReduce(len, operator.add, chunkSize = 0)
+
+    def test_freeze(self):
+        RCmixed = metaknowledge.RecordCollection("metaknowledge/tests/", cached = False)
+        frozen = RCmixed.freeze()
+        try:
+            self.assertEqual(len(frozen), len(RCmixed))
+            self.assertEqual(set(frozen), set(RCmixed))
+            originals = {R : R for R in RCmixed}
+            for R in frozen[:100]:
+                self.assertIs(type(R), type(originals[R]))
+                self.assertEqual(dict(R._fieldDict), dict(originals[R]._fieldDict))
+                self.assertEqual(R.get('citations'), originals[R].get('citations'))
+            chunks = frozen.chunks(100)
+            self.assertEqual(sum((len(c) for c in chunks)), len(frozen))
+            self.assertEqual(frozen[250:350][5], frozen[255])
+            self.assertEqual(frozen.mapChunks(countCitations, maxSize = 300, workers = 2), [countCitations(c) for c in frozen.chunks(300)])
+            self.assertEqual(sum(frozen.mapChunks(countCitations)), countCitations(RCmixed))
+            self.assertEqual(frozen.toRecordCollection(), RCmixed)
+        finally:
+            frozen.remove()
+        self.assertFalse(os.path.exists(frozen.fileName))
+
+    def test_precompute(self):
+        RCfresh = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+        tags = ['citations', 'authorsFull', 'PY', 'selfCitation']
+        self.RC.precompute(tags, workers = 2, chunkSize = 10)
+        RCfresh.precompute('title')
+        for R in self.RC:
+            self.assertIn('CR', R._computedFields)
+            self.assertIn('year', R._computedFields)
+        freshRecs = {R : R for R in RCfresh}
+        for R in self.RC:
+            for t in tags + ['title']:
+                self.assertEqual(R.get(t), freshRecs[R].get(t))
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.precompute('CR', chunkSize = 0)
+
+    def test_precomputeSharing(self):
+        #Only WOS citations go in the citation cache
+        cacheSize = len(metaknowledge.citation._citationCache)
+        RCscopus = metaknowledge.RecordCollection("metaknowledge/tests/scopus_testing.csv.scopus")
+        RCscopus.precompute('References', workers = 2, chunkSize = 20)
+        self.assertEqual(len(metaknowledge.citation._citationCache), cacheSize)
+        freshRecs = {R : R for R in metaknowledge.RecordCollection("metaknowledge/tests/scopus_testing.csv.scopus")}
+        for R in RCscopus:
+            self.assertEqual(R.get('citations'), freshRecs[R].get('citations'))
+        metaknowledge.FAST_CITES = True
+        try:
+            RCfast = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+            RCfast.precompute('citations', workers = 2, chunkSize = 10)
+            freshRecs = {R : R for R in metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")}
+            for R in RCfast:
+                self.assertEqual(R.get('citations'), freshRecs[R].get('citations'))
+        finally:
+            metaknowledge.FAST_CITES = False
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        T = self.RC.toArrow(batchSize = 7)
+        self.assertEqual(T.num_rows, len(self.RC))
+        self.assertEqual(set(T.column_names), set(self.RC.makeDict(genderCounts = False).keys()))
+        self.assertEqual(T.schema.field('AF').type, pyarrow.list_(pyarrow.string()))
+        self.assertEqual(T.schema.field('PY').type, pyarrow.int64())
+        T = self.RC.toArrow(onlyTheseTags = ['authorsFull', 'year', 'citations'], longNames = True, numAuthors = False)
+        self.assertEqual(T.column_names, ['authorsFull', 'year', 'citations'])
+        R = self.RC.peek()
+        for row in T.to_pylist():
+            if row['authorsFull'] == R['authorsFull']:
+                self.assertEqual(row['year'], R['year'])
+                self.assertEqual(row['citations'], [c.original for c in R['citations']])
+                break
+        else:
+            self.fail("{} was not in the table".format(R))
+        fname = "metaknowledge/tests/testFile.parquet"
+        self.RC.writeParquet(fname, batchSize = 10)
+        self.assertEqual(pyarrow.parquet.ParquetFile(fname).num_row_groups, 4)
+        self.assertTrue(pyarrow.parquet.read_table(fname).equals(self.RC.toArrow()))
+        os.remove(fname)
+        with self.assertRaises(metaknowledge.RCValueError):
+            self.RC.toArrow(batchSize = 0)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrowUnsaved(self):
+        RClazy = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi", lazy = True)
+        fname = "metaknowledge/tests/testFile.parquet"
+        RClazy.writeParquet(fname, batchSize = 10)
+        try:
+            #The Records do not keep the values they were asked for
+            for R in RClazy:
+                self.assertEqual(len(R._computedFields), 0)
+            #The collections can be in different orders
+            rowKey = lambda row : str(row['UT']) + str(row['TI'])
+            self.assertEqual(sorted(pyarrow.parquet.read_table(fname).to_pylist(), key = rowKey), sorted(self.RC.toArrow().to_pylist(), key = rowKey))
+        finally:
+            os.remove(fname)
+        metaknowledge.citation._citationCache.clear()
+        metaknowledge.FAST_CITES = True
+        try:
+            RCfast = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+            T = RCfast.toArrow(onlyTheseTags = ['CR'], numAuthors = False)
+            self.assertEqual(T.column('CR').to_pylist(), [[c.ID() for c in R.get('CR')] if R.get('CR') else None for R in RCfast])
+        finally:
+            metaknowledge.FAST_CITES = False
+            metaknowledge.citation._citationCache.clear()
+
+    @unittest.skipIf(pandas is None, "pandas is not installed")
+    def test_dataFrame(self):
+        df = self.RC.toDataFrame()
+        dfDict = pandas.DataFrame(self.RC.makeDict(genderCounts = False))
+        self.assertEqual(set(df.columns), set(dfDict.columns))
+        for c in ['AF', 'PY', 'TI', 'CR', 'num-Authors']:
+            self.assertEqual(df[c].tolist(), dfDict[c].tolist())
+        self.assertEqual(df['PY'].dtype, 'int64')
+        self.assertIsInstance(df['PT'].dtype, pandas.CategoricalDtype)
+        df = self.RC.toDataFrame(columns = ['journal', 'year', 'DE'], categorical = ['journal'], longNames = True, numAuthors = False)
+        self.assertEqual(list(df.columns), ['journal', 'year', 'authKeywords'])
+        self.assertIsInstance(df['journal'].dtype, pandas.CategoricalDtype)
+        self.assertEqual(df['journal'].tolist(), [R.get('journal') for R in self.RC])
+        #Some Records have no keywords
+        self.assertEqual(df['authKeywords'].isna().sum(), len([R for R in self.RC if 'DE' not in R]))
+        self.assertFalse(isinstance(self.RC.toDataFrame(categorical = False)['PT'].dtype, pandas.CategoricalDtype))
+        df = self.RC.toDataFrame(categorical = True)
+        self.assertIsInstance(df['PT'].dtype, pandas.CategoricalDtype)
+        self.assertIsInstance(df['TI'].dtype, pandas.CategoricalDtype)
+        self.assertEqual(df['PY'].dtype, 'int64')
+        self.assertEqual(df['AF'].tolist(), dfDict['AF'].tolist())
+
     def test_yearDiff(self):
         Gdefault = self.RC.networkCitation()
         Gfull = self.RC.networkCitation(nodeType="full")
@@ -0,0 +1,43 @@
+#Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2016
+import unittest
+import metaknowledge
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        metaknowledge.VERBOSE_MODE = False
+        self.RC = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+
+    def test_iterRecords(self):
+        recs = list(metaknowledge.iterRecords("metaknowledge/tests/testFile.isi"))
+        self.assertEqual(len(recs), len(self.RC))
+        self.assertEqual(metaknowledge.RecordCollection(recs), self.RC)
+        lines = [R._sourceLine for R in recs]
+        self.assertEqual(lines, sorted(lines))
+
+    def test_iterDirectory(self):
+        errors = {}
+        RCfull = metaknowledge.RecordCollection("metaknowledge/tests/")
+        recs = set(metaknowledge.iterRecords("metaknowledge/tests/", errors = errors))
+        self.assertEqual(recs, RCfull._collection)
+        self.assertEqual(set(errors.keys()), set(RCfull.errors.keys()))
+        with self.assertRaises(metaknowledge.BadInputFile):
+            list(metaknowledge.iterRecords("metaknowledge/tests/", extension = '.py'))
+
+    def test_streamRankedSeries(self):
+        streamed = metaknowledge.streamRankedSeries("metaknowledge/tests/testFile.isi", 'year')
+        loaded = self.RC.rankedSeries('year')
+        self.assertEqual(set(zip(*streamed.values())), set(zip(*loaded.values())))
+        self.assertEqual(set(metaknowledge.streamRankedSeries(self.RC, 'authorsShort', pandasMode = False)), set(self.RC.rankedSeries('authorsShort', pandasMode = False)))
+
+    def test_streamLocalCiteStats(self):
+        self.assertEqual(metaknowledge.streamLocalCiteStats("metaknowledge/tests/testFile.isi"), self.RC.localCiteStats())
+        self.assertEqual(metaknowledge.streamLocalCiteStats("metaknowledge/tests/testFile.isi", keyType = 'journal'), self.RC.localCiteStats(keyType = 'journal'))
+
+    def test_streamRPYS(self):
+        self.assertEqual(metaknowledge.streamRPYS("metaknowledge/tests/testFile.isi"), self.RC.rpys())
+        self.assertEqual(metaknowledge.streamRPYS(self.RC, 1990, 2000, dropYears = 1995, rankEmptyYears = True), self.RC.rpys(1990, 2000, dropYears = 1995, rankEmptyYears = True))
+        multi = metaknowledge.streamRPYS(self.RC, minYear = 1950, byCitingYear = True)
+        self.assertEqual(multi['count'].shape, (len(multi['citing-year']), len(multi['year'])))
+        self.assertEqual(multi['count'].sum(axis = 0).tolist(), self.RC.rpys(minYear = 1950)['count'])
+        RC1979 = self.RC.yearSplit(1979, 1979)
+        self.assertEqual(multi['count'][multi['citing-year'].index(1979)].tolist(), RC1979.rpys(minYear = 1950, maxYear = multi['year'][-1])['count'])
@@ -1,5 +1,9 @@
 #Written by Reid McIlroy-Young for Dr. John McLevey, University of Waterloo 2016
 import unittest
+import pickle
+import os
+import shutil
+import tempfile
 import metaknowledge
 
 class TestWOS(unittest.TestCase):
@@ -31,6 +35,83 @@ class TestWOS(unittest.TestCase):
         self.assertEqual(self.R.UT, 'WOS:123317623000007')
         self.assertEqual(self.R.wosString, 'WOS:123317623000007')
 
+    def test_lazyParser(self):
+        for fName in ["metaknowledge/tests/testFile.isi", "metaknowledge/tests/ManyAuthors.isi", "metaknowledge/tests/TwoPaper.isi"]:
+            lazyRecs, lazyError = metaknowledge.WOS.wosHandlers._lazyWOSParser(fName)
+            lineRecs, lineError = metaknowledge.WOS.wosHandlers._lineWOSParser(fName)
+            self.assertIsNone(lazyError)
+            #Bad Records are compared by their fields' strings, which are not the same for lazy ones
+            self.assertEqual(len([R for R in lazyRecs if R.bad]), len([R for R in lineRecs if R.bad]))
+            lazyDicts = {R.id : R._fieldDict for R in lazyRecs if not R.bad}
+            self.assertEqual(set(lazyDicts), {R.id for R in lineRecs if not R.bad})
+            for R in lineRecs:
+                if R.bad:
+                    continue
+                self.assertEqual(dict(lazyDicts[R.id]), dict(R._fieldDict))
+                self.assertEqual(list(lazyDicts[R.id].keys()), list(R._fieldDict.keys()))
+        self.assertIsNone(metaknowledge.WOS.wosHandlers._lazyWOSParser("metaknowledge/tests/badFile.isi"))
+        recs, error = metaknowledge.WOS.wosParser("metaknowledge/tests/badFile.isi", lazy = True)
+        self.assertIsInstance(error, metaknowledge.BadWOSFile)
+
+    def test_lazyRecords(self):
+        RC = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi")
+        RClazy = metaknowledge.RecordCollection("metaknowledge/tests/testFile.isi", lazy = True)
+        self.assertEqual(len(RC), len(RClazy))
+        self.assertEqual(len(RC.badEntries()), len(RClazy.badEntries()))
+        RClazy.dropBadEntries()
+        for R in RClazy:
+            self.assertIsInstance(R._fieldDict, metaknowledge.WOS.recordWOS.LazyFieldDict)
+            Reager = RC.getID(R.id)
+            self.assertEqual(list(R.keys()), list(Reager.keys()))
+            self.assertEqual(R.get('CR', raw = True), Reager.get('CR', raw = True))
+            self.assertEqual(R['year'], Reager['year'])
+            self.assertEqual(bytes(R), bytes(Reager))
+            self.assertNotIn('XX', R._fieldDict)
+        self.assertEqual(pickle.loads(pickle.dumps(RClazy)).peek()._fieldDict, RClazy.peek()._fieldDict)
+
+    def test_lazySourceFile(self):
+        mappedFiles = metaknowledge.WOS.recordWOS._mappedFiles
+        maxMapped = metaknowledge.WOS.recordWOS._maxMappedFiles
+        with tempfile.TemporaryDirectory() as tmpDir:
+            fNames = []
+            for i in range(4):
+                fNames.append(os.path.join(tmpDir, 'lazy{}.isi'.format(i)))
+                shutil.copy("metaknowledge/tests/testFile.isi", fNames[-1])
+            RClazy = metaknowledge.RecordCollection(fNames[0], lazy = True)
+            RClazy.dropBadEntries()
+            #All the Records from the file share one source and it is not mapped while loading
+            sources = {R._fieldDict._source for R in RClazy}
+            self.assertEqual(len(sources), 1)
+            self.assertNotIn(sources.pop(), mappedFiles)
+            R = RClazy.peek()
+            self.assertIs(R._fieldDict._source.data(), R._fieldDict._source.data())
+            #Only the most recently used files stay mapped
+            metaknowledge.WOS.recordWOS._maxMappedFiles = 2
+            try:
+                others = []
+                for fName in fNames[1:]:
+                    otherRC = metaknowledge.RecordCollection(fName, lazy = True)
+                    otherRC.dropBadEntries()
+                    others.append(otherRC.peek())
+                for oR in others:
+                    self.assertEqual(oR.get('UT'), oR._fieldDict['UT'][0])
+                    self.assertLessEqual(len(mappedFiles), 2)
+                self.assertEqual(R.get('TI', raw = True), RClazy.getID(R.id).get('TI', raw = True))
+            finally:
+                metaknowledge.WOS.recordWOS._maxMappedFiles = maxMapped
+            #Unpickled Records read the file again, after checking it has not changed
+            pickled = pickle.dumps(RClazy)
+            self.assertEqual(pickle.loads(pickled).getID(R.id).get('TI', raw = True), R.get('TI', raw = True))
+            with open(fNames[0], 'a', encoding = 'utf-8') as f:
+                f.write('\n')
+            with self.assertRaises(metaknowledge.BadWOSRecord):
+                pickle.loads(pickled).peek().get('TI')
+            with self.assertRaises(metaknowledge.BadWOSRecord):
+                R._fieldDict['TI']
+            del R, RClazy, otherRC, others
+            while mappedFiles:
+                mappedFiles.popitem()[1].close()
+
 
 simplePaperString = """PT J
 AU John, D
@@ -41,7 +41,7 @@ if __name__ == '__main__':
         'Topic :: Text Processing',
         ],
         install_requires= ['networkx'],
-        extras_require={'contour' : ['matplotlib', 'scipy', 'numpy']},
+        extras_require={'contour' : ['matplotlib', 'scipy', 'numpy'], 'matrix' : ['scipy', 'numpy'], 'arrow' : ['pyarrow'], 'pandas' : ['pandas']},
         packages = find_packages(),
         entry_points={'console_scripts': [
                   'metaknowledge = metaknowledge.bin:mkCLI',